@@ -1,5 +1,6 @@
 from agentsbar.client import Client
 from agentsbar.remote_agent import *
+from agentsbar.remote_environment import RemoteEnvironment, RemoteVectorEnv
 from agentsbar.utils import *
 
 __version__ = '0.7.0'
@@ -1,9 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
+from agentsbar.bulk import iter_pages, run_many
 from agentsbar.client import Client
-from agentsbar.types import AgentCreate
-from agentsbar.utils import response_raise_error_if_any
+from agentsbar.deadline import Deadline
+from agentsbar.step_buffer import PartialSendError
+from agentsbar.types import AgentCreate, BulkResult
+from agentsbar.utils import is_missing_endpoint, response_raise_error_if_any, to_list
 
 AGENTS_PREFIX = "/agents"
 
@@ -20,7 +24,23 @@ def get_many(client: Client) -> List[Dict]:
     """
     response = client.get(f'{AGENTS_PREFIX}/')
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
+
+
+def iter_many(client: Client, page_size: int = 100) -> Iterator[Dict]:
+    """Iterates over agents belonging to authenticated user, fetching them page by page.
+
+    Unlike :py:func:`get_many`, the whole listing is never held in memory and each page is parsed while it's downloaded.
+
+    Parameters:
+        client (Client): Authenticated client.
+        page_size (int): Number of agents fetched per request. Default: 100.
+
+    Returns:
+        Iterator over agents.
+
+    """
+    return iter_pages(client, f"{AGENTS_PREFIX}/", page_size)
 
 
 def get(client: Client, agent_name: str) -> Dict:
@@ -34,9 +54,9 @@ def get(client: Client, agent_name: str) -> Dict:
         Details of an agent.
 
     """
-    response = client.get(f'{AGENTS_PREFIX}/{agent_name}')
+    response = client.get(f'{AGENTS_PREFIX}/{agent_name}', hedge=True)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def create(client: Client, agent_create: AgentCreate) -> Dict:
@@ -52,8 +72,9 @@ def create(client: Client, agent_create: AgentCreate) -> Dict:
     """
     agent_create_dict = asdict(agent_create, dict_factory=lambda x: {k: v for (k,v) in x if v is not None})
     response = client.post(f'{AGENTS_PREFIX}/', data=agent_create_dict)
+    client.metadata_cache.invalidate('agent', agent_create.name)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def delete(client: Client, agent_name: str) -> bool:
@@ -68,10 +89,41 @@ def delete(client: Client, agent_name: str) -> bool:
 
     """
     response = client.delete(f'{AGENTS_PREFIX}/{agent_name}')
+    client.metadata_cache.invalidate('agent', agent_name)
     response_raise_error_if_any(response)
     return response.status_code == 202
 
 
+def create_many(client: Client, agent_creates: Iterable[AgentCreate], max_workers: int = 8) -> List[BulkResult]:
+    """Creates many agents concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        agent_creates (Iterable of AgentCreate): Configurations of agents.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each agent, in the same order. Successful ones have agent's details in `result`.
+
+    """
+    return run_many(lambda spec: create(client, spec), agent_creates, lambda spec: spec.name, max_workers)
+
+
+def delete_many(client: Client, agent_names: Iterable[str], max_workers: int = 8) -> List[BulkResult]:
+    """Deletes many agents concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        agent_names (Iterable of str): Names of agents.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each agent, in the same order. `result` tells whether it was deleted, as in :py:func:`delete`.
+
+    """
+    return run_many(lambda name: delete(client, name), agent_names, lambda name: name, max_workers)
+
+
 def get_loss(client: Client, agent_name: str) -> Dict:
     """Recent loss metrics.
 
@@ -85,7 +137,7 @@ def get_loss(client: Client, agent_name: str) -> Dict:
     """
     response = client.get(f'{AGENTS_PREFIX}/{agent_name}/loss')
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def step(client, agent_name: str, step: Dict) -> None:
@@ -107,7 +159,10 @@ def step(client, agent_name: str, step: Dict) -> None:
     return
 
 
-def act(client, agent_name: str, obs: Dict, params: Optional[Dict] = None) -> Dict:
+def act(
+    client, agent_name: str, obs: Dict, params: Optional[Dict] = None, hedge: bool = False,
+    deadline: Union[float, Deadline, None] = None,
+) -> Dict:
     """Asks agent about its action on provided observation.
 
     Parameters:
@@ -115,11 +170,81 @@ def act(client, agent_name: str, obs: Dict, params: Optional[Dict] = None) -> Di
         agent_name (str): Name of agent.
         obs (Dict): Observation from current environment state.
         params (Optional dict): Anything useful for the agent to learn, e.g. epsilon greedy value.
+        hedge (bool): Whether a slow request can be duplicated, if client has hedging enabled.
+            Only use it when the action doesn't depend on chance, e.g. no noise. Default: False.
+        deadline (optional float or Deadline): Seconds within which the response has to arrive.
+            Default: client's `deadline`.
     
     Returns:
         Dictionary container actions.
     
     """
-    response = client.post(f"{AGENTS_PREFIX}/{agent_name}/act", obs, params=params)
+    response = client.post(f"{AGENTS_PREFIX}/{agent_name}/act", obs, params=params, hedge=hedge, deadline=deadline)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
+
+
+def step_many(client: Client, agent_name: str, steps: List[Dict]) -> None:
+    """Provides many learning steps at once, in the given order.
+
+    Uses a single request if the service supports batched steps. Otherwise falls back
+    to sending them one by one with :py:func:`step`.
+
+    Raises:
+        PartialSendError: If sending one by one failed after some steps were already sent.
+
+    Parameters:
+        client (Client): Authenticated client.
+        agent_name (str): Name of agent.
+        steps (List[Dict]): Consecutive steps, each the same as `step_data` passed to :py:func:`step`.
+
+    """
+    if not steps:
+        return
+    if client.supports(f"{AGENTS_PREFIX}/steps"):
+        response = client.post(f"{AGENTS_PREFIX}/{agent_name}/steps", data={"step_data": steps})
+        if not is_missing_endpoint(client, response):
+            response_raise_error_if_any(response)
+            return
+        client.mark_unsupported(f"{AGENTS_PREFIX}/steps")
+
+    for (idx, step_data) in enumerate(steps):
+        try:
+            step(client, agent_name, {"step_data": step_data})
+        except Exception as e:
+            if idx == 0:
+                raise
+            raise PartialSendError(idx, e) from e
+
+
+def act_batch(
+    client: Client, agent_name: str, observations: List, params: Optional[Dict] = None, max_workers: int = 8,
+) -> List[Dict]:
+    """Asks agent about actions for many observations at once, e.g. from vectorized environments.
+
+    Uses a single request if the service supports batched acting. Otherwise falls back
+    to concurrent :py:func:`act` requests.
+
+    Parameters:
+        client (Client): Authenticated client.
+        agent_name (str): Name of agent.
+        observations (List): Stacked observations, i.e. a list (or matrix) of observations.
+        params (Optional dict): The same as in :py:func:`act`, e.g. epsilon greedy value.
+        max_workers (int): Maximum number of concurrent requests in the fallback. Default: 8.
+
+    Returns:
+        List of dictionaries containing actions, in the same order as observations.
+
+    """
+    observations = to_list(observations)
+    if not observations:
+        return []
+    if client.supports(f"{AGENTS_PREFIX}/acts"):
+        response = client.post(f"{AGENTS_PREFIX}/{agent_name}/acts", observations, params=params)
+        if not is_missing_endpoint(client, response):
+            response_raise_error_if_any(response)
+            return [{"action": action} for action in client.decode(response)["actions"]]
+        client.mark_unsupported(f"{AGENTS_PREFIX}/acts")
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(observations))) as executor:
+        return list(executor.map(lambda obs: act(client, agent_name, to_list(obs), params=params), observations))
@@ -0,0 +1,2 @@
+from agentsbar.aio.client import AsyncClient
+from agentsbar.aio.remote_agent import AsyncRemoteAgent
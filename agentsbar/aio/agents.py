@@ -0,0 +1,61 @@
+from dataclasses import asdict
+from typing import Dict, List, Optional, Union
+
+from agentsbar.agents import AGENTS_PREFIX
+from agentsbar.aio.client import AsyncClient
+from agentsbar.deadline import Deadline
+from agentsbar.types import AgentCreate
+from agentsbar.utils import response_raise_error_if_any
+
+
+async def get_many(client: AsyncClient) -> List[Dict]:
+    """Gets agents belonging to authenticated user. See :py:func:`agentsbar.agents.get_many`."""
+    response = await client.get(f'{AGENTS_PREFIX}/')
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def get(client: AsyncClient, agent_name: str) -> Dict:
+    """Get indepth information about a specific agent. See :py:func:`agentsbar.agents.get`."""
+    response = await client.get(f'{AGENTS_PREFIX}/{agent_name}')
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def create(client: AsyncClient, agent_create: AgentCreate) -> Dict:
+    """Creates an agent with specified configuration. See :py:func:`agentsbar.agents.create`."""
+    agent_create_dict = asdict(agent_create, dict_factory=lambda x: {k: v for (k,v) in x if v is not None})
+    response = await client.post(f'{AGENTS_PREFIX}/', data=agent_create_dict)
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def delete(client: AsyncClient, agent_name: str) -> bool:
+    """Deletes specified agent. See :py:func:`agentsbar.agents.delete`."""
+    response = await client.delete(f'{AGENTS_PREFIX}/{agent_name}')
+    response_raise_error_if_any(response)
+    return response.status_code == 202
+
+
+async def get_loss(client: AsyncClient, agent_name: str) -> Dict:
+    """Recent loss metrics. See :py:func:`agentsbar.agents.get_loss`."""
+    response = await client.get(f'{AGENTS_PREFIX}/{agent_name}/loss')
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def step(client: AsyncClient, agent_name: str, step: Dict) -> None:
+    """Steps forward in agents learning mechanism. See :py:func:`agentsbar.agents.step`."""
+    response = await client.post(f"{AGENTS_PREFIX}/{agent_name}/step", data=step)
+    response_raise_error_if_any(response)
+    return
+
+
+async def act(
+    client: AsyncClient, agent_name: str, obs: Dict, params: Optional[Dict] = None,
+    deadline: Union[float, Deadline, None] = None,
+) -> Dict:
+    """Asks agent about its action on provided observation. See :py:func:`agentsbar.agents.act`."""
+    response = await client.post(f"{AGENTS_PREFIX}/{agent_name}/act", obs, params=params, deadline=deadline)
+    response_raise_error_if_any(response)
+    return client.decode(response)
@@ -0,0 +1,187 @@
+import asyncio
+from typing import Any, Dict, Optional, Union
+
+from agentsbar.client import BaseClient
+from agentsbar.deadline import Deadline, DeadlineExceeded, Timeout
+from agentsbar.retry import RetryPolicy
+from agentsbar.serializers import Serializer
+from agentsbar.token_cache import TokenCache
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class AsyncClient(BaseClient):
+    """
+    Asynchronous counterpart of :py:class:`agentsbar.Client`.
+
+    Credentials, url and access token renewal are handled the same way as for the `Client`.
+    Login happens either explicitly with `await client.login()`, when entering
+    `async with AsyncClient() as client`, or on the first request.
+    All coroutines share a single pool of connections so one client can serve many agents.
+
+    """
+
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        base_url: Optional[str] = None,
+        *,
+        pool_size: int = 100,
+        max_retries: int = 0,
+        keep_alive: bool = True,
+        token_cache: Union[bool, str, TokenCache, None] = None,
+        refresh_margin: float = 60,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        serializer: Union[str, Serializer] = "json",
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_threshold: Optional[int] = 5,
+        circuit_breaker_timeout: float = 10.0,
+        timeout: Timeout = (10.0, 60.0),
+        deadline: Optional[float] = None,
+    ):
+        """
+        Parameters:
+            username (optional str): Username required for login. Usually an email. Looks in env vars if None passed.
+            password (optional str): Password associated with username. Looks in env vars if None passed.
+            base_url (optional str): Service location. Defaults to `https://agents.bar`.
+
+        Keyword arguments:
+            pool_size (int): Maximum number of concurrently open connections to the service. Default: 100.
+            max_retries (int): Number of retries on failed connections. Default: 0.
+            keep_alive (bool): Whether to keep connections open between requests. Default: True.
+            token_cache (bool, str or TokenCache): Opt-in on-disk cache of access tokens shared between
+                processes. Pass True for the default location, or a directory path. Default: None (disabled).
+            refresh_margin (float): Seconds before token's expiry when it's considered expired. Default: 60.
+            compression (optional str): Compression of request bodies, either 'gzip' or 'zstd' (requires `zstandard`).
+                Responses are always allowed to be gzip compressed. Default: None (no compression).
+            compression_threshold (int): Bodies smaller than this many bytes aren't compressed. Default: 1024.
+            serializer (str or Serializer): Wire format, one of 'json', 'orjson', 'msgpack' or 'auto'
+                (the fastest available json). See :py:mod:`agentsbar.serializers`. Default: 'json'.
+            retry_policy (optional RetryPolicy): Default retry policy for agent's `act`, `step` and snapshots.
+                See :py:class:`agentsbar.retry.RetryPolicy`. Default: RetryPolicy().
+            circuit_breaker_threshold (optional int): Number of consecutive transient failures after which
+                calls to the endpoint fail fast. None disables circuit breakers. Default: 5.
+            circuit_breaker_timeout (float): Seconds after which an open circuit lets a trial call through. Default: 10.
+            timeout (float or tuple): Seconds to wait for connection and then between received bytes,
+                either as (connect, read) tuple or a single value for both. None waits forever. Default: (10, 60).
+            deadline (optional float): Seconds within which each call has to complete, including retries
+                done by `AsyncRemoteAgent`. Can be overridden per call. Default: None (no deadline).
+
+        """
+        if httpx is None:
+            raise ImportError("AsyncClient requires `httpx`. Install it with `pip install agents-bar[async]`.")
+        super().__init__(
+            username, password, base_url, token_cache=token_cache, refresh_margin=refresh_margin,
+            compression=compression, compression_threshold=compression_threshold, serializer=serializer,
+            retry_policy=retry_policy, circuit_breaker_threshold=circuit_breaker_threshold,
+            circuit_breaker_timeout=circuit_breaker_timeout, timeout=timeout, deadline=deadline,
+        )
+
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size if keep_alive else 0)
+        transport = httpx.AsyncHTTPTransport(retries=max_retries, limits=limits)
+        self._session = httpx.AsyncClient(transport=transport, follow_redirects=True, timeout=self._httpx_timeout(timeout))
+        self._login_lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _httpx_timeout(timeout: Timeout) -> "httpx.Timeout":
+        "Converts requests' style (connect, read) timeout."
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    async def __login(self) -> str:
+        response = await self._session.post(self._login_url, data=self._login_data)
+        content = response.json() if response.is_success else {}
+        return self._parse_login_response(response.status_code, response.text, content)
+
+    async def login(self, stale_headers: Optional[Dict[str, str]] = None) -> None:
+        """Obtains access token, unless a valid one is already present. See :py:meth:`agentsbar.Client.login`."""
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        async with self._login_lock:
+            if not self._needs_login(stale_headers):
+                return
+            if self._token_cache is None:
+                self._set_access_token(await self.__login())
+                return
+            # File lock might be held by another process for a while so don't block the event loop
+            file_lock = self._token_cache.lock(self.username, self._base_url)
+            acquiring = asyncio.get_event_loop().run_in_executor(None, file_lock.acquire)
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The executor still gets the lock, so it's released as soon as it does
+                acquiring.add_done_callback(lambda f: f.cancelled() or f.exception() is not None or file_lock.release())
+                raise
+            try:
+                if not self._load_cached_token():
+                    self._set_access_token(await self.__login())
+                    self._store_cached_token()
+            finally:
+                file_lock.release()
+
+    async def close(self) -> None:
+        "Closes all pooled connections."
+        await self._session.aclose()
+
+    async def __aenter__(self):
+        await self.login()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _request(
+        self, method: str, url: str, data: Any = None, timeout: Timeout = None,
+        deadline: Union[float, Deadline, None] = None, **kwargs,
+    ) -> "httpx.Response":
+        """Sends authenticated request. Rejected credentials are renewed and the request is sent once more.
+
+        Each request waits at most `timeout` (client's `timeout` if None) and all of them
+        together finish before the `deadline` (client's `deadline` if None).
+
+        """
+        deadline = self._as_deadline(deadline)
+        if self._needs_login():
+            await self.login()
+        body, body_headers, raw_size = self._encode_body(data)
+
+        async def send(headers: Dict[str, str]) -> "httpx.Response":
+            request = self._session.request(
+                method, self._base_url + url, content=body, headers={**headers, **body_headers},
+                timeout=self._httpx_timeout(self._request_timeout(timeout, deadline)), **kwargs,
+            )
+            if deadline is None:
+                return await request
+            # Timeouts only limit each read, so a response trickling in slowly could outlive the deadline
+            try:
+                return await asyncio.wait_for(request, deadline.remaining())
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"Deadline of {deadline.seconds} seconds exceeded") from None
+
+        headers = self._headers
+        response = await send(headers)
+        if response.status_code == 401:
+            self.logger.info("Access token was rejected. Logging in again.")
+            await self.login(stale_headers=headers)
+            response = await send(self._headers)
+        self._record_transfer(url, raw_size, len(body or b""), response)
+        return response
+
+    async def get(self, url: str, params: Optional[Dict] = None, **kwargs):
+        return await self._request("GET", url, params=params, **kwargs)
+
+    async def post(self, url: str, data: Optional[Dict] = None, params: Optional[Dict] = None, **kwargs):
+        return await self._request("POST", url, data=data, params=params, **kwargs)
+
+    async def delete(self, url: str, **kwargs):
+        return await self._request("DELETE", url, **kwargs)
+
+    async def put(self, url: str, **kwargs):
+        return await self._request("PUT", url, **kwargs)
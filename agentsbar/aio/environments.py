@@ -0,0 +1,61 @@
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+from agentsbar.aio.client import AsyncClient
+from agentsbar.environments import ENV_PREFIX
+from agentsbar.types import EnvironmentCreate
+from agentsbar.utils import response_raise_error_if_any
+
+
+async def get_many(client: AsyncClient) -> List[Dict]:
+    """Gets environments belonging to authenticated user. See :py:func:`agentsbar.environments.get_many`."""
+    response = await client.get(f"{ENV_PREFIX}/")
+    return client.decode(response)
+
+
+async def get(client: AsyncClient, env_name: str) -> Dict:
+    """Get indepth information about a specific environment. See :py:func:`agentsbar.environments.get`."""
+    response = await client.get(f'{ENV_PREFIX}/{env_name}')
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def create(client: AsyncClient, env_create: EnvironmentCreate) -> Dict:
+    """Creates an environment with specified configuration. See :py:func:`agentsbar.environments.create`."""
+    response = await client.post(f'{ENV_PREFIX}/', data=asdict(env_create))
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def delete(client: AsyncClient, env_name: str) -> bool:
+    """Deletes specified environment. See :py:func:`agentsbar.environments.delete`."""
+    response = await client.delete(f'{ENV_PREFIX}/{env_name}')
+    response_raise_error_if_any(response)
+    return response.status_code == 202
+
+
+async def reset(client: AsyncClient, env_name: str) -> List[float]:
+    """Resets the environment to starting position. See :py:func:`agentsbar.environments.reset`."""
+    response = await client.post(f"{ENV_PREFIX}/{env_name}/reset")
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def step(client: AsyncClient, env_name: str, step) -> Dict[str, Any]:
+    """Steps the environment based on provided data. See :py:func:`agentsbar.environments.step`."""
+    response = await client.post(f"{ENV_PREFIX}/{env_name}/step", data=step)
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def commit(client: AsyncClient, env_name: str) -> Dict[str, Any]:
+    """Commits last provided data. See :py:func:`agentsbar.environments.commit`."""
+    response = await client.post(f"{ENV_PREFIX}/{env_name}/commit")
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def info(client: AsyncClient, env_name: str) -> Dict[str, Any]:
+    response = await client.get(f"{ENV_PREFIX}/{env_name}/info")
+    response_raise_error_if_any(response)
+    return client.decode(response)
@@ -0,0 +1,58 @@
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from agentsbar.aio.client import AsyncClient
+from agentsbar.experiments import EXP_PREFIX
+from agentsbar.types import ExperimentCreate
+from agentsbar.utils import response_raise_error_if_any
+
+
+async def get_many(client: AsyncClient) -> List[Dict]:
+    """Gets experiments that belong to an authenticated user. See :py:func:`agentsbar.experiments.get_many`."""
+    response = await client.get(f"{EXP_PREFIX}/")
+    return client.decode(response)
+
+
+async def get(client: AsyncClient, exp_name: str) -> Dict:
+    """Get indepth information about a specific experiment. See :py:func:`agentsbar.experiments.get`."""
+    response = await client.get(f'{EXP_PREFIX}/{exp_name}')
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def create(client: AsyncClient, experiment_create: ExperimentCreate) -> Dict:
+    """Creates an experiment with specified configuration. See :py:func:`agentsbar.experiments.create`."""
+    response = await client.post(f'{EXP_PREFIX}/', data=asdict(experiment_create))
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def delete(client: AsyncClient, exp_name: str) -> bool:
+    """Deletes specified experiment. See :py:func:`agentsbar.experiments.delete`."""
+    response = await client.delete(f'{EXP_PREFIX}/{exp_name}')
+    response_raise_error_if_any(response)
+    return response.status_code == 202
+
+
+async def reset(client: AsyncClient, exp_name: str) -> str:
+    """Resets the experiment to starting position. See :py:func:`agentsbar.experiments.reset`."""
+    response = await client.post(f"{EXP_PREFIX}/{exp_name}/reset")
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def start(client: AsyncClient, exp_name: str, config: Optional[Dict] = None) -> str:
+    """Starts experiment. See :py:func:`agentsbar.experiments.start`."""
+    config = config or {}
+    response = await client.post(f"{EXP_PREFIX}/{exp_name}/start", data=config)
+    response_raise_error_if_any(response)
+    return "Started successfully" if response.is_success else "Failed to start"
+
+
+async def metrics(
+    client: AsyncClient, exp_name: str, metric_names: Optional[List[str]] = None, limit: int = 1,
+) -> Dict[str, List[Tuple[int, float]]]:
+    """Gets metrics obtained while running an experiment. See :py:func:`agentsbar.experiments.metrics`."""
+    response = await client.post(f"{EXP_PREFIX}/{exp_name}/metrics", data=metric_names, params=dict(limit=limit))
+    response_raise_error_if_any(response)
+    return client.decode(response)
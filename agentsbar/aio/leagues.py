@@ -0,0 +1,58 @@
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from agentsbar.aio.client import AsyncClient
+from agentsbar.leagues import LEAGUE_PREFIX
+from agentsbar.types import LeagueCreate
+from agentsbar.utils import response_raise_error_if_any
+
+
+async def get_many(client: AsyncClient) -> List[Dict]:
+    """Gets leagues that belong to an authenticated user. See :py:func:`agentsbar.leagues.get_many`."""
+    response = await client.get(f"{LEAGUE_PREFIX}/")
+    return client.decode(response)
+
+
+async def get(client: AsyncClient, league_name: str) -> Dict:
+    """Get indepth information about a specific league. See :py:func:`agentsbar.leagues.get`."""
+    response = await client.get(f'{LEAGUE_PREFIX}/{league_name}')
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def create(client: AsyncClient, league_create: LeagueCreate) -> Dict:
+    """Creates a league with specified configuration. See :py:func:`agentsbar.leagues.create`."""
+    response = await client.post(f'{LEAGUE_PREFIX}/', data=asdict(league_create))
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def delete(client: AsyncClient, league_name: str) -> bool:
+    """Deletes specified league. See :py:func:`agentsbar.leagues.delete`."""
+    response = await client.delete(f'{LEAGUE_PREFIX}/{league_name}')
+    response_raise_error_if_any(response)
+    return response.status_code == 202
+
+
+async def reset(client: AsyncClient, league_name: str) -> str:
+    """Resets the league to starting position. See :py:func:`agentsbar.leagues.reset`."""
+    response = await client.post(f"{LEAGUE_PREFIX}/{league_name}/reset")
+    response_raise_error_if_any(response)
+    return client.decode(response)
+
+
+async def start(client: AsyncClient, league_name: str, config: Optional[Dict] = None) -> str:
+    """Starts league. See :py:func:`agentsbar.leagues.start`."""
+    config = config or {}
+    response = await client.post(f"{LEAGUE_PREFIX}/{league_name}/start", data=config)
+    response_raise_error_if_any(response)
+    return "Started successfully" if response.is_success else "Failed to start"
+
+
+async def metrics(
+    client: AsyncClient, league_name: str, metric_names: Optional[List[str]] = None, limit: int = 1,
+) -> Dict[str, List[Tuple[int, float]]]:
+    """Gets metrics obtained while running a league. See :py:func:`agentsbar.leagues.metrics`."""
+    response = await client.post(f"{LEAGUE_PREFIX}/{league_name}/metrics", data=metric_names, params=dict(limit=limit))
+    response_raise_error_if_any(response)
+    return client.decode(response)
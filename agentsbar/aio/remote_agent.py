@@ -0,0 +1,224 @@
+import asyncio
+import dataclasses
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from agentsbar.aio import agents
+from agentsbar.aio.client import AsyncClient
+from agentsbar.deadline import Deadline, DeadlineExceeded, fallback_action
+from agentsbar.remote_agent import SUPPORTED_MODELS
+from agentsbar.retry import RetryPolicy, async_call_with_retry
+from agentsbar.types import ActionType, AgentCreate, DataSpace, EncodedAgentState, ObsType
+from agentsbar.utils import encode_array, to_list
+
+
+class AsyncRemoteAgent:
+    """
+    Asynchronous counterpart of :py:class:`agentsbar.RemoteAgent`.
+
+    Network calls are coroutines and follow the same retry policy and circuit breakers as in the `RemoteAgent`.
+    Since properties can't await, `obs_space`, `action_space` and `agent_model` only return
+    values already known locally. Use `await agent.sync()` to fetch them from the service.
+
+    """
+    name = "AsyncRemoteAgent"
+    logger = logging.getLogger("AsyncRemoteAgent")
+
+    def __init__(
+        self, client: AsyncClient, agent_name: str, *, array_encoding: str = "list",
+        retry_policy: Optional[RetryPolicy] = None, **kwargs,
+    ):
+        self._client: AsyncClient = client
+        assert array_encoding in ("list", "binary"), "Array encoding can be either 'list' or 'binary'"
+        self._array_encoding = array_encoding
+        self.retry_policy: RetryPolicy = retry_policy or client.retry_policy
+
+        self._config: Dict = {}
+        self._config.update(**kwargs)
+
+        self._discrete: Optional[bool] = None
+        self._obs_space: Optional[int] = kwargs.get('obs_space', None)
+        self._action_space: Optional[int] = kwargs.get('action_space', None)
+        self._agent_model: Optional[str] = kwargs.get('agent_model', None)
+        self.loss: Dict[str, float] = {}
+
+        self.agent_name = agent_name
+        self._description: Optional[str] = None
+
+        self._last_action: Optional[ActionType] = None
+        self.fallback_count = 0  #: Number of times `act` returned fallback action because of deadline
+
+    @property
+    def obs_space(self):
+        return self._obs_space
+
+    @property
+    def action_space(self):
+        return self._action_space
+
+    @property
+    def agent_model(self) -> Optional[str]:
+        return self._agent_model
+
+    async def create_agent(
+        self,
+        obs_space: DataSpace,
+        action_space: DataSpace,
+        active: bool = True,
+        agent_model: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> Dict:
+        """Creates a new agent in the service. See :py:meth:`agentsbar.RemoteAgent.create_agent`."""
+        if agent_model.lower() not in SUPPORTED_MODELS:
+            raise ValueError(f"Model '{agent_model}' isn't currently supported. Please select one from {SUPPORTED_MODELS}")
+        self._agent_model = agent_model
+        self._description = description
+        self._discrete = None
+
+        self._config['obs_space'] = dataclasses.asdict(obs_space)
+        self._config['action_space'] = dataclasses.asdict(action_space)
+
+        self.logger.debug("Creating an agent (name=%s, model=%s)", self.agent_name, self.agent_model)
+        agent_create = AgentCreate(
+            name=self.agent_name,
+            image='agents-bar/agent',
+            model=self.agent_model,
+            description=self._description,
+            config=self._config,
+            is_active=active,
+        )
+        return await agents.create(self._client, agent_create)
+
+    async def remove(self, *, agent_name: str, quite: bool = True) -> bool:
+        """Deletes the agent. See :py:meth:`agentsbar.RemoteAgent.remove`."""
+        if agent_name is None or self.agent_name != agent_name:
+            if quite:
+                self.logger.warning("You're request for deletion is being ignored. You're welcome.")
+                return False
+            raise ValueError("You wanted to delete an agent. Are you sure? If so, we need *again* its name.")
+
+        self.logger.warning("Agent '%s' is being exterminated", agent_name)
+        return await agents.delete(self._client, agent_name=agent_name)
+
+    async def exists(self) -> bool:
+        """Whether the agent service exists and is accessible"""
+        response = await self._client.get(f"/agents/{self.agent_name}")
+        return response.is_success
+
+    async def is_active(self) -> bool:
+        j_response = await agents.get(self._client, self.agent_name)
+        return j_response['is_active']
+
+    @property
+    def discrete(self):
+        if self._discrete is None:
+            assert self.agent_model, "Need to know model before guessing whether it's discrete. Try `await agent.sync()`"
+            self._discrete = self.agent_model.lower() in ("dqn", 'rainbow')
+        return self._discrete
+
+    def _encode_values(self, x, space_name: str):
+        "Encodes observation or action for the wire. Only arrays are encoded in binary form."
+        if self._array_encoding == "binary" and hasattr(x, "dtype") and hasattr(x, "shape"):
+            return encode_array(x, getattr(self, space_name), raw=self._client._serializer.binary)
+        return to_list(x)
+
+    @property
+    def hparams(self) -> Dict[str, Union[str, float, int]]:
+        """Agents hyperparameters. See :py:attr:`agentsbar.RemoteAgent.hparams`."""
+        def make_str_or_number(val):
+            return str(val) if not isinstance(val, (int, float)) else val
+
+        return {k: make_str_or_number(v) for (k, v) in self._config.items()}
+
+    async def info(self) -> Dict[str, Any]:
+        """Gets agents meta-data from sever."""
+        info = await agents.get(self._client, self.agent_name)
+        self._config = info.get('config', self._config)
+        return info
+
+    async def sync(self) -> None:
+        """Synchronizes local information with the one stored in Agents Bar.
+        """
+        agent = await self.info()
+        self._agent_model = agent['model']
+        self._config.update(agent['config'])
+        self._obs_space = self._config.get("obs_space")
+        self._action_space = self._config.get("action_space")
+
+    async def _sync_within(self, deadline: Optional[Deadline]) -> None:
+        "Synchronizes agent's details, giving up when the deadline passes."
+        if deadline is None:
+            return await self.sync()
+        try:
+            await asyncio.wait_for(self.sync(), deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Deadline of {deadline.seconds} seconds exceeded") from None
+
+    async def get_state(self) -> EncodedAgentState:
+        """Gets agents state in an encoded snapshot form. See :py:meth:`agentsbar.RemoteAgent.get_state`."""
+        async def fetch():
+            response = await self._client.get(f"/snapshots/{self.agent_name}")
+            response.raise_for_status()
+            return self._client.decode(response)
+
+        state = await self._with_retry(fetch, "/snapshots/{name}")
+        return EncodedAgentState(**state)
+
+    async def _with_retry(
+        self, fn: Callable[[], Awaitable[Any]], endpoint: str, idempotent: bool = True, deadline: Optional[Deadline] = None,
+    ) -> Any:
+        "Awaits `fn` according to agent's retry policy and endpoint's circuit breaker, within client's deadline."
+        breaker = self._client.circuit_breaker(endpoint.format(name=self.agent_name))
+        deadline = deadline or self._client._as_deadline(None)
+        return await async_call_with_retry(fn, self.retry_policy, idempotent=idempotent, breaker=breaker, deadline=deadline)
+
+    async def upload_state(self, state: EncodedAgentState) -> bool:
+        """Updates remote agent with provided state. See :py:meth:`agentsbar.RemoteAgent.upload_state`."""
+        j_state = dataclasses.asdict(state)
+        response = await self._client.post(f"/snapshots/{self.agent_name}", data=j_state)
+        response.raise_for_status()
+        return True
+
+    async def act(
+        self, obs, noise: float = 0, deadline: Optional[float] = None,
+        fallback: Union[str, Callable[[Any], ActionType], None] = None,
+    ) -> ActionType:
+        """Asks for action based on provided observation. See :py:meth:`agentsbar.RemoteAgent.act`."""
+        deadline = self._client._as_deadline(deadline)
+        try:
+            if self._agent_model is None:
+                await self._sync_within(deadline)
+            j_response = await self._with_retry(
+                lambda: agents.act(
+                    self._client, agent_name=self.agent_name, params={"noise": noise}, obs=to_list(obs), deadline=deadline,
+                ),
+                "/agents/{name}/act", deadline=deadline,
+            )
+        except DeadlineExceeded as e:
+            if fallback is None:
+                raise
+            self.logger.debug("Agent '%s' didn't act in time (%s). Using '%s' fallback.", self.agent_name, e, fallback)
+            self.fallback_count += 1
+            # Agent's details might not have been synced in time
+            is_known = self._agent_model is not None
+            return fallback_action(
+                fallback, obs, self._last_action, self._action_space if is_known else None, is_known and self.discrete,
+            )
+
+        action = j_response['action']
+        self._last_action = int(action[0]) if self.discrete else action
+        return self._last_action
+
+    async def step(self, obs: ObsType, action: ActionType, reward: float, next_obs: ObsType, done: bool) -> bool:
+        """Providing information from taking a step in environment. See :py:meth:`agentsbar.RemoteAgent.step`."""
+        step_data = {
+            "obs": self._encode_values(obs, "obs_space"), "next_obs": self._encode_values(next_obs, "obs_space"),
+            "action": self._encode_values(action, "action_space"), "reward": reward, "done": done,
+        }
+        data = {"step_data": step_data}
+
+        await self._with_retry(
+            lambda: agents.step(client=self._client, agent_name=self.agent_name, step=data),
+            "/agents/{name}/step", idempotent=False,
+        )
+        return True
@@ -0,0 +1,107 @@
+import codecs
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from agentsbar.client import Client
+from agentsbar.types import BulkResult
+from agentsbar.utils import response_raise_error_if_any
+
+CHUNK_SIZE = 1 << 16
+_SEPARATORS = " \t\r\n,"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Parses a JSON array incrementally, yielding its items as soon as they're complete.
+
+    Parameters:
+        chunks (Iterable of bytes): Consecutive parts of the array's encoding, e.g. `response.iter_content()`.
+
+    Raises:
+        ValueError: If the content isn't a JSON array or it's incomplete.
+
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, opened = "", 0, False
+    for chunk in chunks:
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not opened:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                opened, pos = True, pos + 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break  # Item continues in the next chunk
+            if end == len(buffer) or buffer[end] not in _SEPARATORS + "]":
+                break  # Might be a number that continues in the next chunk, e.g. "4" followed by ".5"
+            yield item
+            pos = end
+    raise ValueError("Incomplete JSON array")
+
+
+def iter_pages(client: Client, url: str, page_size: int = 100) -> Iterator[Dict]:
+    """Iterates over a listing fetched page by page with `skip` and `limit` parameters.
+
+    JSON pages are parsed while they're downloaded, so only the current item needs to be held in memory.
+    Services which ignore pagination return everything on the first page, which is then the only one requested.
+
+    Parameters:
+        client (Client): Authenticated client.
+        url (str): Listing's url, e.g. "/agents/".
+        page_size (int): Number of items per request. Default: 100.
+
+    """
+    skip, previous_first = 0, None
+    while True:
+        count = 0
+        with client.get(url, params={"skip": skip, "limit": page_size}, stream=True) as response:
+            response_raise_error_if_any(response)
+            if response.headers.get("Content-Type", "").startswith("application/json"):
+                items = iter_json_array(response.iter_content(CHUNK_SIZE))
+            else:
+                items = iter(client.decode(response))
+            for item in items:
+                if count == 0 and skip > 0 and item == previous_first:
+                    return  # `skip` is ignored
+                if count == 0:
+                    previous_first = item
+                count += 1
+                yield item
+        if count != page_size:
+            return
+        skip += count
+
+
+def run_many(
+    fn: Callable[[Any], Any], items: Iterable[Any], name: Callable[[Any], str], max_workers: int = 8,
+) -> List[BulkResult]:
+    """Calls `fn` for each item concurrently, with at most `max_workers` calls at a time.
+    A failed item doesn't stop others.
+
+    Returns:
+        Results in the same order as items.
+
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def call(item) -> BulkResult:
+        try:
+            return BulkResult(name=name(item), ok=True, result=fn(item))
+        except Exception as e:
+            return BulkResult(name=name(item), error=str(e))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
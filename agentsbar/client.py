@@ -1,81 +1,551 @@
+import base64
+import json
 import logging
 import os
-from typing import Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import replace
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from agentsbar.compression import maybe_compress, validate_compression
+from agentsbar.deadline import Deadline, DeadlineExceeded, Timeout
+from agentsbar.hedging import HedgePolicy, Hedger
+from agentsbar.metadata_cache import MetadataCache
+from agentsbar.retry import CircuitBreaker, RetryPolicy
+from agentsbar.serializers import JsonSerializer, Serializer, get_serializer
+from agentsbar.token_cache import TokenCache
+from agentsbar.types import TransferStats
 
 USERNAME_KEY = "AGENTS_BAR_USER"
 PASSWORD_KEY = "AGENTS_BAR_PASS"
 
 
-class Client(object):
+class BaseClient(object):
     """
-    Session object that stores credentials and configuration.
+    Credentials and configuration shared by all clients, regardless how they talk to the service.
 
     """
 
     default_url = "https://agents.bar"
     logger = logging.getLogger("AgentsBar")
 
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None, base_url: Optional[str] = None):
-        """
-        Initiates session to Agents Bar. If credentials aren't passed directly then it expects them
-        to be present in environment variables as `AGENTS_BAR_USER` and `AGENTS_BAR_PASS`.
-
-        Parameters:
-            username (optional str): Username required for login. Usually an email. Looks in env vars if None passed.
-            password (optional str): Password associated with username. Looks in env vars if None passed.
-            base_url (optional str): Service location. Defaults to `https://agents.bar`.
-
-        """
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        base_url: Optional[str] = None,
+        token_cache: Union[bool, str, TokenCache, None] = None,
+        refresh_margin: float = 60,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        serializer: Union[str, Serializer] = "json",
+        metadata_ttl: float = 1.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_threshold: Optional[int] = 5,
+        circuit_breaker_timeout: float = 10.0,
+        timeout: Timeout = (10.0, 60.0),
+        deadline: Optional[float] = None,
+    ):
         if username is None and password is None:
             # Look in env only if neither is passed
             username = os.environ[USERNAME_KEY]
             password = os.environ[PASSWORD_KEY]
-        
+
         if username is None or password is None:
             raise ValueError("No credentials provided for logging in. Please pass either 'access_token' or "
                              "('username' and 'password'). These credentials should be related to your Agents Bar account.")
-        
+
         self.username = username
-        self._base_url: str = self.__parse_url(base_url)
-        self.__access_token: str = self.__login(username, password)
+        self._password = password
+        self._base_url: str = self._parse_url(base_url)
+        self._serializer: Serializer = get_serializer(serializer)
+        self._json_serializer: Serializer = self._serializer if isinstance(self._serializer, JsonSerializer) else JsonSerializer()
+        accept = "application/json"
+        if self._serializer.content_type != accept:
+            accept = f"{self._serializer.content_type}, {accept};q=0.9"
+        self._headers: Dict[str, str] = {"accept": accept, "Accept-Encoding": "gzip, deflate"}
+
+        if compression is not None:
+            validate_compression(compression)
+        self._compression = compression
+        self._compression_threshold = compression_threshold
+        self._transfer_stats: Dict[str, TransferStats] = {}
+        self._stats_lock = threading.Lock()
+        self._unsupported_endpoints: Set[str] = set()
+        self.metadata_cache = MetadataCache(ttl=metadata_ttl)
 
-        self._headers = {"Authorization": f"Bearer {self.__access_token}", "accept": "application/json"}
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self._circuit_breaker_threshold = circuit_breaker_threshold
+        self._circuit_breaker_timeout = circuit_breaker_timeout
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.timeout: Timeout = timeout
+        self.deadline: Optional[float] = deadline
+
+        self._access_token: Optional[str] = None
+        self._token_expires_at: Optional[float] = None
+        self._refresh_margin = refresh_margin
+        self._token_cache: Optional[TokenCache] = self._create_token_cache(token_cache)
 
     @staticmethod
-    def __parse_url(base_url: Optional[str] = None) -> str:
+    def _parse_url(base_url: Optional[str] = None) -> str:
         "Determins full API url based on provided (or not) `base_url`."
         if base_url is None:
-            base_url = Client.default_url
+            base_url = BaseClient.default_url
         assert base_url.startswith("http"), "Base url needs to start with either `http` or `https`"
         assert base_url.split(":", 1)[0] in ("http", "https"), "Only http and https protocols are supported"
         assert base_url[-1] != "/", "Base url cannot end with `/`"
 
         return base_url + "/api/v1"
 
-    
-    def __login(self, username: str, password: str) -> str:
+    @staticmethod
+    def _create_token_cache(token_cache: Union[bool, str, TokenCache, None]) -> Optional[TokenCache]:
+        if token_cache is None or token_cache is False:
+            return None
+        if token_cache is True:
+            return TokenCache()
+        if isinstance(token_cache, str):
+            return TokenCache(token_cache)
+        return token_cache
+
+    @property
+    def _login_url(self) -> str:
+        return f"{self._base_url}/login/access-token"
 
-        data = dict(username=username, password=password)
-        response = requests.post(f"{self._base_url}/login/access-token", data=data)
+    @property
+    def _login_data(self) -> Dict[str, str]:
+        return dict(username=self.username, password=self._password)
 
-        if response.status_code >= 300:
-            self.logger.error(response.text)
+    def _parse_login_response(self, status_code: int, text: str, content: Dict) -> str:
+        "Extracts access token from login response or raises if login failed."
+        if status_code >= 300:
+            self.logger.error(text)
             raise ValueError(
-                f"Received an error while trying to authenticate as username='{username}'. "
-                f"Please double check your credentials. Error: {response.text}"
+                f"Received an error while trying to authenticate as username='{self.username}'. "
+                f"Please double check your credentials. Error: {text}"
             )
-        return response.json()['access_token']
-
-    def get(self, url: str, params: Optional[Dict] = None):
-        return requests.get(self._base_url + url, headers=self._headers, params=params)
-    
-    def post(self, url: str, data: Optional[Dict] = None, params: Optional[Dict] = None):
-        return requests.post(self._base_url + url, json=data, headers=self._headers, params=params)
-    
-    def delete(self, url: str):
-        return requests.delete(self._base_url + url, headers=self._headers)
-
-    def put(self, url: str):
-        return requests.put(self._base_url + url, headers=self._headers)
+        return content['access_token']
+
+    def _encode_body(self, data: Any) -> Tuple[Optional[bytes], Dict[str, str], int]:
+        """Serializes and, if configured and worth it, compresses request's body.
+
+        Returns:
+            Tuple with body, headers describing the body, and size of the body before compression.
+
+        """
+        if data is None:
+            return None, {}, 0
+        raw = self._serializer.dumps(data)
+        body, encoding = maybe_compress(raw, self._compression, self._compression_threshold)
+        headers = {"Content-Type": self._serializer.content_type}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return body, headers, len(raw)
+
+    def decode(self, response) -> Any:
+        """Deserializes response's body according to its content type.
+
+        Parameters:
+            response: Response returned by any of client's methods.
+
+        Returns:
+            Python objects sent by the service, the same as `response.json()` for json responses.
+
+        """
+        content_type = response.headers.get("Content-Type", "")
+        if content_type.startswith(self._serializer.content_type):
+            return self._serializer.loads(response.content)
+        return self._json_serializer.loads(response.content)
+
+    def _record_transfer(self, url: str, sent_raw: int, sent: int, response, streamed: bool = False) -> None:
+        "Updates byte counters for the endpoint. Streamed responses aren't read, so only their declared length is counted."
+        received_raw = int(response.headers.get("Content-Length", 0)) if streamed else len(response.content)
+        received = int(response.headers.get("Content-Length", received_raw))
+        with self._stats_lock:
+            stats = self._transfer_stats.setdefault(url, TransferStats())
+            stats.requests += 1
+            stats.sent_raw += sent_raw
+            stats.sent += sent
+            stats.received += received
+            stats.received_raw += received_raw
+
+    @property
+    def transfer_stats(self) -> Dict[str, TransferStats]:
+        """Bytes exchanged per endpoint, e.g. `/agents/<name>/step`, since the client was created.
+
+        Returns:
+            Snapshot of counters with keys being endpoints' paths.
+
+        """
+        with self._stats_lock:
+            return {url: replace(stats) for (url, stats) in self._transfer_stats.items()}
+
+    def circuit_breaker(self, endpoint: str) -> Optional[CircuitBreaker]:
+        """Circuit breaker shared by all calls to the endpoint, e.g. `/agents/CartPoleAgent/act`.
+
+        Returns:
+            Circuit breaker or None if these are disabled.
+
+        """
+        if self._circuit_breaker_threshold is None:
+            return None
+        with self._stats_lock:
+            if endpoint not in self._circuit_breakers:
+                self._circuit_breakers[endpoint] = CircuitBreaker(
+                    endpoint, failure_threshold=self._circuit_breaker_threshold, reset_timeout=self._circuit_breaker_timeout,
+                )
+            return self._circuit_breakers[endpoint]
+
+    @property
+    def circuit_states(self) -> Dict[str, str]:
+        "State ('closed', 'open' or 'half_open') of each endpoint's circuit breaker."
+        with self._stats_lock:
+            breakers = list(self._circuit_breakers.values())
+        return {breaker.name: breaker.state for breaker in breakers}
+
+    def _as_deadline(self, deadline: Union[float, Deadline, None]) -> Optional[Deadline]:
+        "Deadline of a call, given either as a shared :py:class:`agentsbar.deadline.Deadline` or seconds. Defaults to client's `deadline`."
+        if deadline is None:
+            deadline = self.deadline
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return Deadline(deadline)
+
+    def _request_timeout(self, timeout: Timeout, deadline: Optional[Deadline]) -> Timeout:
+        """Timeout of a single request, limited by the time left until the deadline.
+
+        Parameters:
+            timeout: Request's (connect, read) timeout or total seconds. None uses client's `timeout`.
+            deadline (optional Deadline): Time budget of the call.
+
+        Raises:
+            DeadlineExceeded: If there's no time left.
+
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if deadline is None:
+            return timeout
+        deadline.check()
+        return deadline.cap(timeout)
+
+    def supports(self, endpoint: str) -> bool:
+        "Whether the endpoint, e.g. `/agents/steps`, wasn't found to be missing on the service."
+        return endpoint not in self._unsupported_endpoints
+
+    def mark_unsupported(self, endpoint: str) -> None:
+        "Remembers that the service doesn't provide the endpoint so that fallbacks are used straight away."
+        self.logger.info("Service doesn't support '%s'. Using fallback.", endpoint)
+        self._unsupported_endpoints.add(endpoint)
+
+    @staticmethod
+    def _token_expiry(access_token: str) -> Optional[float]:
+        "Reads expiry time from JWT token's payload, if there is any."
+        try:
+            payload = access_token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    def _set_access_token(self, access_token: str, expires_at: Optional[float] = None) -> None:
+        self._access_token = access_token
+        self._token_expires_at = expires_at if expires_at is not None else self._token_expiry(access_token)
+        # Replaced rather than updated so that concurrent requests always see consistent headers
+        self._headers = {**self._headers, "Authorization": f"Bearer {access_token}"}
+
+    def _needs_login(self, stale_headers: Optional[Dict[str, str]] = None) -> bool:
+        """Whether a new access token is required.
+
+        Parameters:
+            stale_headers (optional dict): Headers that were rejected by the service. The token is
+                only replaced if nobody has done it since these headers were used.
+
+        """
+        if stale_headers is not None:
+            return self._headers is stale_headers
+        if self._access_token is None:
+            return True
+        return self._token_expires_at is not None and time.time() >= self._token_expires_at - self._refresh_margin
+
+    def _load_cached_token(self) -> bool:
+        "Uses token from the token cache if it's usable. Returns whether it was."
+        entry = self._token_cache.load(self.username, self._base_url)
+        if entry is None or entry["access_token"] == self._access_token:
+            return False
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and time.time() >= expires_at - self._refresh_margin:
+            return False
+        self._set_access_token(entry["access_token"], expires_at)
+        return True
+
+    def _store_cached_token(self) -> None:
+        self._token_cache.store(self.username, self._base_url, self._access_token, self._token_expires_at)
+
+
+class Client(BaseClient):
+    """
+    Session object that stores credentials and configuration.
+
+    All requests go through a single pooled `requests.Session` so that consecutive calls,
+    e.g. `RemoteAgent.act` and `RemoteAgent.step`, reuse already established (keep-alive)
+    connections instead of paying TCP and TLS handshake on every call.
+    The session isn't modified after construction so the client can be shared between threads.
+
+    """
+
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        base_url: Optional[str] = None,
+        *,
+        pool_size: int = 10,
+        max_retries: int = 0,
+        keep_alive: bool = True,
+        prewarm: int = 0,
+        token_cache: Union[bool, str, TokenCache, None] = None,
+        refresh_margin: float = 60,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        serializer: Union[str, Serializer] = "json",
+        metadata_ttl: float = 1.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker_threshold: Optional[int] = 5,
+        circuit_breaker_timeout: float = 10.0,
+        hedge_policy: Optional[HedgePolicy] = None,
+        timeout: Timeout = (10.0, 60.0),
+        deadline: Optional[float] = None,
+    ):
+        """
+        Initiates session to Agents Bar. If credentials aren't passed directly then it expects them
+        to be present in environment variables as `AGENTS_BAR_USER` and `AGENTS_BAR_PASS`.
+
+        Login happens on the first request, or on explicit :py:meth:`login`. The access token is renewed
+        shortly before it expires (if the token states its expiry) and whenever the service rejects it.
+
+        Parameters:
+            username (optional str): Username required for login. Usually an email. Looks in env vars if None passed.
+            password (optional str): Password associated with username. Looks in env vars if None passed.
+            base_url (optional str): Service location. Defaults to `https://agents.bar`.
+
+        Keyword arguments:
+            pool_size (int): Maximum number of connections kept open to the service. Should be at least
+                the number of threads sharing the client. Default: 10.
+            max_retries (int): Number of retries on failed connections, i.e. before any data reached
+                the service. Default: 0.
+            keep_alive (bool): Whether to keep connections open between requests. Default: True.
+            prewarm (int): Number of connections to open upfront so that the first requests don't pay
+                the handshake cost. Capped at `pool_size`. Default: 0.
+            token_cache (bool, str or TokenCache): Opt-in on-disk cache of access tokens shared between
+                processes. Pass True for the default location, or a directory path. Default: None (disabled).
+            refresh_margin (float): Seconds before token's expiry when it's considered expired. Default: 60.
+            compression (optional str): Compression of request bodies, either 'gzip' or 'zstd' (requires `zstandard`).
+                Responses are always allowed to be gzip compressed. Default: None (no compression).
+            compression_threshold (int): Bodies smaller than this many bytes aren't compressed. Default: 1024.
+            serializer (str or Serializer): Wire format, one of 'json', 'orjson', 'msgpack' or 'auto'
+                (the fastest available json). See :py:mod:`agentsbar.serializers`. Default: 'json'.
+            metadata_ttl (float): Seconds for which entities' metadata, e.g. `RemoteAgent.is_active`,
+                is reused by everything sharing this client. Zero disables caching. Default: 1.
+            retry_policy (optional RetryPolicy): Default retry policy for agent's `act`, `step` and snapshots.
+                See :py:class:`agentsbar.retry.RetryPolicy`. Default: RetryPolicy().
+            circuit_breaker_threshold (optional int): Number of consecutive transient failures after which
+                calls to the endpoint fail fast. None disables circuit breakers. Default: 5.
+            circuit_breaker_timeout (float): Seconds after which an open circuit lets a trial call through. Default: 10.
+            hedge_policy (optional HedgePolicy): Enables sending duplicates of slow side-effect free requests
+                which opt in, i.e. deterministic `act` and entities' details. See :py:class:`agentsbar.hedging.HedgePolicy`.
+                Default: None (no hedging).
+            timeout (float or tuple): Seconds to wait for connection and then between received bytes,
+                either as (connect, read) tuple or a single value for both. None waits forever. Default: (10, 60).
+            deadline (optional float): Seconds within which each call has to complete, including retries
+                done by `RemoteAgent`. Can be overridden per call. Default: None (no deadline).
+
+        """
+        super().__init__(
+            username, password, base_url, token_cache=token_cache, refresh_margin=refresh_margin,
+            compression=compression, compression_threshold=compression_threshold, serializer=serializer,
+            metadata_ttl=metadata_ttl, retry_policy=retry_policy, circuit_breaker_threshold=circuit_breaker_threshold,
+            circuit_breaker_timeout=circuit_breaker_timeout, timeout=timeout, deadline=deadline,
+        )
+        self._pool_size = pool_size
+        self._session: requests.Session = self.__create_session(pool_size, max_retries, keep_alive)
+        self._login_lock = threading.Lock()
+        self.hedger: Optional[Hedger] = Hedger(hedge_policy, max_workers=2 * pool_size) if hedge_policy else None
+        # Requests with a deadline are awaited in these threads, so that a slow response can't outlive it
+        self._deadline_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="Deadline")
+
+        if prewarm > 0:
+            self.prewarm(prewarm)
+
+    @staticmethod
+    def __create_session(pool_size: int, max_retries: int, keep_alive: bool) -> requests.Session:
+        "Creates a session with a connection pool shared by all requests."
+        assert pool_size > 0, "Pool size needs to be positive"
+        # Only connection errors are retried here. Anything that reached the service is left to the caller.
+        retries = Retry(total=max_retries, connect=max_retries, read=0, status=0, redirect=0, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries, pool_block=False)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def __login(self) -> str:
+        response = self._session.post(self._login_url, data=self._login_data, timeout=self.timeout)
+        content = response.json() if response.ok else {}
+        return self._parse_login_response(response.status_code, response.text, content)
+
+    def login(self, stale_headers: Optional[Dict[str, str]] = None) -> None:
+        """Obtains access token, unless a valid one is already present.
+
+        Concurrent calls result in at most one login request. With the token cache enabled
+        this also holds across processes.
+
+        Parameters:
+            stale_headers (optional dict): Headers rejected by the service. Forces new token
+                unless it was already replaced.
+
+        """
+        with self._login_lock:
+            if not self._needs_login(stale_headers):
+                return
+            if self._token_cache is None:
+                self._set_access_token(self.__login())
+                return
+            with self._token_cache.lock(self.username, self._base_url):
+                if not self._load_cached_token():
+                    self._set_access_token(self.__login())
+                    self._store_cached_token()
+
+    def prewarm(self, connections: int = 1) -> None:
+        """Opens connections to the service upfront and returns them to the pool.
+
+        Requests are issued concurrently, otherwise the same connection would be reused each time.
+        Failures are only logged since warming up is an optimization.
+
+        Parameters:
+            connections (int): Number of connections to open. At most the pool size. Default: 1.
+
+        """
+        connections = max(1, min(connections, self._pool_size))
+        barrier = threading.Barrier(connections)
+
+        def touch():
+            # Hold on until all connections are checked out of the pool
+            response = self._session.head(self._base_url + "/", stream=True, timeout=self.timeout)
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            # Consuming the (empty) body releases the connection to the pool, while `close()` would drop it
+            response.content
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            futures = [executor.submit(touch) for _ in range(connections)]
+        for future in futures:
+            if future.exception() is not None:
+                self.logger.warning("Failed to prewarm a connection: %s", future.exception())
+
+    def close(self) -> None:
+        "Closes all pooled connections."
+        if self.hedger is not None:
+            self.hedger.shutdown()
+        self._deadline_executor.shutdown(wait=False)
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _request(
+        self, method: str, url: str, data: Any = None, hedge: bool = False, timeout: Timeout = None,
+        deadline: Union[float, Deadline, None] = None, headers: Optional[Dict[str, str]] = None,
+        chunks: Optional[Callable[[], Iterable[bytes]]] = None, **kwargs,
+    ) -> requests.Response:
+        """Sends authenticated request. Rejected credentials are renewed and the request is sent once more.
+
+        Requests with `hedge` are duplicated if slow, provided that hedging is enabled.
+        Only side-effect free requests, which are cheap to repeat, should opt in. Rate limited ones,
+        e.g. snapshots, never should since each duplicate counts against the limit.
+
+        Each request waits at most `timeout` (client's `timeout` if None) and all of them
+        together finish before the `deadline` (client's `deadline` if None).
+
+        Large json bodies can be streamed with `chunks`, a function returning an iterable of body's
+        parts. It's called for each sent request. Responses are streamed with `stream=True`.
+
+        """
+        deadline = self._as_deadline(deadline)
+        if self._needs_login():
+            self.login()
+        body, body_headers, raw_size = self._encode_body(data)
+        body_headers.update(headers or {})
+        sent = [len(body or b"")]
+        if chunks is not None:
+            body_headers = {"Content-Type": "application/json", **body_headers}
+
+            def body_stream():
+                sent[0] = 0
+                for chunk in chunks():
+                    sent[0] += len(chunk)
+                    yield chunk
+
+        def send(auth_headers: Dict[str, str]):
+            def request():
+                return self._session.request(
+                    method, self._base_url + url, data=body_stream() if chunks is not None else body,
+                    headers={**auth_headers, **body_headers}, timeout=self._request_timeout(timeout, deadline), **kwargs,
+                )
+            return self._within_deadline(request, deadline) if deadline is not None else request()
+
+        auth_headers = self._headers
+        if hedge and self.hedger is not None:
+            response = self.hedger.call(url, lambda: send(auth_headers))
+        else:
+            response = send(auth_headers)
+        if response.status_code == 401:
+            self.logger.info("Access token was rejected. Logging in again.")
+            response.close()
+            self.login(stale_headers=auth_headers)
+            response = send(self._headers)
+        raw_size = raw_size or sent[0]
+        self._record_transfer(url, raw_size, sent[0], response, streamed=kwargs.get("stream", False))
+        return response
+
+    def _within_deadline(self, request: Callable[[], requests.Response], deadline: Deadline) -> requests.Response:
+        """Sends the request and reads its response, giving up when the deadline passes.
+
+        Socket timeouts only limit each read, so a response trickling in slowly would otherwise take
+        much longer than the deadline. The request is abandoned and its connection closed once it arrives.
+
+        Raises:
+            DeadlineExceeded: If the response isn't complete before the deadline.
+
+        """
+        future = self._deadline_executor.submit(request)
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeoutError:
+            if not future.cancel():
+                future.add_done_callback(lambda f: f.exception() is None and f.result().close())
+            raise DeadlineExceeded(f"Deadline of {deadline.seconds} seconds exceeded") from None
+
+    def get(self, url: str, params: Optional[Dict] = None, hedge: bool = False, **kwargs):
+        return self._request("GET", url, params=params, hedge=hedge, **kwargs)
+
+    def post(self, url: str, data: Optional[Dict] = None, params: Optional[Dict] = None, hedge: bool = False, **kwargs):
+        return self._request("POST", url, data=data, params=params, hedge=hedge, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self._request("DELETE", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self._request("PUT", url, **kwargs)
@@ -0,0 +1,51 @@
+import gzip
+from typing import Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SUPPORTED_COMPRESSIONS = ('gzip', 'zstd')
+
+
+def validate_compression(method: str) -> None:
+    "Raises if the compression method can't be used."
+    if method not in SUPPORTED_COMPRESSIONS:
+        raise ValueError(f"Compression '{method}' isn't supported. Please select one from {SUPPORTED_COMPRESSIONS}")
+    if method == 'zstd' and zstandard is None:
+        raise ImportError("Compression 'zstd' requires `zstandard` package. Install it with `pip install agents-bar[zstd]`.")
+
+
+def compress(data: bytes, method: str) -> bytes:
+    """Compresses request body.
+
+    Parameters:
+        data (bytes): Raw body.
+        method (str): Either 'gzip' or 'zstd'.
+
+    Returns:
+        Compressed body, suitable to be sent with `Content-Encoding: <method>` header.
+
+    """
+    if method == 'gzip':
+        # Level 5 is much faster than default 9 and for JSON numbers almost as good
+        return gzip.compress(data, compresslevel=5)
+    if method == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unknown compression '{method}'")
+
+
+def maybe_compress(data: bytes, method: str, threshold: int) -> Tuple[bytes, str]:
+    """Compresses body only if it's worth it.
+
+    Returns:
+        Tuple with body and its content encoding. The encoding is an empty string if body wasn't compressed.
+
+    """
+    if not method or len(data) < threshold:
+        return data, ""
+    compressed = compress(data, method)
+    if len(compressed) >= len(data):
+        return data, ""
+    return compressed, method
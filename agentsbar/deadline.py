@@ -0,0 +1,106 @@
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from agentsbar.types import ActionType, DataSpace
+
+Timeout = Union[float, Tuple[float, float], None]  #: Either total seconds or a (connect, read) tuple
+
+FALLBACKS = ('last', 'random')  #: Named fallback policies
+
+
+class DeadlineExceeded(TimeoutError):
+    "Raised when a call, including all its retries, didn't finish within its deadline."
+
+
+class Deadline:
+    """
+    Time budget of a single call, including all of its retries.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_seconds(cls, seconds: Optional[float]) -> Optional["Deadline"]:
+        return cls(seconds) if seconds is not None else None
+
+    def remaining(self) -> float:
+        return max(0., self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        "Raises :py:class:`DeadlineExceeded` if there's no time left."
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline of {self.seconds} seconds exceeded")
+
+    def cap(self, timeout: Timeout) -> Timeout:
+        """Limits request's timeout to the remaining time.
+
+        Parameters:
+            timeout: Request's timeout, either seconds or (connect, read) tuple. None means no timeout.
+
+        Returns:
+            Timeout in the same form, with each part no larger than the remaining time.
+
+        """
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) if part is not None else remaining for part in timeout)
+        return min(timeout, remaining)
+
+
+def random_action(space: Union[DataSpace, Dict, None], discrete: bool) -> ActionType:
+    """Samples a uniformly random action from the action space.
+
+    Discrete spaces have actions in [low, high) range, e.g. `DataSpace(dtype='int', low=0, high=2)`
+    has actions 0 and 1. Continuous actions are sampled from [low, high], defaulting to [0, 1].
+
+    """
+    if space is None:
+        raise ValueError("Can't sample a random action without knowing the action space. Sync the agent first.")
+    space = space if isinstance(space, dict) else vars(space)
+    low, high, shape = space.get('low'), space.get('high'), space.get('shape') or (1,)
+    if discrete:
+        if high is None:
+            raise ValueError("Can't sample a random discrete action without knowing action space's `high`")
+        return random.randrange(int(low or 0), int(high))
+
+    size = 1
+    for dim in shape:
+        size *= int(dim)
+    lows = low if isinstance(low, (list, tuple)) else [0. if low is None else low] * size
+    highs = high if isinstance(high, (list, tuple)) else [1. if high is None else high] * size
+    return [random.uniform(lo, hi) for (lo, hi) in zip(lows, highs)]
+
+
+def fallback_action(
+    fallback: Union[str, Callable[[Any], ActionType]],
+    obs: Any,
+    last_action: Optional[ActionType],
+    space: Union[DataSpace, Dict, None],
+    discrete: bool,
+) -> ActionType:
+    """Action to use when the agent didn't respond in time.
+
+    Parameters:
+        fallback: Either 'last' (last action, or random if there's none), 'random', or a function of observation.
+        obs: Observation for which action was requested.
+        last_action: Last action returned by the agent, if any.
+        space: Agent's action space.
+        discrete (bool): Whether actions are discrete.
+
+    """
+    if callable(fallback):
+        return fallback(obs)
+    if fallback not in FALLBACKS:
+        raise ValueError(f"Fallback '{fallback}' isn't supported. Please select one from {FALLBACKS} or pass a function")
+    if fallback == 'last' and last_action is not None:
+        return last_action
+    return random_action(space, discrete)
@@ -0,0 +1,294 @@
+import base64
+import bisect
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterator, List, Optional, Set
+
+from agentsbar.client import Client
+from agentsbar.types import EncodedAgentState, SnapshotManifest
+from agentsbar.utils import is_missing_endpoint, response_raise_error_if_any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "agentsbar", "chunks")
+CHUNKED_FIELDS = ("encoded_network", "encoded_buffer")  #: Snapshot's fields which are split into chunks
+DELTA_ENDPOINT = "/snapshots/delta"
+
+# Gear hash table. Has to be the same everywhere so that the same content is cut in the same places.
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "little") for i in range(256)]
+
+
+def _gear_candidates(data: bytes, mask: int) -> List[int]:
+    """Positions after which the rolling gear hash of the preceding 32 bytes matches the mask.
+
+    Hash is `h = (h << 1) + GEAR[byte]` on 32 bits so it only depends on the last 32 bytes,
+    which allows computing it for all positions at once with NumPy.
+
+    """
+    if np is not None:
+        values = np.array(_GEAR, dtype=np.uint32)[np.frombuffer(data, dtype=np.uint8)]
+        hashes = values.copy()
+        for shift in range(1, 32):
+            hashes[shift:] += values[:-shift] << np.uint32(shift)
+        return (np.flatnonzero((hashes & np.uint32(mask)) == 0) + 1).tolist()
+
+    candidates, h = [], 0
+    for (idx, byte) in enumerate(data):
+        h = ((h << 1) + _GEAR[byte]) & 0xFFFFFFFF
+        if not h & mask:
+            candidates.append(idx + 1)
+    return candidates
+
+
+def chunk_boundaries(
+    data: bytes, avg_size: int = 1 << 16, min_size: Optional[int] = None, max_size: Optional[int] = None,
+) -> List[int]:
+    """Content-defined chunking. Cuts are placed where content's rolling hash matches a pattern,
+    so an insertion or removal only changes chunks around it and the rest of them stay the same.
+
+    Parameters:
+        data (bytes): Content to split.
+        avg_size (int): Expected chunk size. Rounded down to a power of two. Default: 64 KiB.
+        min_size (optional int): Minimum chunk size, except for the last one. Default: `avg_size / 4`.
+        max_size (optional int): Maximum chunk size. Default: `avg_size * 4`.
+
+    Returns:
+        End offsets of consecutive chunks. The last one is `len(data)`.
+
+    """
+    bits = max(avg_size.bit_length() - 1, 1)
+    min_size = min_size if min_size is not None else avg_size // 4
+    max_size = max_size if max_size is not None else avg_size * 4
+    # High bits depend on all 32 hashed bytes, low bits only on the last few
+    candidates = _gear_candidates(data, ((1 << bits) - 1) << (32 - bits))
+
+    cuts: List[int] = []
+    start = 0
+    while start < len(data):
+        idx = bisect.bisect_left(candidates, start + max(min_size, 1))
+        cut = candidates[idx] if idx < len(candidates) and candidates[idx] <= start + max_size else start + max_size
+        start = min(cut, len(data))
+        cuts.append(start)
+    return cuts
+
+
+def split(data: bytes, avg_size: int = 1 << 16) -> Iterator[bytes]:
+    "Splits data into content-defined chunks. See :py:func:`chunk_boundaries`."
+    start = 0
+    for end in chunk_boundaries(data, avg_size):
+        yield data[start:end]
+        start = end
+
+
+def chunk_hash(chunk: bytes) -> str:
+    return hashlib.sha256(chunk).hexdigest()
+
+
+class ChunkStore(object):
+    """
+    On-disk content-addressed store of snapshots' chunks and manifests.
+
+    Besides chunks, which allow reconstructing any stored snapshot, it remembers which snapshot
+    was last uploaded for each agent. That one is the base for the next delta upload.
+
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Parameters:
+            directory (optional str): Where to keep chunks. Defaults to `~/.cache/agentsbar/chunks`.
+
+        """
+        self.directory = directory or DEFAULT_STORE_DIR
+        for subdirectory in ("chunks", "manifests", "bases"):
+            os.makedirs(os.path.join(self.directory, subdirectory), exist_ok=True)
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "chunks", digest[:2], digest)
+
+    def _write(self, path: str, data: bytes) -> None:
+        "Atomically writes a file so that readers never see partial content."
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(self._chunk_path(digest))
+
+    def put(self, data: bytes) -> str:
+        "Stores a chunk, unless it's already present, and returns its hash."
+        digest = chunk_hash(data)
+        if not self.has(digest):
+            self._write(self._chunk_path(digest), data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), "rb") as f:
+            return f.read()
+
+    def save_manifest(self, manifest: SnapshotManifest) -> str:
+        path = os.path.join(self.directory, "manifests", manifest.digest + ".json")
+        self._write(path, json.dumps(dataclasses.asdict(manifest)).encode())
+        return manifest.digest
+
+    def load_manifest(self, digest: str) -> SnapshotManifest:
+        with open(os.path.join(self.directory, "manifests", digest + ".json")) as f:
+            return SnapshotManifest(**json.load(f))
+
+    def _base_path(self, base_url: str, agent_name: str) -> str:
+        key = hashlib.sha256(f"{base_url}\n{agent_name}".encode()).hexdigest()
+        return os.path.join(self.directory, "bases", key)
+
+    def base(self, base_url: str, agent_name: str) -> Optional[SnapshotManifest]:
+        "Manifest of the snapshot last uploaded for the agent, if it's known."
+        try:
+            with open(self._base_path(base_url, agent_name)) as f:
+                return self.load_manifest(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def set_base(self, base_url: str, agent_name: str, manifest: SnapshotManifest) -> None:
+        self.save_manifest(manifest)
+        self._write(self._base_path(base_url, agent_name), manifest.digest.encode())
+
+    def forget_base(self, base_url: str, agent_name: str) -> None:
+        "Next upload will send the whole snapshot, e.g. because agent's snapshot was replaced by other means."
+        path = self._base_path(base_url, agent_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def gc(self, keep: Optional[Set[str]] = None) -> int:
+        """Removes manifests which aren't anyone's base, except those in `keep`, and chunks that no manifest uses.
+
+        Returns:
+            Number of removed chunks.
+
+        """
+        keep = set(keep or ())
+        bases_dir = os.path.join(self.directory, "bases")
+        for name in os.listdir(bases_dir):
+            with open(os.path.join(bases_dir, name)) as f:
+                keep.add(f.read().strip())
+
+        used: Set[str] = set()
+        manifests_dir = os.path.join(self.directory, "manifests")
+        for name in os.listdir(manifests_dir):
+            if not name.endswith(".json"):
+                continue
+            digest = name[:-len(".json")]
+            if digest not in keep:
+                os.remove(os.path.join(manifests_dir, name))
+                continue
+            for hashes in self.load_manifest(digest).chunks.values():
+                used.update(hashes)
+
+        removed = 0
+        chunks_dir = os.path.join(self.directory, "chunks")
+        for prefix in os.listdir(chunks_dir):
+            for name in os.listdir(os.path.join(chunks_dir, prefix)):
+                if name not in used:
+                    os.remove(os.path.join(chunks_dir, prefix, name))
+                    removed += 1
+        return removed
+
+
+def make_manifest(state: EncodedAgentState, store: ChunkStore, avg_size: int = 1 << 16) -> SnapshotManifest:
+    """Splits snapshot's network and buffer into chunks, which are put in the store.
+
+    Chunking is done on decoded values since base64 shifts the encoding of everything after an insertion.
+
+    """
+    chunks = {}
+    for field in CHUNKED_FIELDS:
+        chunks[field] = [store.put(chunk) for chunk in split(base64.b64decode(getattr(state, field)), avg_size)]
+    return SnapshotManifest(
+        model=state.model, obs_size=state.obs_size, action_size=state.action_size,
+        encoded_config=state.encoded_config, chunks=chunks,
+    )
+
+
+def reconstruct(manifest: SnapshotManifest, store: ChunkStore) -> EncodedAgentState:
+    "Assembles full snapshot from its manifest and stored chunks."
+    values = {
+        field: base64.b64encode(b"".join(store.get(digest) for digest in digests)).decode()
+        for (field, digests) in manifest.chunks.items()
+    }
+    return EncodedAgentState(
+        model=manifest.model, obs_size=manifest.obs_size, action_size=manifest.action_size,
+        encoded_config=manifest.encoded_config, **values,
+    )
+
+
+def upload(client: Client, agent_name: str, state: EncodedAgentState, store: ChunkStore, avg_size: int = 1 << 16) -> int:
+    """Uploads only the parts of the snapshot that changed since the last upload.
+
+    The service gets the manifest, i.e. ordered hashes of the new snapshot's chunks, together with chunks
+    missing from the previous (base) snapshot. If the service asks for chunks it doesn't have, they're sent once more.
+    Services without the delta endpoint get the whole snapshot.
+
+    Parameters:
+        client (Client): Authenticated client.
+        agent_name (str): Name of agent.
+        state (EncodedAgentState): Snapshot to upload.
+        store (ChunkStore): Local store of chunks and bases.
+        avg_size (int): Expected chunk size in bytes. Default: 64 KiB.
+
+    Returns:
+        Number of chunk bytes sent. For full uploads it's the size of decoded network and buffer.
+
+    """
+    manifest = make_manifest(state, store, avg_size)
+    try:
+        sent = _upload_delta(client, agent_name, manifest, store) if client.supports(DELTA_ENDPOINT) else None
+        if sent is None:
+            sent = _upload_full(client, agent_name, state)
+    finally:
+        client.metadata_cache.invalidate('agent', agent_name)
+    store.set_base(client._base_url, agent_name, manifest)
+    return sent
+
+
+def _upload_delta(client: Client, agent_name: str, manifest: SnapshotManifest, store: ChunkStore) -> Optional[int]:
+    "Sends delta against the base. Returns None if the service doesn't support delta uploads."
+    base = store.base(client._base_url, agent_name)
+    known = {digest for hashes in base.chunks.values() for digest in hashes} if base is not None else set()
+    missing = {digest for hashes in manifest.chunks.values() for digest in hashes if digest not in known}
+    response = _post_delta(client, agent_name, manifest, base, missing, store)
+    if is_missing_endpoint(client, response):
+        client.mark_unsupported(DELTA_ENDPOINT)
+        return None
+    if response.status_code == 409:
+        # Service doesn't have everything from the base, e.g. the snapshot was replaced in the meantime
+        detail = client.decode(response)
+        detail = detail.get("detail", detail) if isinstance(detail, dict) else None
+        detail = detail if isinstance(detail, dict) else {}  # Might be just a message
+        missing = set(detail.get("missing") or (digest for hashes in manifest.chunks.values() for digest in hashes))
+        response = _post_delta(client, agent_name, manifest, base, missing, store)
+    response_raise_error_if_any(response)
+    return sum(len(store.get(digest)) for digest in missing)
+
+
+def _post_delta(
+    client: Client, agent_name: str, manifest: SnapshotManifest, base: Optional[SnapshotManifest],
+    missing: Set[str], store: ChunkStore,
+):
+    data = {
+        "base": base.digest if base is not None else None,
+        "manifest": {**dataclasses.asdict(manifest), "digest": manifest.digest},
+        "chunks": {digest: base64.b64encode(store.get(digest)).decode() for digest in missing},
+    }
+    return client.post(f"/snapshots/{agent_name}/delta", data=data)
+
+
+def _upload_full(client: Client, agent_name: str, state: EncodedAgentState) -> int:
+    response = client.post(f"/snapshots/{agent_name}", data=dataclasses.asdict(state))
+    response_raise_error_if_any(response)
+    return sum(len(getattr(state, field)) * 3 // 4 for field in CHUNKED_FIELDS)
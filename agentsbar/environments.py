@@ -1,8 +1,9 @@
 from dataclasses import asdict
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
+from agentsbar.bulk import iter_pages, run_many
 from agentsbar.client import Client
-from agentsbar.types import EnvironmentCreate
+from agentsbar.types import BulkResult, EnvironmentCreate
 from agentsbar.utils import response_raise_error_if_any
 
 ENV_PREFIX = "/environments"
@@ -19,7 +20,23 @@ def get_many(client: Client) -> List[Dict]:
 
     """
     response = client.get(f"{ENV_PREFIX}/")
-    return response.json()
+    return client.decode(response)
+
+
+def iter_many(client: Client, page_size: int = 100) -> Iterator[Dict]:
+    """Iterates over environments belonging to authenticated user, fetching them page by page.
+
+    Unlike :py:func:`get_many`, the whole listing is never held in memory and each page is parsed while it's downloaded.
+
+    Parameters:
+        client (Client): Authenticated client.
+        page_size (int): Number of environments fetched per request. Default: 100.
+
+    Returns:
+        Iterator over environments.
+
+    """
+    return iter_pages(client, f"{ENV_PREFIX}/", page_size)
 
 
 def get(client: Client, env_name: str) -> Dict:
@@ -33,9 +50,9 @@ def get(client: Client, env_name: str) -> Dict:
         Details of an environment.
 
     """
-    response = client.get(f'{ENV_PREFIX}/{env_name}')
+    response = client.get(f'{ENV_PREFIX}/{env_name}', hedge=True)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def create(client: Client, env_create: EnvironmentCreate) -> Dict:
@@ -52,7 +69,7 @@ def create(client: Client, env_create: EnvironmentCreate) -> Dict:
     env_create_dict = asdict(env_create)
     response = client.post(f'{ENV_PREFIX}/', data=env_create_dict)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def delete(client: Client, env_name: str) -> bool:
@@ -71,6 +88,36 @@ def delete(client: Client, env_name: str) -> bool:
     return response.status_code == 202
 
 
+def create_many(client: Client, env_creates: Iterable[EnvironmentCreate], max_workers: int = 8) -> List[BulkResult]:
+    """Creates many environments concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        env_creates (Iterable of EnvironmentCreate): Configurations of environments.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each environment, in the same order. Successful ones have environment's details in `result`.
+
+    """
+    return run_many(lambda spec: create(client, spec), env_creates, lambda spec: spec.name, max_workers)
+
+
+def delete_many(client: Client, env_names: Iterable[str], max_workers: int = 8) -> List[BulkResult]:
+    """Deletes many environments concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        env_names (Iterable of str): Names of environments.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each environment, in the same order. `result` tells whether it was deleted, as in :py:func:`delete`.
+
+    """
+    return run_many(lambda name: delete(client, name), env_names, lambda name: name, max_workers)
+
+
 def reset(client: Client, env_name: str) -> List[float]:
     """Resets the environment to starting position.
 
@@ -84,7 +131,7 @@ def reset(client: Client, env_name: str) -> List[float]:
     """
     response = client.post(f"{ENV_PREFIX}/{env_name}/reset")
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def step(client: Client, env_name: str, step) -> Dict[str, Any]:
@@ -101,7 +148,7 @@ def step(client: Client, env_name: str, step) -> Dict[str, Any]:
     """
     response = client.post(f"{ENV_PREFIX}/{env_name}/step", data=step)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def commit(client: Client, env_name: str) -> Dict[str, Any]:
@@ -120,10 +167,10 @@ def commit(client: Client, env_name: str) -> Dict[str, Any]:
     """
     response = client.post(f"{ENV_PREFIX}/{env_name}/commit")
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def info(client: Client, env_name: str) -> Dict[str, Any]:
-    response = client.get(f"{ENV_PREFIX}/{env_name}/info")
+    response = client.get(f"{ENV_PREFIX}/{env_name}/info", hedge=True)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
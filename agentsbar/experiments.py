@@ -1,8 +1,9 @@
 from dataclasses import asdict
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from agentsbar.bulk import iter_pages, run_many
 from agentsbar.client import Client
-from agentsbar.types import ExperimentCreate
+from agentsbar.types import BulkResult, ExperimentCreate
 from agentsbar.utils import response_raise_error_if_any
 
 EXP_PREFIX = "/experiments"
@@ -19,7 +20,23 @@ def get_many(client: Client) -> List[Dict]:
 
     """
     response = client.get(f"{EXP_PREFIX}/")
-    return response.json()
+    return client.decode(response)
+
+
+def iter_many(client: Client, page_size: int = 100) -> Iterator[Dict]:
+    """Iterates over experiments that belong to an authenticated user, fetching them page by page.
+
+    Unlike :py:func:`get_many`, the whole listing is never held in memory and each page is parsed while it's downloaded.
+
+    Parameters:
+        client (Client): Authenticated client.
+        page_size (int): Number of experiments fetched per request. Default: 100.
+
+    Returns:
+        Iterator over experiments.
+
+    """
+    return iter_pages(client, f"{EXP_PREFIX}/", page_size)
 
 
 def get(client: Client, exp_name: str) -> Dict:
@@ -33,9 +50,9 @@ def get(client: Client, exp_name: str) -> Dict:
         Details of an experiment.
 
     """
-    response = client.get(f'{EXP_PREFIX}/{exp_name}')
+    response = client.get(f'{EXP_PREFIX}/{exp_name}', hedge=True)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def create(client: Client, experiment_create: ExperimentCreate) -> Dict:
@@ -51,7 +68,7 @@ def create(client: Client, experiment_create: ExperimentCreate) -> Dict:
     """
     response = client.post(f'{EXP_PREFIX}/', data=asdict(experiment_create))
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def delete(client: Client, exp_name: str) -> bool:
@@ -70,6 +87,36 @@ def delete(client: Client, exp_name: str) -> bool:
     return response.status_code == 202
 
 
+def create_many(client: Client, experiment_creates: Iterable[ExperimentCreate], max_workers: int = 8) -> List[BulkResult]:
+    """Creates many experiments concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        experiment_creates (Iterable of ExperimentCreate): Configurations of experiments.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each experiment, in the same order. Successful ones have experiment's details in `result`.
+
+    """
+    return run_many(lambda spec: create(client, spec), experiment_creates, lambda spec: spec.name, max_workers)
+
+
+def delete_many(client: Client, exp_names: Iterable[str], max_workers: int = 8) -> List[BulkResult]:
+    """Deletes many experiments concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        exp_names (Iterable of str): Names of experiments.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each experiment, in the same order. `result` tells whether it was deleted, as in :py:func:`delete`.
+
+    """
+    return run_many(lambda name: delete(client, name), exp_names, lambda name: name, max_workers)
+
+
 def reset(client: Client, exp_name: str) -> str:
     """Resets the experiment to starting position.
 
@@ -86,7 +133,7 @@ def reset(client: Client, exp_name: str) -> str:
     """
     response = client.post(f"{EXP_PREFIX}/{exp_name}/reset")
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def start(client: Client, exp_name: str, config: Optional[Dict] = None) -> str:
@@ -129,4 +176,4 @@ def metrics(
     """
     response = client.post(f"{EXP_PREFIX}/{exp_name}/metrics", data=metric_names, params=dict(limit=limit))
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
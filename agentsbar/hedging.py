@@ -0,0 +1,132 @@
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+
+@dataclass
+class HedgePolicy:
+    """
+    When to send a duplicate (hedged) request.
+
+    A duplicate is sent if there's no response after `delay` seconds or, if `delay` isn't set,
+    after the `percentile` of recently observed latencies of the endpoint. Until there are
+    `min_samples` observations nothing is hedged. At most `budget` fraction of requests are hedged
+    so that hedging can't double the load on a struggling service.
+
+    """
+    delay: Optional[float] = None
+    percentile: float = 95.
+    min_samples: int = 20
+    budget: float = 0.05
+    window: int = 1000
+
+
+class Hedger:
+    """
+    Sends duplicates of slow, side-effect free requests and uses whichever response comes first.
+
+    Requests that already started can't be interrupted, so the slower response is simply
+    discarded (and its connection released) when it arrives.
+
+    """
+
+    def __init__(self, policy: HedgePolicy, max_workers: int = 10):
+        self.policy = policy
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Hedger")
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._tokens = 1.
+        self._lock = threading.Lock()
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        "Seconds after which a request to the endpoint is hedged. None if there isn't enough data yet."
+        if self.policy.delay is not None:
+            return self.policy.delay
+        with self._lock:
+            samples = sorted(self._latencies.get(endpoint, ()))
+        if len(samples) < self.policy.min_samples:
+            return None
+        idx = min(len(samples) - 1, int(len(samples) * self.policy.percentile / 100))
+        return samples[idx]
+
+    def call(self, endpoint: str, send: Callable):
+        """Calls `send`, hedging it if it's slow and the budget allows.
+
+        Parameters:
+            endpoint (str): Endpoint's path, used for latency tracking.
+            send (Callable): Function sending the request and returning response. Has to be safe to call twice.
+
+        Returns:
+            The first received response. If the first attempt raised, the other one is awaited.
+
+        """
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(1., self._tokens + self.policy.budget)
+
+        delay = self.delay(endpoint)
+        start = time.monotonic()
+        primary = self._executor.submit(send)
+        if delay is None:
+            return self._record(endpoint, start, primary.result())
+        try:
+            return self._record(endpoint, start, primary.result(timeout=delay))
+        except FutureTimeoutError:
+            pass
+
+        if not self._take_token():
+            return self._record(endpoint, start, primary.result())
+
+        hedge = self._executor.submit(send)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for other in pending:
+                    self._discard(other)
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                # For a lost primary this is only a lower bound, but ignoring it would bias delay down
+                return self._record(endpoint, start, future.result())
+        raise error
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.:
+                return False
+            self._tokens -= 1.
+            self.hedged += 1
+            return True
+
+    def _record(self, endpoint: str, start: float, response):
+        "Records latency of the original request."
+        with self._lock:
+            samples = self._latencies.setdefault(endpoint, collections.deque(maxlen=self.policy.window))
+            samples.append(time.monotonic() - start)
+        return response
+
+    @staticmethod
+    def _discard(future: Future) -> None:
+        if future.cancel():
+            return
+
+        def close(f: Future):
+            if f.exception() is None and hasattr(f.result(), "close"):
+                f.result().close()
+        future.add_done_callback(close)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -1,8 +1,9 @@
 from dataclasses import asdict
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from agentsbar.bulk import iter_pages, run_many
 from agentsbar.client import Client
-from agentsbar.types import LeagueConfig, LeagueCreate
+from agentsbar.types import BulkResult, LeagueConfig, LeagueCreate
 from agentsbar.utils import response_raise_error_if_any
 
 LEAGUE_PREFIX = "/leagues"
@@ -19,7 +20,23 @@ def get_many(client: Client) -> List[Dict]:
 
     """
     response = client.get(f"{LEAGUE_PREFIX}/")
-    return response.json()
+    return client.decode(response)
+
+
+def iter_many(client: Client, page_size: int = 100) -> Iterator[Dict]:
+    """Iterates over leagues that belong to an authenticated user, fetching them page by page.
+
+    Unlike :py:func:`get_many`, the whole listing is never held in memory and each page is parsed while it's downloaded.
+
+    Parameters:
+        client (Client): Authenticated client.
+        page_size (int): Number of leagues fetched per request. Default: 100.
+
+    Returns:
+        Iterator over leagues.
+
+    """
+    return iter_pages(client, f"{LEAGUE_PREFIX}/", page_size)
 
 
 def get(client: Client, league_name: str) -> Dict:
@@ -33,9 +50,9 @@ def get(client: Client, league_name: str) -> Dict:
         Details of an league.
 
     """
-    response = client.get(f'{LEAGUE_PREFIX}/{league_name}')
+    response = client.get(f'{LEAGUE_PREFIX}/{league_name}', hedge=True)
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def create(client: Client, league_create: LeagueCreate) -> Dict:
@@ -51,7 +68,7 @@ def create(client: Client, league_create: LeagueCreate) -> Dict:
     """
     response = client.post(f'{LEAGUE_PREFIX}/', data=asdict(league_create))
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def delete(client: Client, league_name: str) -> bool:
@@ -70,6 +87,36 @@ def delete(client: Client, league_name: str) -> bool:
     return response.status_code == 202
 
 
+def create_many(client: Client, league_creates: Iterable[LeagueCreate], max_workers: int = 8) -> List[BulkResult]:
+    """Creates many leagues concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        league_creates (Iterable of LeagueCreate): Configurations of leagues.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each league, in the same order. Successful ones have league's details in `result`.
+
+    """
+    return run_many(lambda spec: create(client, spec), league_creates, lambda spec: spec.name, max_workers)
+
+
+def delete_many(client: Client, league_names: Iterable[str], max_workers: int = 8) -> List[BulkResult]:
+    """Deletes many leagues concurrently. Failure of one doesn't stop others.
+
+    Parameters:
+        client (Client): Authenticated client.
+        league_names (Iterable of str): Names of leagues.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each league, in the same order. `result` tells whether it was deleted, as in :py:func:`delete`.
+
+    """
+    return run_many(lambda name: delete(client, name), league_names, lambda name: name, max_workers)
+
+
 def reset(client: Client, league_name: str) -> str:
     """Resets the league to starting position.
 
@@ -85,7 +132,7 @@ def reset(client: Client, league_name: str) -> str:
     """
     response = client.post(f"{LEAGUE_PREFIX}/{league_name}/reset")
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
 
 
 def start(client: Client, league_name: str, config: Optional[Dict] = None) -> str:
@@ -128,4 +175,4 @@ def metrics(
     """
     response = client.post(f"{LEAGUE_PREFIX}/{league_name}/metrics", data=metric_names, params=dict(limit=limit))
     response_raise_error_if_any(response)
-    return response.json()
+    return client.decode(response)
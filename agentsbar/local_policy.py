@@ -0,0 +1,150 @@
+import base64
+import gzip
+import io
+import json
+import random
+import zlib
+from typing import Any, Dict, List, Tuple
+
+from agentsbar.types import EncodedAgentState
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+LOCAL_MODELS = ('dqn',)  #: Models that can be evaluated locally
+
+# Keys under which agents keep their acting (online) network, in order of preference
+_ACTING_NETWORK_KEYS = ('net', 'local', 'policy', 'actor', 'q_network')
+
+
+def decode_network(encoded_network: str) -> Dict[str, Any]:
+    """Decodes `encoded_network` of :py:class:`agentsbar.types.EncodedAgentState`.
+
+    The network is base64 encoded and optionally gzip/zlib compressed. Its content is either
+    json with parameters as (nested) lists, or a `torch.save` archive (requires `torch`).
+    Pickles other than torch's aren't loaded.
+
+    Returns:
+        Nested dictionary with parameters as NumPy arrays.
+
+    """
+    if np is None:
+        raise ImportError("Local inference requires `numpy`. Install it with `pip install agents-bar[numpy]`.")
+    data = base64.b64decode(encoded_network)
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    elif data[:1] == b"\x78":
+        data = zlib.decompress(data)
+
+    if data.lstrip()[:1] == b"{":
+        return _to_numpy(json.loads(data))
+    if torch is not None:
+        # Snapshots come from the network so only tensors are loaded, not arbitrary pickled objects
+        return _to_numpy(torch.load(io.BytesIO(data), map_location="cpu", weights_only=True))
+    raise ValueError("Unsupported network encoding. Networks saved with `torch` require `torch` to be installed.")
+
+
+def _to_numpy(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _to_numpy(v) for (k, v) in obj.items()}
+    if hasattr(obj, "detach"):  # torch tensor
+        return obj.detach().cpu().numpy()
+    if isinstance(obj, list):
+        return np.asarray(obj, dtype=np.float32)
+    return obj
+
+
+def _acting_parameters(network: Dict[str, Any]) -> Dict[str, "np.ndarray"]:
+    "Selects parameters of the acting network and flattens them into `state_dict` like dictionary."
+    for key in _ACTING_NETWORK_KEYS:
+        if isinstance(network.get(key), dict):
+            network = network[key]
+            break
+
+    flat = {}
+
+    def flatten(prefix: str, obj: Any):
+        if isinstance(obj, dict):
+            for (k, v) in obj.items():
+                flatten(f"{prefix}.{k}" if prefix else k, v)
+        elif hasattr(obj, "shape"):
+            flat[prefix] = obj
+    flatten("", network)
+    return flat
+
+
+def _linear_layers(params: Dict[str, "np.ndarray"]) -> List[Tuple["np.ndarray", "np.ndarray"]]:
+    "Pairs weights with biases, in the order they're stored."
+    layers = []
+    for (name, weight) in params.items():
+        if not name.endswith("weight") or weight.ndim != 2:
+            continue
+        bias = params.get(name[:-len("weight")] + "bias")
+        layers.append((weight, bias if bias is not None else np.zeros(weight.shape[0], dtype=weight.dtype)))
+    return layers
+
+
+def _mlp(layers: List[Tuple["np.ndarray", "np.ndarray"]], x: "np.ndarray", last_activation: bool = False) -> "np.ndarray":
+    for (idx, (weight, bias)) in enumerate(layers):
+        x = x @ weight.T + bias
+        if idx < len(layers) - 1 or last_activation:
+            x = np.maximum(x, 0)
+    return x
+
+
+class LocalPolicy:
+    """
+    Greedy policy evaluated locally on CPU with NumPy, e.g. a DQN's Q-network.
+
+    Networks are treated as fully connected layers with ReLU activations. Dueling networks,
+    i.e. with parameters under `value` and `advantage` prefixes, are supported as well.
+
+    """
+
+    def __init__(self, params: Dict[str, "np.ndarray"]):
+        value = {k: v for (k, v) in params.items() if "value" in k.split(".")[0]}
+        advantage = {k: v for (k, v) in params.items() if "advantage" in k.split(".")[0]}
+        shared = {k: v for (k, v) in params.items() if k not in value and k not in advantage}
+
+        self._shared = _linear_layers(shared)
+        self._value = _linear_layers(value)
+        self._advantage = _linear_layers(advantage)
+        if not self._shared and not self._advantage:
+            raise ValueError("Network doesn't have any fully connected layers")
+
+    @classmethod
+    def from_state(cls, state: EncodedAgentState) -> "LocalPolicy":
+        "Creates policy from agent's snapshot. See :py:meth:`agentsbar.RemoteAgent.get_state`."
+        if state.model.lower() not in LOCAL_MODELS:
+            raise ValueError(f"Model '{state.model}' can't be evaluated locally. Supported models: {LOCAL_MODELS}")
+        return cls(_acting_parameters(decode_network(state.encoded_network)))
+
+    def q_values(self, obs) -> "np.ndarray":
+        "Action values for a single observation or a batch of them."
+        x = np.asarray(obs, dtype=np.float32)
+        if self._advantage:
+            features = _mlp(self._shared, x, last_activation=True) if self._shared else x
+            value = _mlp(self._value, features)
+            advantage = _mlp(self._advantage, features)
+            return value + advantage - advantage.mean(axis=-1, keepdims=True)
+        return _mlp(self._shared, x)
+
+    def act(self, obs, noise: float = 0) -> int:
+        """Epsilon-greedy action.
+
+        Parameters:
+            obs: Single observation.
+            noise (float): Probability of taking uniformly random action. Default: 0.
+
+        """
+        q_values = self.q_values(obs)
+        if noise > 0 and random.random() < noise:
+            return random.randrange(q_values.shape[-1])
+        return int(np.argmax(q_values))
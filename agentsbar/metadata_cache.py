@@ -0,0 +1,78 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class MetadataCache:
+    """
+    Short-lived cache of entities' metadata, e.g. agent's details, shared by everything using the same client.
+
+    Entries are keyed by (entity, name), e.g. ('agent', 'CartPoleAgent'), and expire after `ttl` seconds.
+    Concurrent lookups of a missing entry result in a single fetch.
+
+    """
+
+    def __init__(self, ttl: float = 1.0):
+        """
+        Parameters:
+            ttl (float): Seconds for which fetched metadata is considered fresh. Zero disables caching. Default: 1.
+
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._fetch_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def get(self, entity: str, name: str, fetch: Callable[[], Any]) -> Any:
+        """Returns cached metadata or fetches it if it's missing or expired.
+
+        Parameters:
+            entity (str): Type of entity, e.g. 'agent'.
+            name (str): Name of the entity.
+            fetch (Callable): Function fetching metadata from the service. Exceptions aren't cached.
+
+        """
+        key = (entity, name)
+        value = self._lookup(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+        with fetch_lock:
+            # Someone else might have fetched it while we were waiting
+            value = self._lookup(key, count=False)
+            if value is not None:
+                return value
+            value = fetch()
+            if self.ttl > 0:
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    def invalidate(self, entity: str, name: Optional[str] = None) -> None:
+        "Removes cached metadata of the entity, or all entities of the type if name isn't provided."
+        with self._lock:
+            if name is not None:
+                self._entries.pop((entity, name), None)
+                return
+            for key in [key for key in self._entries if key[0] == entity]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key: Tuple[str, str], count: bool = True) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                if count:
+                    self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            if count:
+                self.misses += 1
+            return None
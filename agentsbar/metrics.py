@@ -0,0 +1,188 @@
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from agentsbar import experiments, leagues
+from agentsbar.client import Client
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_FETCHERS = {'experiment': experiments.metrics, 'league': leagues.metrics}
+
+Points = Tuple["np.ndarray", "np.ndarray"]  #: Indices and values of a metric
+
+
+class MetricSeries:
+    """
+    Growable pair of NumPy columns with metric's indices (int64) and values (float64).
+
+    Appending is amortized O(1) per point since capacity doubles when it runs out.
+
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if np is None:
+            raise ImportError("Metric series require `numpy`. Install it with `pip install agents-bar[numpy]`.")
+        self._index = np.empty(capacity, dtype=np.int64)
+        self._value = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def index(self) -> "np.ndarray":
+        "Read-only view of indices."
+        view = self._index[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def value(self) -> "np.ndarray":
+        "Read-only view of values."
+        view = self._value[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def append(self, index: "np.ndarray", value: "np.ndarray") -> None:
+        needed = self._size + len(index)
+        if needed > len(self._index):
+            capacity = max(needed, 2 * len(self._index))
+            self._index = np.resize(self._index, capacity)
+            self._value = np.resize(self._value, capacity)
+        self._index[self._size:needed] = index
+        self._value[self._size:needed] = value
+        self._size = needed
+
+
+class MetricsTailer:
+    """
+    Follows metrics of a running experiment or league, fetching only samples that weren't seen yet.
+
+    The service only returns the last `limit` samples, so the tailer remembers the last seen index
+    of each metric. If all returned samples are new, some might have been missed and the metric is
+    fetched again with double the limit. The limit then shrinks back to what recent polls needed,
+    so each poll costs about the number of new samples.
+
+    Usage::
+
+        tailer = MetricsTailer(client, 'experiment', 'MyExperiment', poll_interval=5)
+        for new_points in tailer:
+            index, value = new_points['episode/score']
+            ...
+
+    """
+
+    logger = logging.getLogger("MetricsTailer")
+
+    def __init__(
+        self, client: Client, entity: str, name: str, metric_names: Optional[List[str]] = None,
+        poll_interval: float = 5., since: Optional[int] = None, min_limit: int = 16, max_limit: int = 10000,
+    ):
+        """
+        Parameters:
+            client (Client): Authenticated client.
+            entity (str): Either 'experiment' or 'league'.
+            name (str): Name of the experiment or league.
+            metric_names (optional list of str): Metrics to follow. Defaults to all available.
+            poll_interval (float): Seconds between polls when iterating or running in background. Default: 5.
+            since (optional int): Only samples with greater index are fetched, e.g. -1 for the whole history.
+                Defaults to starting from the latest samples.
+            min_limit (int): The smallest number of samples requested per poll. Default: 16.
+            max_limit (int): The largest number of samples requested per poll. Samples beyond
+                that many since the last poll are skipped. Default: 10000.
+
+        """
+        assert entity in _FETCHERS, f"Only {tuple(_FETCHERS)} have metrics"
+        if np is None:
+            raise ImportError("Metrics tailer requires `numpy`. Install it with `pip install agents-bar[numpy]`.")
+        self._client = client
+        self._fetch: Callable = _FETCHERS[entity]
+        self.name = name
+        self.metric_names = metric_names
+        self.poll_interval = poll_interval
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+
+        self.series: Dict[str, MetricSeries] = {}  #: All samples seen so far
+        self._since = since
+        self._last_index: Dict[str, int] = {}
+        self._limit = max_limit if since is not None else min_limit
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self) -> Dict[str, Points]:
+        """Fetches samples added since the last poll.
+
+        Returns:
+            New samples of metrics that have any, as (index, value) arrays sorted by index.
+
+        """
+        names, limit = self.metric_names, self._limit
+        fetched: Dict[str, Points] = {}
+        while True:
+            gapped = []
+            for (metric, points) in self._fetch(self._client, self.name, names, limit=limit).items():
+                index = np.fromiter((p[0] for p in points), dtype=np.int64, count=len(points))
+                value = np.fromiter((p[1] for p in points), dtype=np.float64, count=len(points))
+                last = self._last_index.get(metric, self._since)
+                # All returned samples are new so there might be more of them
+                is_full = last is not None and len(points) >= limit and len(index) > 0 and index.min() > last
+                if is_full and limit < self.max_limit:
+                    gapped.append(metric)
+                    continue
+                if is_full:
+                    self.logger.warning("Some samples of '%s' were missed. Increase `max_limit` or poll more often.", metric)
+                order = np.argsort(index, kind="stable")
+                keep = order[index[order] > last] if last is not None else order
+                fetched[metric] = (index[keep], value[keep])
+            if not gapped:
+                break
+            names, limit = gapped, min(2 * limit, self.max_limit)
+
+        new_points: Dict[str, Points] = {}
+        for (metric, (index, value)) in fetched.items():
+            if not len(index):
+                continue
+            self.series.setdefault(metric, MetricSeries()).append(index, value)
+            self._last_index[metric] = int(index[-1])
+            new_points[metric] = (index, value)
+
+        most_new = max((len(index) for (index, _) in new_points.values()), default=0)
+        self._limit = min(self.max_limit, max(self.min_limit, 2 * most_new))
+        return new_points
+
+    def __iter__(self) -> Iterator[Dict[str, Points]]:
+        "Polls every `poll_interval` seconds, yielding new samples whenever there are any, until :py:meth:`stop`."
+        self._stop.clear()
+        while not self._stop.is_set():
+            new_points = self.poll()
+            if new_points:
+                yield new_points
+            self._stop.wait(self.poll_interval)
+
+    def start(self, callback: Callable[[Dict[str, Points]], None]) -> "MetricsTailer":
+        """Polls in a background thread, calling `callback` with new samples. Failed polls are logged and retried."""
+        def run():
+            while not self._stop.is_set():
+                try:
+                    new_points = self.poll()
+                    if new_points:
+                        callback(new_points)
+                except Exception as e:
+                    self.logger.warning("Failed to poll metrics of '%s': %s", self.name, e)
+                self._stop.wait(self.poll_interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name=f"MetricsTailer-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
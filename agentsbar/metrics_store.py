@@ -0,0 +1,268 @@
+import os
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from agentsbar.metrics import Points
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MAGIC = b"ABMS"
+_HEADER = struct.Struct("<4sIQQ")  # magic, version, block size, number of samples
+_HEADER_SIZE = 64
+_SUFFIX = ".col"
+
+
+class MetricColumn:
+    """
+    Append-only, memory-mapped file with a single metric's samples.
+
+    Samples are stored in blocks of `block_size` indices followed by as many values,
+    so that searching by index doesn't touch values and a range query only reads the blocks it needs.
+    Indices have to be non-decreasing.
+
+    """
+
+    def __init__(self, path: str, block_size: int = 4096, readonly: bool = False):
+        if np is None:
+            raise ImportError("Metrics store requires `numpy`. Install it with `pip install agents-bar[numpy]`.")
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+
+        if not os.path.exists(path):
+            if readonly:
+                raise FileNotFoundError(path)
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, 1, block_size, 0).ljust(_HEADER_SIZE, b"\0"))
+        with open(path, "rb") as f:
+            magic, _, self.block_size, self._size = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"'{path}' isn't a metric column")
+        self._dtype = np.dtype([("index", "<i8", (self.block_size,)), ("value", "<f8", (self.block_size,))])
+        self._blocks: Optional["np.memmap"] = None
+        self._map()
+
+    def _map(self) -> None:
+        count = (os.path.getsize(self.path) - _HEADER_SIZE) // self._dtype.itemsize
+        self._blocks = None
+        if count > 0:
+            mode = "r" if self.readonly else "r+"
+            self._blocks = np.memmap(self.path, dtype=self._dtype, mode=mode, offset=_HEADER_SIZE, shape=(count,))
+
+    @property
+    def _capacity(self) -> int:
+        return 0 if self._blocks is None else len(self._blocks) * self.block_size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def refresh(self) -> None:
+        "Picks up samples appended by another process."
+        with open(self.path, "rb") as f:
+            self._size = _HEADER.unpack(f.read(_HEADER.size))[3]
+        if self._size > self._capacity:
+            self._map()
+
+    def append(self, index, value) -> None:
+        """Appends samples. Indices have to be sorted and not smaller than the last stored one.
+
+        Parameters:
+            index (array-like): Samples' indices.
+            value (array-like): Samples' values.
+
+        """
+        index = np.asarray(index, dtype=np.int64)
+        value = np.asarray(value, dtype=np.float64)
+        if not len(index):
+            return
+        with self._lock:
+            last = self._index_at(self._size - 1) if self._size else None
+            if (last is not None and index[0] < last) or np.any(np.diff(index) < 0):
+                raise ValueError("Indices have to be non-decreasing")
+
+            needed = self._size + len(index)
+            if needed > self._capacity:
+                blocks = max(-(-needed // self.block_size), 2 * (len(self._blocks) if self._blocks is not None else 0))
+                if self._blocks is not None:
+                    self._blocks.flush()
+                with open(self.path, "r+b") as f:
+                    f.truncate(_HEADER_SIZE + blocks * self._dtype.itemsize)
+                self._map()
+
+            written = 0
+            for (block, start, stop) in self._block_slices(self._size, needed):
+                count = stop - start
+                self._blocks[block]["index"][start:stop] = index[written:written + count]
+                self._blocks[block]["value"][start:stop] = value[written:written + count]
+                written += count
+            self._blocks.flush()
+            # Size goes last so that readers never see samples which aren't written yet
+            self._size = needed
+            with open(self.path, "r+b") as f:
+                f.write(_HEADER.pack(_MAGIC, 1, self.block_size, self._size))
+
+    def _block_slices(self, start: int, stop: int) -> Iterator[Tuple[int, int, int]]:
+        "Splits positions [start, stop) into (block, start within block, stop within block)."
+        while start < stop:
+            block, offset = divmod(start, self.block_size)
+            count = min(self.block_size - offset, stop - start)
+            yield block, offset, offset + count
+            start += count
+
+    def _index_at(self, position: int) -> int:
+        block, offset = divmod(position, self.block_size)
+        return int(self._blocks[block]["index"][offset])
+
+    def _position(self, index: int) -> int:
+        "Position of the first sample with index not smaller than `index`."
+        if not self._size:
+            return 0
+        blocks = -(-self._size // self.block_size)
+        # Blocks' first indices are enough to tell which block to search
+        firsts = self._blocks["index"][:blocks, 0]
+        block = max(int(np.searchsorted(firsts, index)) - 1, 0)
+        stop = min(self.block_size, self._size - block * self.block_size)
+        offset = int(np.searchsorted(self._blocks[block]["index"][:stop], index))
+        if offset == stop and block + 1 < blocks:
+            return (block + 1) * self.block_size
+        return block * self.block_size + offset
+
+    def _bounds(self, start: Optional[int], stop: Optional[int]) -> Tuple[int, int]:
+        begin = self._position(start) if start is not None else 0
+        end = self._position(stop) if stop is not None else self._size
+        return begin, max(begin, end)
+
+    def range(self, start: Optional[int] = None, stop: Optional[int] = None) -> Points:
+        """Samples with `start <= index < stop`.
+
+        Returns:
+            Copies of (index, value) arrays.
+
+        """
+        begin, end = self._bounds(start, stop)
+        index = np.empty(end - begin, dtype=np.int64)
+        value = np.empty(end - begin, dtype=np.float64)
+        written = 0
+        for (block, lo, hi) in self._block_slices(begin, end):
+            index[written:written + hi - lo] = self._blocks[block]["index"][lo:hi]
+            value[written:written + hi - lo] = self._blocks[block]["value"][lo:hi]
+            written += hi - lo
+        return index, value
+
+    def downsample(self, buckets: int, start: Optional[int] = None, stop: Optional[int] = None) -> Dict[str, "np.ndarray"]:
+        """Summarizes samples in `buckets` equally wide index ranges, e.g. for plotting.
+
+        Parameters:
+            buckets (int): Number of buckets.
+            start (optional int): Lowest index. Defaults to the first sample.
+            stop (optional int): Index after the highest one. Defaults to after the last sample.
+
+        Returns:
+            Dictionary with `edges` (buckets + 1 indices) and per bucket `min`, `max`, `mean` and `count`.
+            Empty buckets have NaN statistics.
+
+        """
+        begin, end = self._bounds(start, stop)
+        low = start if start is not None else (self._index_at(begin) if end > begin else 0)
+        high = stop if stop is not None else (self._index_at(end - 1) + 1 if end > begin else low + 1)
+        edges = np.linspace(low, high, buckets + 1)
+        minimum = np.full(buckets, np.inf)
+        maximum = np.full(buckets, -np.inf)
+        total = np.zeros(buckets)
+        count = np.zeros(buckets, dtype=np.int64)
+
+        for (block, lo, hi) in self._block_slices(begin, end):
+            index = self._blocks[block]["index"][lo:hi]
+            value = self._blocks[block]["value"][lo:hi]
+            # Samples are sorted so each bucket is a contiguous segment
+            bounds = np.searchsorted(index, edges[1:-1], side="left")
+            segments = np.concatenate(([0], bounds))
+            non_empty = np.flatnonzero(np.diff(np.concatenate((segments, [len(index)]))) > 0)
+            starts = segments[non_empty]
+            minimum[non_empty] = np.minimum(minimum[non_empty], np.minimum.reduceat(value, starts))
+            maximum[non_empty] = np.maximum(maximum[non_empty], np.maximum.reduceat(value, starts))
+            total[non_empty] += np.add.reduceat(value, starts)
+            count[non_empty] += np.diff(np.concatenate((starts, [len(index)])))
+
+        empty = count == 0
+        minimum[empty] = maximum[empty] = np.nan
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(empty, np.nan, total / count)
+        return {"edges": edges, "min": minimum, "max": maximum, "mean": mean, "count": count}
+
+    def close(self) -> None:
+        if self._blocks is not None and not self.readonly:
+            self._blocks.flush()
+        self._blocks = None
+
+
+class MetricsStore:
+    """
+    Local store of metrics with one memory-mapped :py:class:`MetricColumn` file per metric.
+
+    Suits long runs with millions of samples, e.g. fed by :py:class:`agentsbar.metrics.MetricsTailer`::
+
+        store = MetricsStore("metrics/MyExperiment")
+        tailer.start(store.extend)
+        summary = store.downsample("episode/score", buckets=500)
+
+    """
+
+    def __init__(self, directory: str, block_size: int = 4096, readonly: bool = False):
+        """
+        Parameters:
+            directory (str): Where metrics' files are kept.
+            block_size (int): Number of samples per block of new files. Default: 4096.
+            readonly (bool): Whether to only read, e.g. while another process appends. Default: False.
+
+        """
+        self.directory = directory
+        self.block_size = block_size
+        self.readonly = readonly
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        self._columns: Dict[str, MetricColumn] = {}
+        self._lock = threading.Lock()
+
+    def metrics(self) -> List[str]:
+        "Names of stored metrics."
+        return sorted(unquote(name[:-len(_SUFFIX)]) for name in os.listdir(self.directory) if name.endswith(_SUFFIX))
+
+    def column(self, metric: str) -> MetricColumn:
+        with self._lock:
+            if metric not in self._columns:
+                path = os.path.join(self.directory, quote(metric, safe="") + _SUFFIX)
+                self._columns[metric] = MetricColumn(path, self.block_size, readonly=self.readonly)
+            column = self._columns[metric]
+        if self.readonly:
+            column.refresh()
+        return column
+
+    def append(self, metric: str, index, value) -> None:
+        self.column(metric).append(index, value)
+
+    def extend(self, points: Dict[str, Points]) -> None:
+        "Appends samples of many metrics, e.g. as returned by :py:meth:`agentsbar.metrics.MetricsTailer.poll`."
+        for (metric, (index, value)) in points.items():
+            self.append(metric, index, value)
+
+    def range(self, metric: str, start: Optional[int] = None, stop: Optional[int] = None) -> Points:
+        "Samples with `start <= index < stop`. See :py:meth:`MetricColumn.range`."
+        return self.column(metric).range(start, stop)
+
+    def downsample(
+        self, metric: str, buckets: int, start: Optional[int] = None, stop: Optional[int] = None,
+    ) -> Dict[str, "np.ndarray"]:
+        "Min, max and mean of samples in equally wide index ranges. See :py:meth:`MetricColumn.downsample`."
+        return self.column(metric).downsample(buckets, start, stop)
+
+    def close(self) -> None:
+        with self._lock:
+            for column in self._columns.values():
+                column.close()
+            self._columns.clear()
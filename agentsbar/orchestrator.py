@@ -0,0 +1,232 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from agentsbar import agents, environments, experiments
+from agentsbar.client import Client
+from agentsbar.types import AgentCreate, EnvironmentCreate, ExperimentCreate, SetupResult
+from agentsbar.waiter import _check, _listing
+
+Key = Tuple[str, str]  #: (entity, name)
+
+
+class Orchestrator:
+    """
+    Sets up an experiment for every pair of agents and environments, i.e. their cross product, concurrently.
+
+    Agents and environments are created at once by a bounded pool of workers. Each experiment is created
+    as soon as its agent and environment exist, and started as soon as both are active. Readiness of all
+    pending entities is checked together, with one listing per entity type, rather than one by one.
+
+    Similarly to `LeagueConfig.parallel`, at most `max_parallel` experiments are brought up at a time.
+    An experiment takes a slot when it's being started and frees it once it's active or has failed.
+
+    Usage::
+
+        orchestrator = Orchestrator(client, agent_specs, env_specs, experiment_config={}, max_parallel=10)
+        results = orchestrator.run(timeout=600)
+        failed = [result for result in results.values() if result.error or result.timed_out]
+
+    """
+
+    logger = logging.getLogger("Orchestrator")
+
+    def __init__(
+        self,
+        client: Client,
+        agent_specs: Iterable[AgentCreate],
+        env_specs: Iterable[EnvironmentCreate],
+        experiment_config: Optional[Dict[str, Any]] = None,
+        name_format: str = "{agent}-{environment}",
+        description: Optional[str] = None,
+        start: bool = True,
+        start_config: Optional[Dict] = None,
+        max_workers: int = 8,
+        max_parallel: Optional[int] = None,
+        exist_ok: bool = True,
+        poll_interval: float = 0.5,
+    ):
+        """
+        Parameters:
+            client (Client): Authenticated client.
+            agent_specs (Iterable of AgentCreate): Agents to create.
+            env_specs (Iterable of EnvironmentCreate): Environments to create.
+            experiment_config (optional dict): Configuration of each experiment. Default: empty.
+            name_format (str): Experiments' names, formatted with `agent` and `environment` names.
+                Default: "{agent}-{environment}".
+            description (optional str): Description of each experiment.
+            start (bool): Whether to start experiments. Default: True.
+            start_config (optional dict): Configuration passed when starting each experiment.
+            max_workers (int): Maximum number of concurrent requests. Default: 8.
+            max_parallel (optional int): Maximum number of experiments being started at a time. Default: no limit.
+            exist_ok (bool): Whether entities that already exist are used as they are rather than created. Default: True.
+            poll_interval (float): Seconds between readiness checks. Default: 0.5.
+
+        """
+        self._client = client
+        self.agent_specs = list(agent_specs)
+        self.env_specs = list(env_specs)
+        self.start = start
+        self.start_config = start_config
+        self.max_workers = max_workers
+        self.max_parallel = max_parallel
+        self.exist_ok = exist_ok
+        self.poll_interval = poll_interval
+
+        #: Experiments to set up keyed by name, together with names of their agent and environment
+        self.experiment_specs: Dict[str, Tuple[ExperimentCreate, str, str]] = {}
+        for agent in self.agent_specs:
+            for env in self.env_specs:
+                name = name_format.format(agent=agent.name, environment=env.name)
+                spec = ExperimentCreate(
+                    name=name, agent_names=[agent.name], environment_names=[env.name],
+                    config=dict(experiment_config or {}), description=description,
+                )
+                self.experiment_specs[name] = (spec, agent.name, env.name)
+
+        self._results: Dict[Key, SetupResult] = {}
+        self._futures: Dict[Future, Tuple[str, Key]] = {}
+        self._starting: Set[str] = set()  # Experiments holding a `max_parallel` slot
+        self._start_time = 0.
+
+    def run(self, timeout: float = 600.) -> Dict[Key, SetupResult]:
+        """Sets up everything, returning once all experiments are started (or active, if not starting them),
+        have failed, or `timeout` seconds passed.
+
+        Returns:
+            Result for each (entity, name) pair, including agents and environments.
+
+        """
+        start_time = time.monotonic()
+        results: Dict[Key, SetupResult] = {}
+        for agent in self.agent_specs:
+            results[('agent', agent.name)] = SetupResult(entity='agent', name=agent.name)
+        for env in self.env_specs:
+            results[('environment', env.name)] = SetupResult(entity='environment', name=env.name)
+        for name in self.experiment_specs:
+            results[('experiment', name)] = SetupResult(entity='experiment', name=name)
+
+        self._results, self._start_time = results, start_time
+        self._futures, self._starting = {}, set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            existing = self._existing(executor) if self.exist_ok else set()
+            for key in existing & set(results):
+                results[key].created = True
+            for agent in self.agent_specs:
+                self._submit(executor, 'create', ('agent', agent.name), agents.create, agent)
+            for env in self.env_specs:
+                self._submit(executor, 'create', ('environment', env.name), environments.create, env)
+
+            next_check = 0.
+            while True:
+                self._collect()
+                self._create_experiments(executor)
+                now = time.monotonic()
+                if now >= next_check:
+                    self._check_ready(executor)
+                    next_check = now + self.poll_interval
+                self._start_experiments(executor)
+
+                remaining = timeout - (time.monotonic() - start_time)
+                if all(self._is_settled(key) for key in results) or remaining <= 0:
+                    break
+                delay = min(remaining, max(next_check - time.monotonic(), 0.))
+                if self._futures:
+                    wait(list(self._futures), timeout=delay, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(delay)
+
+        for (key, result) in results.items():
+            if not self._is_settled(key):
+                result.timed_out = True
+                result.elapsed = time.monotonic() - start_time
+        return results
+
+    def _existing(self, executor: ThreadPoolExecutor) -> Set[Key]:
+        listings = {entity: executor.submit(_listing, self._client, entity) for entity in ('agent', 'environment', 'experiment')}
+        return {(entity, name) for (entity, future) in listings.items() for name in (future.result() or {})}
+
+    def _submit(self, executor: ThreadPoolExecutor, stage: str, key: Key, fn, *args) -> None:
+        if stage == 'create' and self._results[key].created:
+            return
+        self._futures[executor.submit(fn, self._client, *args)] = (stage, key)
+
+    def _collect(self) -> None:
+        "Updates results with finished requests."
+        for future in [future for future in self._futures if future.done()]:
+            stage, key = self._futures.pop(future)
+            result = self._results[key]
+            error = future.exception()
+            if error is not None:
+                self.logger.warning("Failed to %s %s '%s': %s", stage, key[0], key[1], error)
+                self._fail(key, f"Failed to {stage}: {error}")
+            elif stage == 'create':
+                result.created = True
+            else:
+                result.started = True
+
+    def _fail(self, key: Key, error: str) -> None:
+        result = self._results[key]
+        result.error = error
+        result.elapsed = time.monotonic() - self._start_time
+        if key[0] == 'experiment':
+            self._starting.discard(key[1])
+
+    def _dependencies(self, exp_name: str) -> List[SetupResult]:
+        _, agent_name, env_name = self.experiment_specs[exp_name]
+        return [self._results[('agent', agent_name)], self._results[('environment', env_name)]]
+
+    def _create_experiments(self, executor: ThreadPoolExecutor) -> None:
+        for (name, (spec, _, _)) in self.experiment_specs.items():
+            key = ('experiment', name)
+            result = self._results[key]
+            if result.error or result.created or ('create', key) in self._futures.values():
+                continue
+            dependencies = self._dependencies(name)
+            failed = [d for d in dependencies if d.error]
+            if failed:
+                self._fail(key, f"Depends on {failed[0].entity} '{failed[0].name}' which failed")
+            elif all(d.created for d in dependencies):
+                self._submit(executor, 'create', key, experiments.create, spec)
+
+    def _start_experiments(self, executor: ThreadPoolExecutor) -> None:
+        if not self.start:
+            return
+        for name in self.experiment_specs:
+            if self.max_parallel is not None and len(self._starting) >= self.max_parallel:
+                return
+            key = ('experiment', name)
+            result = self._results[key]
+            if result.error or not result.created or result.started or name in self._starting:
+                continue
+            if all(d.ready for d in self._dependencies(name)):
+                self._starting.add(name)
+                self._futures[executor.submit(experiments.start, self._client, name, self.start_config)] = ('start', key)
+
+    def _check_ready(self, executor: ThreadPoolExecutor) -> None:
+        "Checks all created entities which aren't known to be active yet. Started experiments are checked to free their slots."
+        pending = [
+            key for (key, result) in self._results.items()
+            if result.created and not result.ready and not result.error
+            and (key[0] != 'experiment' or result.started or not self.start)
+        ]
+        if not pending:
+            return
+        for (key, (is_ready, error)) in _check(self._client, executor, pending, 'active').items():
+            if error is not None:
+                self.logger.debug("Couldn't check %s '%s': %s", key[0], key[1], error)
+            if is_ready:
+                self._results[key].ready = True
+                self._results[key].elapsed = time.monotonic() - self._start_time
+                if key[0] == 'experiment':
+                    self._starting.discard(key[1])
+
+    def _is_settled(self, key: Key) -> bool:
+        result = self._results[key]
+        if result.error:
+            return True
+        if key[0] == 'experiment' and self.start:
+            return result.started and result.ready
+        return result.ready
@@ -1,30 +1,49 @@
+import copy
 import dataclasses
 import logging
-from typing import Any, Dict, Optional, Union
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
 
-from tenacity import after_log, retry, stop_after_attempt, wait_fixed
+from requests.models import HTTPError
 
-from agentsbar import agents
+from agentsbar import agents, snapshots
 from .client import Client
-from .types import ActionType, AgentCreate, DataSpace, EncodedAgentState, ObsType
-from .utils import to_list
+from .deadline import Deadline, DeadlineExceeded, fallback_action
+from .delta import DEFAULT_STORE_DIR, ChunkStore
+from .delta import upload as upload_delta
+from .local_policy import LocalPolicy
+from .retry import RetryPolicy, call_with_retry
+from .snapshot_cache import SnapshotCache
+from .step_buffer import PartialSendError, StepBuffer
+from .step_pipeline import StepPipeline
+from .types import ActionType, AgentCreate, DataSpace, EncodedAgentState, ObsType, SnapshotFiles
+from .utils import encode_array, to_list
 
 SUPPORTED_MODELS = ['dqn', 'ppo', 'ddpg', 'rainbow']  #: Supported models
 
-global_logger = logging.getLogger("Global")
-
 
 class RemoteAgent:
     name = "RemoteAgent"
     default_url = "https://agents.bar"
     logger = logging.getLogger("RemoteAgent")
 
-    def __init__(self, client: Client, agent_name: str,  **kwargs):
+    def __init__(
+        self, client: Client, agent_name: str, *, array_encoding: str = "list",
+        retry_policy: Optional[RetryPolicy] = None, chunk_store: Optional[ChunkStore] = None, **kwargs,
+    ):
         """
         An instance of the agent in the Agents Bar.
 
         Parameters:
             description (str): Optional. Description for the model, if creating a new one.
+            array_encoding (str): How NumPy observations and actions are sent in `step`. Either "list",
+                i.e. converted to plain python lists, or "binary", i.e. array's buffer with dtype (from
+                agent's DataSpace) and shape. Binary requires support on the service side. Default: "list".
+            retry_policy (optional RetryPolicy): How failed `act`, `step` and snapshot requests are repeated.
+                Defaults to client's `retry_policy`.
+            chunk_store (optional ChunkStore): Local store of snapshots' chunks used by delta uploads.
+                Defaults to one in `~/.cache/agentsbar/chunks`, created on first delta upload.
 
         Keyword arguments:
             access_token (str): Default None. Access token to use for authentication. If none provided
@@ -34,6 +53,9 @@ class RemoteAgent:
 
         """
         self._client: Client = client
+        assert array_encoding in ("list", "binary"), "Array encoding can be either 'list' or 'binary'"
+        self._array_encoding = array_encoding
+        self.retry_policy: RetryPolicy = retry_policy or client.retry_policy
 
         self._config: Dict = {}
         self._config.update(**kwargs)
@@ -46,6 +68,18 @@ class RemoteAgent:
 
         self.agent_name = agent_name
         self._description: Optional[str] = None
+        self._step_buffer: Optional[StepBuffer] = None
+        self._step_pipeline: Optional[StepPipeline] = None
+
+        self._local_policy: Optional[LocalPolicy] = None
+        self._local_refresh_steps: Optional[int] = None
+        self._local_refresh_interval: Optional[float] = None
+        self._local_acts = 0
+        self._local_synced_at = 0.
+
+        self._chunk_store: Optional[ChunkStore] = chunk_store
+        self._last_action: Optional[ActionType] = None
+        self.fallback_count = 0  #: Number of times `act` returned fallback action because of deadline
 
     @property
     def obs_space(self):
@@ -143,13 +177,19 @@ class RemoteAgent:
     @property
     def exists(self):
         """Whether the agent service exists and is accessible"""
-        response = self._client.get(f"/agents/{self.agent_name}")
-        return response.ok
-    
+        try:
+            self._cached_info()
+        except HTTPError:
+            return False
+        return True
+
     @property
     def is_active(self):
-        j_response = agents.get(self._client, self.agent_name)
-        return j_response['is_active']
+        return self._cached_info()['is_active']
+
+    def _cached_info(self) -> Dict[str, Any]:
+        "Agent's metadata shared through client's metadata cache. Don't modify it."
+        return self._client.metadata_cache.get('agent', self.agent_name, lambda: agents.get(self._client, self.agent_name))
 
     @property
     def discrete(self):
@@ -163,6 +203,12 @@ class RemoteAgent:
         if model.lower() not in SUPPORTED_MODELS:
             raise ValueError(f"Model '{model}' isn't currently supported. Please select one from {SUPPORTED_MODELS}")
 
+    def _encode_values(self, x, space_name: str):
+        "Encodes observation or action for the wire. Only arrays are encoded in binary form."
+        if self._array_encoding == "binary" and hasattr(x, "dtype") and hasattr(x, "shape"):
+            return encode_array(x, getattr(self, space_name), raw=self._client._serializer.binary)
+        return to_list(x)
+
     @property
     def hparams(self) -> Dict[str, Union[str, float, int]]:
         """Agents hyperparameters
@@ -178,8 +224,13 @@ class RemoteAgent:
         return {k: make_str_or_number(v) for (k, v) in self._config.items()}
 
     def info(self) -> Dict[str, Any]:
-        """Gets agents meta-data from sever."""
-        info = agents.get(self._client, self.agent_name)
+        """Gets agents meta-data from sever.
+
+        Recently fetched meta-data, by any agent with the same name and client, is reused.
+        See `metadata_ttl` in :py:class:`agentsbar.Client`.
+
+        """
+        info = copy.deepcopy(self._cached_info())
         self._config = info.get('config', self._config)
         return info
 
@@ -192,46 +243,145 @@ class RemoteAgent:
         self._obs_space = self._config.get("obs_space")
         self._action_space = self._config.get("action_space")
 
-    @retry(stop=stop_after_attempt(3), reraise=True)
-    def get_state(self) -> EncodedAgentState:
+    def get_state(self, retry_policy: Optional[RetryPolicy] = None) -> EncodedAgentState:
         """Gets agents state in an encoded snapshot form.
 
-        *Note* that this API has a heavy rate limit.
+        *Note* that this API has a heavy rate limit. Its `Retry-After` is respected when retrying.
+
+        Parameters:
+            retry_policy (optional RetryPolicy): How failed downloads are repeated. Default: agent's `retry_policy`.
 
         Returns:
             Snapshot with config, buffer and network states being encoded.
 
         """
-        response = self._client.get(f"/snapshots/{self.agent_name}")
-        if not response.ok:
-            response.raise_for_status()
-        state = response.json()
+        def fetch():
+            response = self._client.get(f"/snapshots/{self.agent_name}", hedge=False)  # Rate limited
+            if not response.ok:
+                response.raise_for_status()
+            return self._client.decode(response)
+
+        state = self._with_retry(fetch, "/snapshots/{name}", retry_policy=retry_policy)
         return EncodedAgentState(**state)
+
+    def _with_retry(
+        self, fn: Callable[[], Any], endpoint: str, idempotent: bool = True, deadline: Optional[Deadline] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> Any:
+        "Calls `fn` according to agent's retry policy and endpoint's circuit breaker, within client's deadline."
+        breaker = self._client.circuit_breaker(endpoint.format(name=self.agent_name))
+        deadline = deadline or self._client._as_deadline(None)
+        retry_policy = retry_policy or self.retry_policy
+        return call_with_retry(fn, retry_policy, idempotent=idempotent, breaker=breaker, deadline=deadline)
     
-    def upload_state(self, state: EncodedAgentState) -> bool:
+    def upload_state(self, state: EncodedAgentState, delta: bool = False) -> bool:
         """Updates remote agent with provided state.
 
         Parameters:
             state: Agent's state with encoded values for buffer, config and network states.
+            delta (bool): Whether to only send chunks of network and buffer that changed since the last
+                delta upload. Makes frequent checkpoints cheap. See :py:func:`agentsbar.delta.upload`. Default: False.
+
+        Returns:
+            Bool confirmation whether update was successful.
+
+        """
+        try:
+            if delta:
+                if self._chunk_store is None:
+                    self._chunk_store = ChunkStore()
+                self._with_retry(
+                    lambda: upload_delta(self._client, self.agent_name, state, self._chunk_store), "/snapshots/{name}",
+                )
+                return True
+
+            # Service's snapshot is replaced, so the next delta can't be based on the last one
+            self._forget_delta_base()
+            j_state = dataclasses.asdict(state)
+            response = self._client.post(f"/snapshots/{self.agent_name}", data=j_state)
+            if not response.ok:
+                response.raise_for_status()  # Raises
+                return False  # Doesn't reach
+            return True
+        finally:
+            self._client.metadata_cache.invalidate('agent', self.agent_name)
+
+    def _forget_delta_base(self) -> None:
+        "Makes the next delta upload send everything. The default chunk store is only checked if it exists."
+        store = self._chunk_store
+        if store is None and os.path.isdir(DEFAULT_STORE_DIR):
+            store = self._chunk_store = ChunkStore()
+        if store is not None:
+            store.forget_base(self._client._base_url, self.agent_name)
+
+    def restore_state(self, cache: SnapshotCache, digest: Optional[str] = None, delta: bool = False) -> bool:
+        """Updates remote agent with a snapshot from the local cache.
+
+        Snapshots are stored in the cache e.g. by a :py:class:`agentsbar.snapshot_cache.Checkpointer`.
+
+        Parameters:
+            cache (SnapshotCache): Cache with agent's snapshots.
+            digest (optional str): Content hash of the snapshot. Defaults to the most recently used one.
+            delta (bool): Whether to upload only the changed chunks. See :py:meth:`upload_state`. Default: False.
 
         Returns:
             Bool confirmation whether update was successful.
 
         """
-        j_state = dataclasses.asdict(state)
-        response = self._client.post(f"/snapshots/{self.agent_name}", data=j_state)
-        if not response.ok:
-            response.raise_for_status()  # Raises
-            return False  # Doesn't reach
+        state = cache.get(self.agent_name, digest)
+        if state is None:
+            raise KeyError(f"There's no snapshot '{digest or 'latest'}' of agent '{self.agent_name}' in the cache")
+        return self.upload_state(state, delta=delta)
+
+    def download_state(self, directory: str) -> SnapshotFiles:
+        """Streams agent's snapshot to disk, resuming interrupted downloads where possible.
+
+        Unlike :py:meth:`get_state` the snapshot is never held in memory, which matters for large replay buffers.
+        See :py:func:`agentsbar.snapshots.download`.
+
+        Parameters:
+            directory (str): Where to store snapshot's files.
+
+        Returns:
+            Snapshot's files which can be uploaded with :py:meth:`upload_state_files`.
+
+        """
+        return snapshots.download(self._client, self.agent_name, directory, retry_policy=self.retry_policy)
+
+    def upload_state_files(self, files: Union[SnapshotFiles, str]) -> bool:
+        """Updates remote agent with a snapshot stored on disk, streaming it in chunks.
+
+        Parameters:
+            files (SnapshotFiles or str): Snapshot's files or their directory, e.g. from :py:meth:`download_state`.
+
+        Returns:
+            Bool confirmation whether update was successful.
+
+        """
+        if isinstance(files, str):
+            files = snapshots.open_directory(files)
+        self._forget_delta_base()
+        snapshots.upload(self._client, self.agent_name, files, retry_policy=self.retry_policy)
         return True
 
-    @retry(stop=stop_after_attempt(10), wait=wait_fixed(0.01), after=after_log(global_logger, logging.INFO))
-    def act(self, obs, noise: float = 0) -> ActionType:
+    def act(
+        self, obs, noise: float = 0, hedge: Optional[bool] = None, deadline: Optional[float] = None,
+        fallback: Union[str, Callable[[Any], ActionType], None] = None,
+    ) -> ActionType:
         """Asks for action based on provided observation.
 
         Parameters:
             obs (List floats): Python list of floats which represent agent's observation.
             noise (float): Default 0. Value for epsilon in epsilon-greedy paradigm.
+            hedge (optional bool): Whether a slow request can be duplicated, if client's hedging is enabled.
+                By default only deterministic requests, i.e. without noise, are hedged.
+            deadline (optional float): Seconds within which the action is needed, including retries.
+                Default: client's `deadline`.
+            fallback (optional str or Callable): Action to return when the deadline passes instead of raising
+                :py:class:`agentsbar.deadline.DeadlineExceeded`. Either 'last' (previous action, or random
+                if there's none), 'random' (sampled from `action_space`), or a function taking observation
+                and returning action. Random actions require agent's details, e.g. after :py:meth:`sync`.
+                Used fallbacks are counted in `fallback_count`. Default: None (raise).
 
         Returns:
             action (a number or list of numbers): Suggested action to take from this observation.
@@ -239,19 +389,117 @@ class RemoteAgent:
                 a list of either floats or ints.
 
         """
-        j_response = agents.act(self._client, agent_name=self.agent_name, params={"noise": noise}, obs=obs)
+        if self._local_policy is not None:
+            self._last_action = self._act_locally(obs, noise)
+            return self._last_action
+
+        deadline = self._client._as_deadline(deadline)
+        try:
+            j_response = self._with_retry(
+                lambda: agents.act(
+                    self._client, agent_name=self.agent_name, params={"noise": noise}, obs=to_list(obs),
+                    hedge=noise == 0 if hedge is None else hedge, deadline=deadline,
+                ),
+                "/agents/{name}/act", deadline=deadline,
+            )
+        except DeadlineExceeded as e:
+            if fallback is None:
+                raise
+            return self._fallback_action(fallback, obs, e)
 
         action = j_response['action']
+        self._last_action = int(action[0]) if self.discrete else action
+        return self._last_action
+
+    def _fallback_action(self, fallback: Union[str, Callable[[Any], ActionType]], obs, error: Exception) -> ActionType:
+        self.logger.debug("Agent '%s' didn't act in time (%s). Using '%s' fallback.", self.agent_name, error, fallback)
+        self.fallback_count += 1
+        # Agent's details are only used if already known, since there's no time left to fetch them
+        is_known = self._agent_model is not None
+        return fallback_action(
+            fallback, obs, self._last_action, self._action_space if is_known else None, is_known and self.discrete,
+        )
+
+    def enable_local_inference(
+        self, refresh_steps: Optional[int] = None, refresh_interval: Optional[float] = None,
+    ) -> LocalPolicy:
+        """Makes `act` evaluate agent's network locally instead of asking the service.
+
+        The network is downloaded with :py:meth:`get_state` and evaluated on CPU with NumPy.
+        Local network doesn't learn so it is re-synced after `refresh_steps` actions or
+        `refresh_interval` seconds, whichever comes first. Since the snapshot API is heavily
+        rate limited, keep these high, e.g. for evaluation rollouts. Only models in
+        :py:data:`agentsbar.local_policy.LOCAL_MODELS` are supported.
+
+        Parameters:
+            refresh_steps (optional int): Number of actions after which network is re-synced. Default: never.
+            refresh_interval (optional float): Seconds after which network is re-synced. Default: never.
+
+        Returns:
+            Local policy used by `act`.
+
+        """
+        self._local_refresh_steps = refresh_steps
+        self._local_refresh_interval = refresh_interval
+        self.sync_local_policy()
+        return self._local_policy
+
+    def disable_local_inference(self) -> None:
+        "Goes back to asking the service for actions."
+        self._local_policy = None
+
+    def sync_local_policy(self) -> None:
+        "Downloads current network for local inference."
+        self._local_policy = LocalPolicy.from_state(self.get_state())
+        self._local_acts = 0
+        self._local_synced_at = time.monotonic()
+
+    def _act_locally(self, obs, noise: float) -> int:
+        is_stale = (self._local_refresh_steps is not None and self._local_acts >= self._local_refresh_steps) \
+            or (self._local_refresh_interval is not None
+                and time.monotonic() - self._local_synced_at >= self._local_refresh_interval)
+        if is_stale:
+            try:
+                self.sync_local_policy()
+            except Exception as e:
+                # Keep using the current network and try again later
+                self.logger.warning("Failed to refresh local policy: %s", e)
+                self._local_acts = 0
+                self._local_synced_at = time.monotonic()
+        self._local_acts += 1
+        return self._local_policy.act(to_list(obs), noise)
+
+    def act_batch(self, observations, noise: float = 0) -> List[ActionType]:
+        """Asks for actions for many observations in a single round trip.
+
+        Useful with vectorized environments where otherwise each environment costs a request.
+
+        Parameters:
+            observations (List or array): Stacked observations, one per row.
+            noise (float): Default 0. Value for epsilon in epsilon-greedy paradigm.
+
+        Returns:
+            List of actions in the same order as observations. Each action is the same as returned by :py:meth:`act`.
+
+        """
+        j_responses = self._with_retry(
+            lambda: agents.act_batch(self._client, agent_name=self.agent_name, params={"noise": noise}, observations=observations),
+            "/agents/{name}/act",
+        )
+
+        actions = [j_response['action'] for j_response in j_responses]
         if self.discrete:
-            return int(action[0])
-        return action
+            return [int(action[0]) for action in actions]
+        return actions
 
-    @retry(stop=stop_after_attempt(5),  wait=wait_fixed(0.01), after=after_log(global_logger, logging.INFO), reraise=True)
     def step(self, obs: ObsType, action: ActionType, reward: float, next_obs: ObsType, done: bool) -> bool:
         """Providing information from taking a step in environment.
 
-        *Note* that all values have to be python plain values, like ints, floats, lists...
-        Unfortunately, numpy, pandas, tensors... aren't currently supported.
+        Values can be python plain values, like ints, floats, lists, or NumPy arrays.
+        Arrays are either converted to lists or, with `array_encoding="binary"`, sent as their buffers.
+
+        If batching is enabled, see :py:meth:`enable_step_buffer`, the step might only be buffered.
+        If pipelining is enabled, see :py:meth:`enable_pipelined_step`, the step is only queued.
 
         Parameters:
             obs (ObsType): Current observation.
@@ -262,10 +510,135 @@ class RemoteAgent:
 
         """
         step_data = {
-            "obs": to_list(obs), "next_obs": to_list(next_obs),
-            "action": to_list(action), "reward": reward, "done": done,
+            "obs": self._encode_values(obs, "obs_space"), "next_obs": self._encode_values(next_obs, "obs_space"),
+            "action": self._encode_values(action, "action_space"), "reward": reward, "done": done,
         }
-        data = {"step_data": step_data}
-
-        agents.step(client=self._client, agent_name=self.agent_name, step=data)
+        if self._step_pipeline is not None:
+            self._step_pipeline.put(step_data)
+            return True
+        if self._step_buffer is not None:
+            self._step_buffer.add(step_data, done=done)
+            return True
+
+        self._send_step(step_data)
         return True
+
+    def _send_step(self, step_data: Dict) -> None:
+        self._with_retry(
+            lambda: agents.step(client=self._client, agent_name=self.agent_name, step={"step_data": step_data}),
+            "/agents/{name}/step", idempotent=False,
+        )
+
+    def _send_steps(self, steps: List[Dict]) -> None:
+        "Sends steps in order. Retries resume after steps that were already sent."
+        sent = 0
+
+        def send():
+            nonlocal sent
+            try:
+                agents.step_many(self._client, self.agent_name, steps[sent:])
+            except PartialSendError as e:
+                sent += e.sent
+                raise e.error  # Retry policy judges the actual failure
+
+        try:
+            self._with_retry(send, "/agents/{name}/step", idempotent=False)
+        except Exception as e:
+            if sent:
+                raise PartialSendError(sent, e) from e
+            raise
+
+    def enable_step_buffer(self, max_size: int = 64, max_wait: Optional[float] = 1.0) -> StepBuffer:
+        """Makes `step` send transitions in batches rather than one request per transition.
+
+        Make sure to :py:meth:`flush` once done, otherwise up to `max_size` last steps might not be sent.
+
+        Parameters:
+            max_size (int): Number of buffered steps which are sent together. Default: 64.
+            max_wait (optional float): Maximum seconds a step waits in the buffer, checked on every `step`.
+                Default: 1 (second).
+
+        Returns:
+            Used step buffer.
+
+        """
+        self.flush()
+        self._step_buffer = StepBuffer(self._send_steps, max_size=max_size, max_wait=max_wait)
+        return self._step_buffer
+
+    def disable_step_buffer(self) -> None:
+        "Sends all buffered steps and goes back to sending a request per step."
+        self.flush()
+        self._step_buffer = None
+
+    def flush(self) -> int:
+        """Sends all buffered steps.
+
+        Returns:
+            Number of sent steps.
+
+        """
+        if self._step_buffer is None:
+            return 0
+        return self._step_buffer.flush()
+
+    def enable_pipelined_step(
+        self,
+        max_queue: int = 1024,
+        policy: str = 'block',
+        on_error: Optional[Callable[[Exception, List[Dict]], None]] = None,
+        max_batch: int = 64,
+    ) -> StepPipeline:
+        """Makes `step` only queue transitions which are then sent by a background worker.
+
+        Environment and `act` can run at full speed while learning data streams behind them.
+        Since `step` returns before data reaches the service, errors are reported to `on_error`.
+        Use :py:meth:`drain` to wait until everything is sent and :py:meth:`close` on shutdown.
+        This replaces batching with a step buffer, if it was enabled.
+
+        Parameters:
+            max_queue (int): Maximum number of steps waiting to be sent. Default: 1024.
+            policy (str): What happens when the queue is full. Either 'block' the `step` call,
+                'drop_oldest' queued step, or 'raise' :py:class:`agentsbar.step_pipeline.BackpressureError`.
+                Default: 'block'.
+            on_error (optional Callable): Called with an exception and the steps that failed to be sent.
+            max_batch (int): Maximum number of queued steps sent in one request. Default: 64.
+
+        Returns:
+            Used step pipeline.
+
+        """
+        self.disable_step_buffer()
+        self.close()
+        self._step_pipeline = StepPipeline(
+            self._send_steps, max_queue=max_queue, policy=policy, on_error=on_error, max_batch=max_batch,
+        )
+        return self._step_pipeline
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all buffered and queued steps are sent.
+
+        Parameters:
+            timeout (optional float): Maximum seconds to wait for the pipeline. Waits indefinitely if None.
+
+        Returns:
+            Whether all steps were processed before timeout.
+
+        """
+        self.flush()
+        if self._step_pipeline is None:
+            return True
+        return self._step_pipeline.drain(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Sends all pending steps and stops background sending. Following steps are sent directly.
+
+        Returns:
+            Whether all steps were processed before timeout.
+
+        """
+        self.flush()
+        if self._step_pipeline is None:
+            return True
+        pipeline, self._step_pipeline = self._step_pipeline, None
+        return pipeline.close(timeout)
@@ -0,0 +1,366 @@
+import copy
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from requests.models import HTTPError
+
+from agentsbar import environments
+from .client import Client
+from .retry import RetryPolicy, call_with_retry
+from .types import ActionType, AgentStep, EnvironmentCreate
+from .utils import unwrap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+PER_AGENT_KEYS = ("observation", "reward", "done")  #: Multi-agent environment's values which are by default per agent
+
+
+class VectorEnvError(RuntimeError):
+    """Raised when some environments of :py:class:`RemoteVectorEnv` failed.
+
+    Other environments' steps have already happened in the service, so their outcomes are kept in
+    `results`, in order, with None in place of failed ones. `errors` are exceptions by environment's index.
+    """
+
+    def __init__(self, results: List[Any], errors: Dict[int, BaseException]):
+        self.results = results
+        self.errors = errors
+        failures = "; ".join(f"[{idx}] {error}" for (idx, error) in sorted(errors.items()))
+        super().__init__(f"{len(errors)} of {len(results)} environments failed: {failures}")
+
+    @property
+    def index(self) -> int:
+        "Index of the first failed environment."
+        return min(self.errors)
+
+
+class RemoteEnvironment:
+    """
+    An instance of the environment in the Agents Bar. Counterpart of :py:class:`agentsbar.RemoteAgent`.
+
+    Environment's `info`, e.g. its spaces, doesn't change so it's fetched once and kept.
+    Use :py:meth:`sync` to fetch it again.
+
+    """
+    name = "RemoteEnvironment"
+    logger = logging.getLogger("RemoteEnvironment")
+
+    def __init__(self, client: Client, env_name: str, *, retry_policy: Optional[RetryPolicy] = None):
+        """
+        Parameters:
+            client (Client): Authenticated client.
+            env_name (str): Name of the environment.
+            retry_policy (optional RetryPolicy): How failed requests are repeated. Defaults to client's `retry_policy`.
+
+        """
+        self._client: Client = client
+        self.env_name = env_name
+        self.retry_policy: RetryPolicy = retry_policy or client.retry_policy
+        self._info: Optional[Dict[str, Any]] = None
+        self._info_lock = threading.Lock()
+
+    def create_env(
+        self, image: str, config: Dict[str, Any], description: Optional[str] = None, active: bool = True,
+    ) -> Dict:
+        """Creates a new environment in the service.
+
+        Parameters:
+            image (str): Environment's image, e.g. "agents-bar/env-gym".
+            config (dict): Environment's configuration, e.g. `{"gym_name": "CartPole-v1"}`.
+            description (optional str): Description of the environment.
+            active (bool): Whether to activate the environment.
+
+        Returns:
+            Details of created environment.
+
+        """
+        env_create = EnvironmentCreate(
+            name=self.env_name, image=image, config=config, description=description, is_active=active,
+        )
+        self._info = None
+        return environments.create(self._client, env_create)
+
+    def remove(self, *, env_name: str, quite: bool = True) -> bool:
+        """Deletes the environment. See :py:meth:`agentsbar.RemoteAgent.remove`.
+
+        Parameters:
+            env_name (str): Name of the environment, as a confirmation.
+            quite (bool): Silently ignores if provided env_name doesn't match actual name.
+
+        Returns:
+            Boolean whether an environment was deleted.
+
+        """
+        if env_name is None or self.env_name != env_name:
+            if quite:
+                self.logger.warning("You're request for deletion is being ignored. You're welcome.")
+                return False
+            raise ValueError("You wanted to delete an environment. Are you sure? If so, we need *again* its name.")
+
+        self.logger.warning("Environment '%s' is being removed", env_name)
+        self._info = None
+        return environments.delete(self._client, env_name)
+
+    @property
+    def exists(self) -> bool:
+        """Whether the environment exists and is accessible"""
+        try:
+            self._cached_details()
+        except HTTPError:
+            return False
+        return True
+
+    @property
+    def is_active(self) -> bool:
+        return self._cached_details()['is_active']
+
+    def _cached_details(self) -> Dict[str, Any]:
+        "Environment's details shared through client's metadata cache. Don't modify it."
+        return self._client.metadata_cache.get(
+            'environment', self.env_name, lambda: environments.get(self._client, self.env_name),
+        )
+
+    def info(self) -> Dict[str, Any]:
+        "Environment's info, e.g. its spaces. Fetched only on first use."
+        with self._info_lock:
+            if self._info is None:
+                self._info = self._with_retry(lambda: environments.info(self._client, self.env_name), "/environments/{name}/info")
+        return copy.deepcopy(self._info)
+
+    def sync(self) -> None:
+        "Fetches environment's info again."
+        with self._info_lock:
+            self._info = None
+        self.info()
+
+    @property
+    def obs_space(self) -> Any:
+        return self.info().get("observation_space")
+
+    @property
+    def action_space(self) -> Any:
+        return self.info().get("action_space")
+
+    def reset(self) -> List[float]:
+        """Resets the environment to starting position.
+
+        Returns:
+            Observation in the starting position.
+
+        """
+        return self._with_retry(
+            lambda: environments.reset(self._client, self.env_name), "/environments/{name}/reset", idempotent=False,
+        )
+
+    def step(self, action: ActionType, commit: bool = True) -> Dict[str, Any]:
+        """Takes action in the environment.
+
+        Parameters:
+            action (ActionType): Action to take. Values can be plain python values or NumPy arrays.
+            commit (bool): Whether environment transitions right away. Otherwise, use :py:meth:`commit`. Default: True.
+
+        Returns:
+            Environment's state after the step. Consists of "observation", "reward", "done" and "info".
+
+        """
+        return self.step_many([action], commit=commit)
+
+    def step_many(self, actions: Sequence[ActionType], commit: bool = True) -> Dict[str, Any]:
+        """Takes actions of many agents in a single request, e.g. in multi-agent environments.
+
+        Parameters:
+            actions (Sequence): Actions in the order of environment's agents.
+            commit (bool): Whether environment transitions right away. Default: True.
+
+        Returns:
+            Environment's state after the step. See :py:meth:`step`.
+
+        """
+        data = {"actions": [action.tolist() if hasattr(action, "tolist") else action for action in actions], "commit": commit}
+        return self._with_retry(
+            lambda: environments.step(self._client, self.env_name, data), "/environments/{name}/step", idempotent=False,
+        )
+
+    def step_agents(
+        self, agents: Sequence[Any], observations: Sequence[Any], noise: float = 0, max_workers: int = 8,
+        per_agent_keys: Sequence[str] = PER_AGENT_KEYS, **act_kwargs,
+    ) -> List[AgentStep]:
+        """Steps a multi-agent environment with actions of many agents in two round trips.
+
+        Agents act concurrently, then all actions are submitted and committed with a single request,
+        instead of one request per agent followed by a commit.
+
+        Parameters:
+            agents (Sequence of RemoteAgent): Agents in the order of environment's agents.
+            observations (Sequence): Each agent's current observation, in the same order.
+            noise (float): Default 0. Value for epsilon in epsilon-greedy paradigm.
+            max_workers (int): Maximum number of concurrent `act` requests. Default: 8.
+            per_agent_keys (Sequence of str): Keys of environment's state which are lists with an element
+                per agent, in the same order as agents. Other keys, e.g. a team reward, are shared by all agents.
+                Default: :py:data:`PER_AGENT_KEYS`, i.e. "observation", "reward" and "done".
+
+        Keyword arguments:
+            Passed to agents' `act`, e.g. `deadline` and `fallback`.
+
+        Returns:
+            Each agent's action and its part of environment's state, in the same order as agents.
+
+        Raises:
+            ValueError: If a value of `per_agent_keys` doesn't have an element per agent.
+                The environment has stepped nonetheless.
+
+        """
+        assert len(agents) == len(observations), "Each agent needs an observation"
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(agents))) as executor:
+            actions = list(executor.map(lambda agent, obs: agent.act(obs, noise=noise, **act_kwargs), agents, observations))
+        out = self.step_many(actions, commit=True)
+
+        for key in per_agent_keys:
+            value = out.get(key)
+            if not isinstance(value, list) or len(value) != len(agents):
+                raise ValueError(f"Expected '{key}' to have a value for each of {len(agents)} agents, got: {value}")
+
+        def part(key: str, idx: int):
+            return out[key][idx] if key in per_agent_keys else out.get(key)
+
+        return [
+            AgentStep(
+                agent_name=agent.agent_name,
+                action=action,
+                observation=part("observation", idx),
+                reward=part("reward", idx),
+                done=bool(part("done", idx)),
+                info=part("info", idx) or {},
+            )
+            for (idx, (agent, action)) in enumerate(zip(agents, actions))
+        ]
+
+    def commit(self) -> Dict[str, Any]:
+        "Commits previously provided actions. See :py:func:`agentsbar.environments.commit`."
+        return self._with_retry(
+            lambda: environments.commit(self._client, self.env_name), "/environments/{name}/commit", idempotent=False,
+        )
+
+    def _with_retry(self, fn: Callable[[], Any], endpoint: str, idempotent: bool = True) -> Any:
+        "Calls `fn` according to environment's retry policy and endpoint's circuit breaker, within client's deadline."
+        breaker = self._client.circuit_breaker(endpoint.format(name=self.env_name))
+        deadline = self._client._as_deadline(None)
+        return call_with_retry(fn, self.retry_policy, idempotent=idempotent, breaker=breaker, deadline=deadline)
+
+
+class RemoteVectorEnv:
+    """
+    Many remote environments stepped and reset together, concurrently, so that a tick costs
+    about a single round trip rather than one per environment.
+
+    Outputs are stacked along the first dimension, as NumPy arrays if NumPy is installed or lists otherwise.
+    With `auto_reset`, an environment that's done is reset right away: its returned observation is the first
+    of the next episode and the last one is in its info's "final_observation".
+
+    Usage::
+
+        envs = RemoteVectorEnv(client, ["CartPole-1", "CartPole-2", "CartPole-3"])
+        obs = envs.reset()
+        for _ in range(1000):
+            actions = agent.act_batch(obs)
+            obs, rewards, dones, infos = envs.step(actions)
+
+    """
+
+    def __init__(
+        self, client: Client, env_names: Sequence[str], auto_reset: bool = True, max_workers: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Parameters:
+            client (Client): Authenticated client.
+            env_names (Sequence of str): Names of environments.
+            auto_reset (bool): Whether environments that are done are reset within the same step. Default: True.
+            max_workers (optional int): Maximum number of concurrent requests. Default: one per environment.
+            retry_policy (optional RetryPolicy): How failed requests are repeated. Defaults to client's `retry_policy`.
+
+        """
+        assert len(env_names) > 0, "At least one environment is needed"
+        self.envs = [RemoteEnvironment(client, env_name, retry_policy=retry_policy) for env_name in env_names]
+        self.auto_reset = auto_reset
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or len(self.envs), thread_name_prefix="RemoteVectorEnv")
+
+    @property
+    def num_envs(self) -> int:
+        return len(self.envs)
+
+    def __len__(self) -> int:
+        return len(self.envs)
+
+    def reset(self) -> Any:
+        "Resets all environments. Returns stacked observations. Raises :py:class:`VectorEnvError` if any failed."
+        return self._stack(self._map(lambda env: env.reset(), self.envs))
+
+    def step(self, actions: Sequence[ActionType]) -> Tuple[Any, Any, Any, List[Dict[str, Any]]]:
+        """Takes an action in each environment.
+
+        Parameters:
+            actions (Sequence): One action per environment, in the same order.
+
+        Returns:
+            Stacked observations, rewards and dones, and a list of infos.
+
+        Raises:
+            VectorEnvError: If any environment failed. Outcomes of the others are in its `results`,
+                as (observation, reward, done, info) tuples.
+
+        """
+        assert len(actions) == len(self.envs), f"Expected {len(self.envs)} actions, got {len(actions)}"
+        outs = self._map(self._step_one, self.envs, actions)
+        observations = [out[0] for out in outs]
+        rewards = [out[1] for out in outs]
+        dones = [out[2] for out in outs]
+        infos = [out[3] for out in outs]
+        if np is None:
+            return observations, rewards, dones, infos
+        return self._stack(observations), np.asarray(rewards, dtype=np.float64), np.asarray(dones, dtype=bool), infos
+
+    def _step_one(self, env: RemoteEnvironment, action: ActionType) -> Tuple[Any, float, bool, Dict[str, Any]]:
+        out = env.step(action)
+        obs, reward, done = out.get("observation"), unwrap(out.get("reward")), bool(unwrap(out.get("done")))
+        info = dict(out.get("info") or {})
+        if self.auto_reset and done:
+            info["final_observation"] = obs
+            obs = env.reset()
+        return obs, reward, done, info
+
+    def _map(self, fn: Callable, *iterables) -> List[Any]:
+        """Calls `fn` for each environment concurrently and waits for all of them, even if some fail.
+
+        Raises:
+            VectorEnvError: With results of the other environments, if any call failed.
+
+        """
+        futures = [self._executor.submit(fn, *args) for args in zip(*iterables)]
+        results, errors = [], {}
+        for (idx, future) in enumerate(futures):
+            error = future.exception()
+            if error is not None:
+                errors[idx] = error
+            results.append(future.result() if error is None else None)
+        if errors:
+            raise VectorEnvError(results, errors) from errors[min(errors)]
+        return results
+
+    def _stack(self, values: List[Any]) -> Any:
+        return np.asarray(values) if np is not None else values
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
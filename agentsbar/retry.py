@@ -0,0 +1,290 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import requests
+from tenacity import AsyncRetrying, Retrying, after_log, retry_if_exception
+from urllib3.exceptions import NewConnectionError
+
+from agentsbar.deadline import Deadline, DeadlineExceeded
+
+try:
+    import httpx
+    CONNECT_ERRORS: Tuple = (requests.exceptions.ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout)
+    TRANSPORT_ERRORS: Tuple = (
+        requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError,
+        httpx.TransportError,
+    )
+except ImportError:
+    CONNECT_ERRORS = (requests.exceptions.ConnectTimeout,)
+    TRANSPORT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError)
+
+global_logger = logging.getLogger("Global")
+
+
+class CircuitOpenError(RuntimeError):
+    "Raised instead of sending a request to an endpoint that recently kept failing."
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    return getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def _is_connect_error(exc: BaseException) -> bool:
+    "Whether the connection couldn't be established, e.g. it was refused, so the request wasn't sent."
+    if isinstance(exc, CONNECT_ERRORS):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Which failed requests are repeated and how long to wait in between.
+
+    Waits grow exponentially, starting from `initial_wait` up to `max_wait`, and with `jitter`
+    a random part of the wait is used so that many workers don't retry in lockstep.
+    The service can ask for a specific wait with `Retry-After` header.
+
+    Requests which aren't idempotent, e.g. agent's `step`, are only repeated when they surely
+    weren't processed, i.e. the connection couldn't be established or the service refused them
+    with 429 (Too Many Requests) or 503 (Service Unavailable).
+
+    """
+    max_attempts: int = 5
+    initial_wait: float = 0.01
+    max_wait: float = 2.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    retry_statuses: Tuple[int, ...] = (408, 425, 429, 500, 502, 503, 504)
+    respect_retry_after: bool = True
+    max_retry_after: float = 30.0
+
+    def is_transient(self, exc: BaseException) -> bool:
+        "Whether the failure is likely temporary, e.g. overloaded service or dropped connection."
+        if isinstance(exc, TRANSPORT_ERRORS):
+            return True
+        return _status_code(exc) in self.retry_statuses
+
+    def is_retryable(self, exc: BaseException, idempotent: bool = True) -> bool:
+        "Whether the request that failed with the exception should be repeated."
+        if idempotent:
+            return self.is_transient(exc)
+        if _is_connect_error(exc):
+            return True
+        return _status_code(exc) in (429, 503) and _status_code(exc) in self.retry_statuses
+
+    def wait(self, retry_state) -> float:
+        "Seconds to wait before the next attempt. Used as tenacity's wait strategy."
+        exc = retry_state.outcome.exception() if retry_state.outcome is not None else None
+        retry_after = self._retry_after(exc) if self.respect_retry_after and exc is not None else None
+        if retry_after is not None:
+            return retry_after
+
+        wait = min(self.max_wait, self.initial_wait * self.multiplier ** (retry_state.attempt_number - 1))
+        return random.uniform(0, wait) if self.jitter else wait
+
+    def _retry_after(self, exc: BaseException) -> Optional[float]:
+        seconds = retry_after(exc)
+        return min(seconds, self.max_retry_after) if seconds is not None else None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    "Seconds the service asked to wait with `Retry-After` header of the failed response, if any."
+    response = getattr(exc, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(seconds, 0.)
+
+
+class CircuitBreaker:
+    """
+    Stops calling an endpoint that keeps failing, giving the service time to recover.
+
+    After `failure_threshold` consecutive transient failures the circuit is "open" and calls fail
+    immediately with :py:class:`CircuitOpenError`. After `reset_timeout` seconds it's "half_open"
+    and a single trial call is let through. Its success closes the circuit, its failure opens it again.
+
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self.opened_count = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        "Raises :py:class:`CircuitOpenError` if the call isn't allowed."
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_progress = False
+            if self._state == self.HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return
+        raise CircuitOpenError(f"Circuit for '{self.name}' is open after {self.failures} consecutive failures")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_in_progress = False
+
+    def release_trial(self) -> None:
+        "Lets another trial call through after the current one was interrupted, e.g. cancelled, before it had any outcome."
+        with self._lock:
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened_count += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_progress = False
+
+
+def _retrying_kwargs(policy: RetryPolicy, idempotent: bool, deadline: Optional[Deadline]) -> Dict[str, Any]:
+    def stop(retry_state) -> bool:
+        # Don't start waiting if there's no time left for another attempt
+        return retry_state.attempt_number >= policy.max_attempts or (deadline is not None and deadline.expired)
+
+    def wait(retry_state) -> float:
+        seconds = policy.wait(retry_state)
+        return min(seconds, deadline.remaining()) if deadline is not None else seconds
+
+    return dict(
+        stop=stop,
+        wait=wait,
+        retry=retry_if_exception(lambda e: policy.is_retryable(e, idempotent)),
+        after=after_log(global_logger, logging.INFO),
+        reraise=True,
+    )
+
+
+def _raise_if_deadline_exceeded(error: BaseException, deadline: Optional[Deadline]) -> None:
+    "Request cut short by the deadline, or not repeated because of it, is reported as exceeded deadline."
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"Deadline of {deadline.seconds} seconds exceeded") from error
+
+
+def call_with_retry(
+    fn: Callable[[], Any], policy: RetryPolicy, idempotent: bool = True, breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[Deadline] = None,
+) -> Any:
+    """Calls `fn` repeating it according to the retry policy, and guarded by the circuit breaker.
+
+    Parameters:
+        fn (Callable): Function making the request. Should raise on failure.
+        policy (RetryPolicy): Retry policy.
+        idempotent (bool): Whether repeating the request is safe. Default: True.
+        breaker (optional CircuitBreaker): Circuit breaker of the endpoint.
+        deadline (optional Deadline): Time budget for all attempts. No attempt is started after it passes,
+            and `fn` is expected to limit its requests to the remaining time.
+
+    Returns:
+        Whatever `fn` returns. Last exception is raised if all attempts fail, or
+        :py:class:`agentsbar.deadline.DeadlineExceeded` if they were cut short by the deadline.
+
+    """
+    def attempt():
+        if deadline is not None:
+            deadline.check()
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            if breaker is not None and policy.is_transient(e):
+                breaker.record_failure()
+            elif breaker is not None:
+                breaker.record_success()  # Service responded, even if with an error
+            raise
+        except BaseException:
+            if breaker is not None:
+                breaker.release_trial()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+    try:
+        return Retrying(**_retrying_kwargs(policy, idempotent, deadline))(attempt)
+    except Exception as e:
+        if isinstance(e, TRANSPORT_ERRORS) or policy.is_retryable(e, idempotent):
+            _raise_if_deadline_exceeded(e, deadline)
+        raise
+
+
+async def async_call_with_retry(
+    fn: Callable[[], Awaitable[Any]], policy: RetryPolicy, idempotent: bool = True,
+    breaker: Optional[CircuitBreaker] = None, deadline: Optional[Deadline] = None,
+) -> Any:
+    "The same as :py:func:`call_with_retry` but for coroutines."
+    async def attempt():
+        if deadline is not None:
+            deadline.check()
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:  # Not a BaseException before python 3.8
+            if breaker is not None:
+                breaker.release_trial()
+            raise
+        except Exception as e:
+            if breaker is not None and policy.is_transient(e):
+                breaker.record_failure()
+            elif breaker is not None:
+                breaker.record_success()  # Service responded, even if with an error
+            raise
+        except BaseException:
+            if breaker is not None:
+                breaker.release_trial()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+    try:
+        return await AsyncRetrying(**_retrying_kwargs(policy, idempotent, deadline))(attempt)
+    except Exception as e:
+        if isinstance(e, TRANSPORT_ERRORS) or policy.is_retryable(e, idempotent):
+            _raise_if_deadline_exceeded(e, deadline)
+        raise
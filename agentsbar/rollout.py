@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from agentsbar import environments
+from agentsbar.aio import environments as aio_environments
+from agentsbar.types import RolloutStats
+from agentsbar.utils import unwrap
+
+
+class _Pair:
+    "Rollout state of an agent and environment."
+
+    def __init__(self, agent, env_name: str):
+        self.agent = agent
+        self.env_name = env_name
+        self.stats = RolloutStats(agent_name=agent.agent_name, env_name=env_name)
+        self.obs: Any = None  # None when the environment needs a reset
+        self.next_obs: Any = None
+        self.reward = 0.
+        self.done = False
+        self.episode_steps = 0
+        self.consecutive_errors = 0
+        self.finished = False
+
+
+class RolloutEngine:
+    """
+    Runs many agents, each interacting with its own environment, concurrently.
+
+    Every pair runs the usual loop: reset the environment, ask the agent for an action, step the
+    environment and pass the transition to the agent for learning. Steps of different pairs overlap,
+    e.g. one environment steps while another agent acts, with at most `max_concurrency` steps in flight.
+
+    A failure of agent's `step`, i.e. learning, doesn't undo environment's step. It's counted in
+    `learn_errors` and the rollout continues.
+
+    Use :py:meth:`run` with :py:class:`agentsbar.RemoteAgent` (threads), or :py:meth:`arun` with
+    :py:class:`agentsbar.aio.remote_agent.AsyncRemoteAgent` (asyncio). Stopping, either with :py:meth:`stop`,
+    a timeout or an interrupt, lets steps in flight finish so that no transition is lost.
+
+    Usage::
+
+        engine = RolloutEngine([(agent_1, "CartPole-1"), (agent_2, "CartPole-2")], max_episodes=100)
+        stats = engine.run()
+        print(stats[("Agent1", "CartPole-1")].returns)
+
+    To also overlap sending learning data with acting, enable the agents' pipelined step,
+    see :py:meth:`agentsbar.RemoteAgent.enable_pipelined_step`.
+
+    """
+
+    logger = logging.getLogger("RolloutEngine")
+
+    def __init__(
+        self,
+        pairs: Iterable[Tuple[Any, str]],
+        noise: float = 0.,
+        learn: bool = True,
+        max_steps: Optional[int] = None,
+        max_episodes: Optional[int] = None,
+        max_episode_steps: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_errors: int = 3,
+    ):
+        """
+        Parameters:
+            pairs (Iterable of tuples): Pairs of (agent, environment's name). Each agent uses its own client.
+            noise (float): Epsilon passed to agents' `act`. Default: 0.
+            learn (bool): Whether transitions are passed to agents' `step`. Default: True.
+            max_steps (optional int): Number of steps after which a pair stops. Default: no limit.
+            max_episodes (optional int): Number of episodes after which a pair stops. Default: no limit.
+            max_episode_steps (optional int): Episodes are cut after that many steps. Default: no limit.
+            max_concurrency (optional int): Maximum number of steps in flight. Default: one per pair.
+            max_errors (int): Consecutive failed steps after which a pair stops. Default: 3.
+
+        """
+        self._pairs = [_Pair(agent, env_name) for (agent, env_name) in pairs]
+        self.noise = noise
+        self.learn = learn
+        self.max_steps = max_steps
+        self.max_episodes = max_episodes
+        self.max_episode_steps = max_episode_steps
+        self.max_concurrency = max_concurrency or max(len(self._pairs), 1)
+        self.max_errors = max_errors
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stats(self) -> Dict[Tuple[str, str], RolloutStats]:
+        "Statistics of each (agent's name, environment's name) pair."
+        return {(pair.agent.agent_name, pair.env_name): pair.stats for pair in self._pairs}
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        "Stops starting new steps. If running in background, waits until steps in flight finish."
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def start(self, timeout: Optional[float] = None) -> "RolloutEngine":
+        "Runs in a background thread. See :py:meth:`run`."
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(timeout,), name="RolloutEngine", daemon=True)
+        self._thread.start()
+        return self
+
+    def run(self, timeout: Optional[float] = None) -> Dict[Tuple[str, str], RolloutStats]:
+        """Runs all pairs with a pool of threads until they reach their limits, :py:meth:`stop` is called,
+        `timeout` seconds pass or the run is interrupted.
+
+        Returns:
+            Statistics of each (agent's name, environment's name) pair.
+
+        """
+        start_time = time.monotonic()
+        if threading.current_thread() is not self._thread:
+            self._stop.clear()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            running: Dict[Future, _Pair] = {}
+            pending = [pair for pair in self._pairs if not pair.finished]
+
+            def schedule():
+                while pending and len(running) < self.max_concurrency and not self._stop.is_set():
+                    pair = pending.pop(0)
+                    running[executor.submit(self._step, pair)] = pair
+
+            try:
+                schedule()
+                while running:
+                    remaining = None if timeout is None else timeout - (time.monotonic() - start_time)
+                    if remaining is not None and remaining <= 0:
+                        self._stop.set()
+                    wait_time = remaining if remaining is not None and remaining > 0 else None
+                    done, _ = wait(list(running), timeout=wait_time, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pair = running.pop(future)
+                        self._on_done(pair, future.exception(), time.monotonic() - start_time)
+                        if not pair.finished:
+                            pending.append(pair)
+                    schedule()
+            except KeyboardInterrupt:
+                self.logger.info("Interrupted. Waiting for %d steps in flight.", len(running))
+                self._stop.set()
+                for (future, pair) in running.items():
+                    self._on_done(pair, future.exception(), time.monotonic() - start_time)
+
+        for agent in {id(pair.agent): pair.agent for pair in self._pairs}.values():
+            if hasattr(agent, "drain"):
+                agent.drain()
+        return self.stats
+
+    async def arun(self, timeout: Optional[float] = None) -> Dict[Tuple[str, str], RolloutStats]:
+        """Asynchronous counterpart of :py:meth:`run` for agents with coroutine `act` and `step`.
+        Cancelling stops the run gracefully, like :py:meth:`stop`, and then propagates. Statistics are still in :py:attr:`stats`.
+        """
+        start_time = time.monotonic()
+        self._stop.clear()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_pair(pair: _Pair):
+            while not pair.finished and not self._stop.is_set():
+                async with semaphore:
+                    if self._stop.is_set():
+                        return
+                    error = None
+                    try:
+                        await self._astep(pair)
+                    except Exception as e:
+                        error = e
+                    self._on_done(pair, error, time.monotonic() - start_time)
+
+        tasks = [asyncio.ensure_future(run_pair(pair)) for pair in self._pairs]
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.gather(*tasks)), timeout)
+        except asyncio.TimeoutError:
+            self._stop.set()
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            self._stop.set()
+            await asyncio.gather(*tasks)
+            raise
+        return self.stats
+
+    def _step(self, pair: _Pair) -> None:
+        client = pair.agent._client
+        if pair.obs is None:
+            pair.obs = environments.reset(client, pair.env_name)
+        obs = pair.obs
+        action = pair.agent.act(obs, noise=self.noise)
+        out = environments.step(client, pair.env_name, step={"actions": [action], "commit": True})
+        # Environment has moved on, regardless whether the agent learns from it
+        transition = self._observe(pair, out)
+        self._advance(pair)
+        if self.learn:
+            try:
+                pair.agent.step(obs, action, *transition)
+            except Exception as e:
+                self._on_learn_error(pair, e)
+
+    async def _astep(self, pair: _Pair) -> None:
+        client = pair.agent._client
+        if pair.obs is None:
+            pair.obs = await aio_environments.reset(client, pair.env_name)
+        obs = pair.obs
+        action = await pair.agent.act(obs, noise=self.noise)
+        out = await aio_environments.step(client, pair.env_name, step={"actions": [action], "commit": True})
+        transition = self._observe(pair, out)
+        self._advance(pair)
+        if self.learn:
+            try:
+                await pair.agent.step(obs, action, *transition)
+            except Exception as e:
+                self._on_learn_error(pair, e)
+
+    def _observe(self, pair: _Pair, out: Dict[str, Any]) -> Tuple[float, Any, bool]:
+        "Keeps environment's state after the step. Returns the (reward, next observation, done) part of the transition."
+        pair.next_obs = out.get("observation")
+        pair.reward = float(unwrap(out.get("reward")) or 0.)
+        pair.done = bool(unwrap(out.get("done")))
+        return pair.reward, pair.next_obs, pair.done
+
+    def _advance(self, pair: _Pair) -> None:
+        "Updates statistics after a successful step."
+        stats = pair.stats
+        stats.steps += 1
+        stats.episode_return += pair.reward
+        pair.episode_steps += 1
+        if pair.done or (self.max_episode_steps is not None and pair.episode_steps >= self.max_episode_steps):
+            stats.episodes += 1
+            stats.returns.append(stats.episode_return)
+            stats.episode_return = 0.
+            pair.obs, pair.episode_steps = None, 0
+        else:
+            pair.obs = pair.next_obs
+
+    def _on_learn_error(self, pair: _Pair, error: BaseException) -> None:
+        "Agent didn't get the transition. The step itself succeeded, so it doesn't count towards `max_errors`."
+        pair.stats.learn_errors += 1
+        pair.stats.last_error = str(error)
+        self.logger.warning("Agent '%s' failed to learn from step in '%s': %s", pair.stats.agent_name, pair.env_name, error)
+
+    def _on_done(self, pair: _Pair, error: Optional[BaseException], elapsed: float) -> None:
+        stats = pair.stats
+        stats.elapsed = elapsed
+        if error is not None:
+            stats.errors += 1
+            stats.last_error = str(error)
+            pair.consecutive_errors += 1
+            self.logger.warning("Step of agent '%s' in '%s' failed: %s", stats.agent_name, pair.env_name, error)
+        else:
+            pair.consecutive_errors = 0
+        pair.finished = (
+            pair.consecutive_errors >= self.max_errors
+            or (self.max_steps is not None and stats.steps >= self.max_steps)
+            or (self.max_episodes is not None and stats.episodes >= self.max_episodes)
+        )
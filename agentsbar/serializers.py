@@ -0,0 +1,106 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Serializer(object):
+    """
+    Wire format of requests and responses.
+
+    Subclasses define `content_type` and how to convert between python objects and bytes.
+    Binary serializers can carry `bytes` values without encoding them as text.
+    """
+
+    name = "base"
+    content_type = "application/octet-stream"
+    binary = False
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    "Standard library json. Always available."
+
+    name = "json"
+    content_type = "application/json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    "Fast json (de)serialization with `orjson`. Produces the same wire format as `JsonSerializer`."
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("Serializer 'orjson' requires `orjson` package. Install it with `pip install agents-bar[fast]`.")
+
+    def dumps(self, obj: Any) -> bytes:
+        # NumPy arrays are serialized natively, without converting to lists first
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    "Binary `msgpack` format. Requires support on the service side."
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("Serializer 'msgpack' requires `msgpack` package. Install it with `pip install agents-bar[fast]`.")
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+    MsgpackSerializer.name: MsgpackSerializer,
+}  #: Serializers available by name
+
+
+def get_serializer(serializer: Union[str, Serializer]) -> Serializer:
+    """Resolves serializer.
+
+    Parameters:
+        serializer (str or Serializer): Either an instance or a name from :py:data:`SERIALIZERS`.
+            Name 'auto' selects the fastest json serializer available.
+
+    Returns:
+        Serializer instance.
+
+    """
+    if isinstance(serializer, Serializer):
+        return serializer
+    if serializer == "auto":
+        return OrjsonSerializer() if orjson is not None else JsonSerializer()
+    if serializer not in SERIALIZERS:
+        raise ValueError(f"Serializer '{serializer}' isn't supported. Please select one from {list(SERIALIZERS)} or 'auto'")
+    return SERIALIZERS[serializer]()
@@ -0,0 +1,294 @@
+import collections
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Deque, List, Optional, Tuple
+
+from requests.models import HTTPError
+
+from agentsbar.retry import RetryPolicy, retry_after
+from agentsbar.types import EncodedAgentState
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "agentsbar", "snapshots")
+NO_RETRY = RetryPolicy(max_attempts=1)  #: Checkpoints are single requests, each counted by the rate limit
+
+
+def state_digest(state: EncodedAgentState) -> str:
+    "Hash of snapshot's content."
+    return hashlib.sha256(json.dumps(dataclasses.asdict(state), sort_keys=True).encode()).hexdigest()
+
+
+class SnapshotCache(object):
+    """
+    On-disk store of agents' snapshots keyed by agent's name and snapshot's content hash.
+
+    The same content is stored only once. When the total size exceeds `max_bytes`,
+    the least recently used snapshots are removed. Reads count as use.
+
+    """
+
+    logger = logging.getLogger("SnapshotCache")
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 1 << 30):
+        """
+        Parameters:
+            directory (optional str): Where to keep snapshots. Defaults to `~/.cache/agentsbar/snapshots`.
+            max_bytes (int): Limit of the total size of stored snapshots. Default: 1 GiB.
+
+        """
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # (agent's directory, digest) -> size, in order from the least recently used
+        self._entries: "collections.OrderedDict[Tuple[str, str], int]" = collections.OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _agent_dir(self, agent_name: str) -> str:
+        return hashlib.sha256(agent_name.encode()).hexdigest()[:32]
+
+    def _path(self, key: Tuple[str, str]) -> str:
+        return os.path.join(self.directory, key[0], key[1] + ".json")
+
+    def _load_index(self) -> None:
+        "Rebuilds recency order from files' modification times."
+        entries = []
+        for agent_dir in os.listdir(self.directory):
+            if not os.path.isdir(os.path.join(self.directory, agent_dir)):
+                continue
+            for name in os.listdir(os.path.join(self.directory, agent_dir)):
+                if not name.endswith(".json"):
+                    continue
+                stat = os.stat(os.path.join(self.directory, agent_dir, name))
+                entries.append((stat.st_mtime, (agent_dir, name[:-len(".json")]), stat.st_size))
+        for (_, key, size) in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def put(self, agent_name: str, state: EncodedAgentState, digest: Optional[str] = None) -> str:
+        """Stores snapshot unless the same content is already there.
+
+        Parameters:
+            agent_name (str): Name of agent.
+            state (EncodedAgentState): Snapshot to store.
+            digest (optional str): Snapshot's content hash, if already computed with :py:func:`state_digest`.
+
+        Returns:
+            Content hash of the snapshot.
+
+        """
+        digest = digest or state_digest(state)
+        key = (self._agent_dir(agent_name), digest)
+        with self._lock:
+            if key in self._entries:
+                self._touch(key)
+                return digest
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(dataclasses.asdict(state), f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = os.path.getsize(path)
+                self._total_bytes += self._entries[key]
+            self._evict(keep=key)
+        return digest
+
+    def get(self, agent_name: str, digest: Optional[str] = None) -> Optional[EncodedAgentState]:
+        """Reads a stored snapshot.
+
+        Parameters:
+            agent_name (str): Name of agent.
+            digest (optional str): Content hash. Defaults to the most recently stored or read snapshot of the agent.
+
+        Returns:
+            Snapshot or None if it isn't stored.
+
+        """
+        digest = digest or self.latest(agent_name)
+        if digest is None:
+            return None
+        key = (self._agent_dir(agent_name), digest)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._touch(key)
+        try:
+            with open(self._path(key)) as f:
+                return EncodedAgentState(**json.load(f))
+        except OSError:  # Evicted in the meantime
+            return None
+
+    def contains(self, agent_name: str, digest: str) -> bool:
+        with self._lock:
+            return (self._agent_dir(agent_name), digest) in self._entries
+
+    def digests(self, agent_name: str) -> List[str]:
+        "Hashes of agent's stored snapshots, from the most recently used."
+        agent_dir = self._agent_dir(agent_name)
+        with self._lock:
+            return [digest for (directory, digest) in reversed(self._entries) if directory == agent_dir]
+
+    def latest(self, agent_name: str) -> Optional[str]:
+        digests = self.digests(agent_name)
+        return digests[0] if digests else None
+
+    def remove(self, agent_name: str, digest: str) -> None:
+        with self._lock:
+            self._remove((self._agent_dir(agent_name), digest))
+
+    def _touch(self, key: Tuple[str, str]) -> None:
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        size = self._entries.pop(key, None)
+        if size is None:
+            return
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError as e:
+            self.logger.warning("Couldn't remove cached snapshot: %s", e)
+
+    def _evict(self, keep: Tuple[str, str]) -> None:
+        "Removes the least recently used snapshots, except for `keep`, until the total size fits the limit."
+        for key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                return
+            if key != keep:
+                self._remove(key)
+
+
+class Checkpointer(object):
+    """
+    Periodically downloads agent's snapshot into a :py:class:`SnapshotCache` in a background thread.
+
+    Downloads are spaced by `interval` seconds and there are at most `max_calls` of them in any
+    `period` seconds, since the snapshot API is heavily rate limited. When the service responds
+    with 429 (Too Many Requests), the next download waits at least for its `Retry-After`.
+    Downloads aren't retried nor hedged, since each request counts against the limit.
+    Snapshots identical to the previous one aren't written again.
+
+    """
+
+    logger = logging.getLogger("Checkpointer")
+
+    def __init__(
+        self, agent, cache: SnapshotCache, interval: float = 300., max_calls: int = 10, period: float = 3600.,
+    ):
+        """
+        Parameters:
+            agent (RemoteAgent): Agent whose snapshots are taken.
+            cache (SnapshotCache): Where to store snapshots.
+            interval (float): Seconds between downloads. Default: 300.
+            max_calls (int): Maximum number of downloads in any `period`. Default: 10.
+            period (float): Length of the rate limiting window in seconds. Default: 3600.
+
+        """
+        self.agent = agent
+        self.cache = cache
+        self.interval = interval
+        self.max_calls = max_calls
+        self.period = period
+
+        self.checkpoints = 0  #: Number of stored snapshots with new content
+        self.unchanged = 0  #: Number of downloaded snapshots identical to the previous one
+        self.failed = 0
+        self.last_digest: Optional[str] = None
+        self.last_error: Optional[BaseException] = None
+
+        self._calls: Deque[float] = collections.deque()
+        self._not_before = 0.
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Checkpointer":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"Checkpointer-{self.agent.agent_name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _delay(self) -> float:
+        "Seconds until the next download is allowed."
+        now = time.monotonic()
+        while self._calls and self._calls[0] <= now - self.period:
+            self._calls.popleft()
+        delay = max(0., self._not_before - now)
+        if len(self._calls) >= self.max_calls:
+            delay = max(delay, self._calls[0] + self.period - now)
+        return delay
+
+    def checkpoint(self) -> Optional[str]:
+        """Downloads and stores the snapshot now, if the rate limit allows.
+
+        Returns:
+            Content hash of the snapshot, or None if the download wasn't allowed yet.
+
+        """
+        with self._lock:
+            if self._delay() > 0:
+                return None
+            self._calls.append(time.monotonic())
+            self._not_before = time.monotonic() + self.interval
+        state = self.agent.get_state(retry_policy=NO_RETRY)
+        digest = state_digest(state)
+        if digest == self.last_digest and self.cache.contains(self.agent.agent_name, digest):
+            self.unchanged += 1
+            return digest
+        self.cache.put(self.agent.agent_name, state, digest)
+        self.checkpoints += 1
+        self.last_digest = digest
+        return digest
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                delay = self._delay()
+            if self._stop.wait(delay):
+                return
+            try:
+                self.checkpoint()
+            except HTTPError as e:
+                self._on_error(e)
+                seconds = retry_after(e)
+                if seconds is not None:
+                    with self._lock:
+                        self._not_before = max(self._not_before, time.monotonic() + seconds)
+            except Exception as e:
+                self._on_error(e)
+
+    def _on_error(self, error: BaseException) -> None:
+        self.failed += 1
+        self.last_error = error
+        self.logger.warning("Failed to checkpoint agent '%s': %s", self.agent.agent_name, error)
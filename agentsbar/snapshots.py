@@ -0,0 +1,321 @@
+import codecs
+import json
+import os
+import re
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+from agentsbar.client import Client
+from agentsbar.retry import RetryPolicy, call_with_retry
+from agentsbar.types import EncodedAgentState, SnapshotFiles
+
+SNAPSHOTS_PREFIX = "/snapshots"
+CHUNK_SIZE = 1 << 16  #: Bytes read and written at once. Small enough not to lose much of an interrupted download.
+METADATA_FILE = "snapshot.json"  #: Snapshot's values other than the large ones
+FILE_FIELDS = {"encoded_network": "network.b64", "encoded_buffer": "buffer.b64"}  #: Large values and their files
+
+_NEEDS_ESCAPE = re.compile(r'[\x00-\x1f"\\]')
+_STRING_END = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[,}\s]")
+_ESCAPES = {ord('"'): '"', ord('\\'): '\\', ord('/'): '/', ord('b'): '\b', ord('f'): '\f', ord('n'): '\n', ord('r'): '\r', ord('t'): '\t'}
+_WHITESPACE = b" \t\r\n"
+
+
+class _SnapshotParser:
+    """
+    Incremental parser of snapshot's json which writes large string fields straight to files.
+
+    Only flat objects, i.e. with string, number, boolean or null values, are supported
+    which is the case for :py:class:`agentsbar.types.EncodedAgentState`.
+
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._state = "start"
+        self._key: Optional[str] = None
+        self._buffer = bytearray()
+        self._escape: Optional[bytearray] = None
+        self._high_surrogate: Optional[int] = None
+        self._sink: Optional[BinaryIO] = None
+
+    def feed(self, data: bytes) -> None:
+        pos = 0
+        while pos < len(data):
+            if self._state in ("string", "escape"):
+                pos = self._read_string(data, pos)
+                continue
+            if self._state == "scalar":
+                pos = self._read_scalar(data, pos)
+                continue
+
+            char = data[pos:pos + 1]
+            pos += 1
+            if char in _WHITESPACE:
+                continue
+            if self._state == "start" and char == b"{":
+                self._state = "key"
+            elif self._state == "key" and char == b'"':
+                self._key = None
+                self._state = "string"
+            elif self._state == "key" and char in (b",", b"}"):
+                self.done = char == b"}"
+                self._state = "end" if self.done else "key"
+            elif self._state == "colon" and char == b":":
+                self._state = "value"
+            elif self._state == "value" and char == b'"':
+                self._sink = self._open(self._key) if self._key in FILE_FIELDS else None
+                self._state = "string"
+            elif self._state == "value" and char not in (b"{", b"["):
+                self._buffer += char
+                self._state = "scalar"
+            else:
+                raise ValueError(f"Unexpected '{char.decode(errors='replace')}' in snapshot. Only flat json objects are supported.")
+
+    def _open(self, field: str) -> BinaryIO:
+        return open(os.path.join(self.directory, FILE_FIELDS[field]), "wb")
+
+    def _write(self, chunk: bytes) -> None:
+        if chunk and self._high_surrogate is not None:
+            self._flush_surrogate()
+        if self._sink is not None:
+            self._sink.write(chunk)
+        else:
+            self._buffer += chunk
+
+    def _read_string(self, data: bytes, pos: int) -> int:
+        if self._state == "escape":
+            return self._read_escape(data, pos)
+        match = _STRING_END.search(data, pos)
+        end = match.start() if match else len(data)
+        self._write(data[pos:end])
+        if match is None:
+            return end
+        if data[end:end + 1] == b"\\":
+            self._state = "escape"
+            self._escape = bytearray()
+            return end + 1
+
+        self._flush_surrogate()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        else:
+            value = self._buffer.decode()
+            self._buffer = bytearray()
+            if self._key is None:
+                self._key = value
+                self._state = "colon"
+                return end + 1
+            self.fields[self._key] = value
+        self._state = "key"
+        return end + 1
+
+    def _read_escape(self, data: bytes, pos: int) -> int:
+        while pos < len(data):
+            self._escape.append(data[pos])
+            pos += 1
+            if self._escape[0] != ord("u"):
+                self._write(_ESCAPES[self._escape[0]].encode())
+            elif len(self._escape) == 5:
+                self._write_code_point(int(self._escape[1:], 16))
+            else:
+                continue
+            self._state = "string"
+            break
+        return pos
+
+    def _write_code_point(self, code: int) -> None:
+        "Characters outside of the basic plane are escaped as two surrogates, e.g. \\ud83d\\ude00."
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+            self._write(chr(code).encode())
+        elif 0xD800 <= code < 0xDC00:
+            self._flush_surrogate()
+            self._high_surrogate = code
+        else:
+            self._write(chr(code).encode("utf-8", "surrogatepass"))
+
+    def _flush_surrogate(self) -> None:
+        "Writes pending high surrogate which wasn't followed by its low half as is."
+        if self._high_surrogate is not None:
+            code, self._high_surrogate = self._high_surrogate, None
+            self._write(chr(code).encode("utf-8", "surrogatepass"))
+
+    def _read_scalar(self, data: bytes, pos: int) -> int:
+        match = _SCALAR_END.search(data, pos)
+        end = match.start() if match else len(data)
+        self._buffer += data[pos:end]
+        if match is not None:
+            self.fields[self._key] = json.loads(bytes(self._buffer))
+            self._buffer = bytearray()
+            self._state = "key"
+        return end
+
+    def close(self) -> None:
+        if self._sink is not None:
+            self._sink.close()
+
+
+def _read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    "Reads file's content escaped as a json string. Characters split between chunks are decoded together."
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            text = decoder.decode(chunk, final=not chunk)
+            if _NEEDS_ESCAPE.search(text):
+                yield json.dumps(text)[1:-1].encode()
+            elif text:
+                yield text.encode()
+            if not chunk:
+                return
+
+
+def file_paths(files: SnapshotFiles) -> Dict[str, str]:
+    "Paths of files with large values, keyed by the field of :py:class:`agentsbar.types.EncodedAgentState`."
+    return {field: os.path.join(files.directory, name) for (field, name) in FILE_FIELDS.items()}
+
+
+def open_directory(directory: str) -> SnapshotFiles:
+    "Snapshot's files previously stored in the directory, e.g. by :py:func:`download`."
+    with open(os.path.join(directory, METADATA_FILE)) as f:
+        return SnapshotFiles(directory=directory, **json.load(f))
+
+
+def load(files: SnapshotFiles) -> EncodedAgentState:
+    "Reads the whole snapshot into memory."
+    values = dict(files.metadata())
+    for (field, path) in file_paths(files).items():
+        with open(path) as f:
+            values[field] = f.read()
+    return EncodedAgentState(**values)
+
+
+def _save_metadata(files: SnapshotFiles) -> None:
+    with open(os.path.join(files.directory, METADATA_FILE), "w") as f:
+        json.dump(files.metadata(), f)
+
+
+def download(
+    client: Client, agent_name: str, directory: str, chunk_size: int = CHUNK_SIZE, retry_policy: Optional[RetryPolicy] = None,
+) -> SnapshotFiles:
+    """Downloads agent's snapshot into a directory without holding it in memory.
+
+    Snapshot is streamed into `snapshot.json.part` while its network and buffer are written into
+    separate files. If the connection drops, the download resumes from the last received byte,
+    provided the service supports range requests and the snapshot hasn't changed in the meantime.
+    An interrupted download is also resumed by the next call with the same directory.
+
+    *Note* that this API has a heavy rate limit. Its `Retry-After` is respected when retrying.
+
+    Parameters:
+        client (Client): Authenticated client.
+        agent_name (str): Name of agent.
+        directory (str): Where to store the snapshot. Created if it doesn't exist.
+        chunk_size (int): Bytes written at once. Default: 64 KiB.
+        retry_policy (optional RetryPolicy): How failed downloads are resumed. Default: client's `retry_policy`.
+
+    Returns:
+        Snapshot's files. Use :py:func:`load` to read them into memory.
+
+    """
+    os.makedirs(directory, exist_ok=True)
+    part_path = os.path.join(directory, METADATA_FILE + ".part")
+    validator_path = part_path + ".validator"
+    parser = _SnapshotParser(directory)
+
+    if os.path.exists(part_path) and os.path.exists(validator_path):
+        for chunk in _read_chunks_raw(part_path, chunk_size):
+            parser.feed(chunk)
+
+    def fetch():
+        nonlocal parser
+        # Without knowing the version it's safer to start over
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) and os.path.exists(validator_path) else 0
+        # Ranges refer to the encoded content so the response has to be sent as is
+        headers = {"accept": "application/json", "Accept-Encoding": "identity"}
+        if offset > 0:
+            with open(validator_path) as f:
+                headers.update({"Range": f"bytes={offset}-", "If-Range": f.read()})
+        with client.get(url, headers=headers, stream=True, hedge=False) as response:
+            if response.status_code == 416:  # Stale part, e.g. the snapshot got smaller
+                os.remove(validator_path)
+                return fetch()
+            response.raise_for_status()
+            if response.status_code != 206:
+                parser.close()
+                parser = _SnapshotParser(directory)
+                _write_validator(validator_path, response)
+            with open(part_path, "ab" if response.status_code == 206 else "wb") as f:
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
+                    parser.feed(chunk)
+
+    url = f"{SNAPSHOTS_PREFIX}/{agent_name}"
+    call_with_retry(fetch, retry_policy or client.retry_policy, breaker=client.circuit_breaker(url))
+    parser.close()
+    if not parser.done:
+        raise ValueError(f"Snapshot of agent '{agent_name}' is incomplete")
+
+    files = SnapshotFiles(directory=directory, **parser.fields)
+    _save_metadata(files)
+    os.remove(part_path)
+    if os.path.exists(validator_path):
+        os.remove(validator_path)
+    return files
+
+
+def _read_chunks_raw(path: str, chunk_size: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(chunk_size), b"")
+
+
+def _write_validator(path: str, response) -> None:
+    "Remembers what identifies the snapshot's version, so that only the same version is resumed."
+    validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    if validator is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, "w") as f:
+        f.write(validator)
+
+
+def upload(
+    client: Client, agent_name: str, files: SnapshotFiles, chunk_size: int = CHUNK_SIZE,
+    retry_policy: Optional[RetryPolicy] = None,
+) -> None:
+    """Uploads snapshot from files, streaming it in chunks rather than building the request in memory.
+
+    Failed uploads are repeated by reading the files again. The service doesn't accept partial
+    snapshots so an upload can't continue from where it was interrupted.
+
+    Parameters:
+        client (Client): Authenticated client.
+        agent_name (str): Name of agent.
+        files (SnapshotFiles): Snapshot's files, e.g. returned by :py:func:`download`.
+        chunk_size (int): Bytes read at once. Default: 64 KiB.
+        retry_policy (optional RetryPolicy): How failed uploads are repeated. Default: client's `retry_policy`.
+
+    """
+    def chunks() -> Iterator[bytes]:
+        metadata = json.dumps(files.metadata()).encode()
+        yield metadata[:-1]
+        for (field, path) in file_paths(files).items():
+            yield f', "{field}": "'.encode()
+            yield from _read_chunks(path, chunk_size)
+            yield b'"'
+        yield b"}"
+
+    def send():
+        response = client.post(f"{SNAPSHOTS_PREFIX}/{agent_name}", chunks=chunks)
+        response.raise_for_status()
+
+    try:
+        url = f"{SNAPSHOTS_PREFIX}/{agent_name}"
+        call_with_retry(send, retry_policy or client.retry_policy, breaker=client.circuit_breaker(url))
+    finally:
+        client.metadata_cache.invalidate('agent', agent_name)
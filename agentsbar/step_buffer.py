@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class PartialSendError(Exception):
+    """Raised by functions sending steps when only the first `sent` of them got through.
+
+    The original error is available as `error`.
+    """
+
+    def __init__(self, sent: int, error: BaseException):
+        super().__init__(f"Only {sent} steps were sent: {error}")
+        self.sent = sent
+        self.error = error
+
+
+class StepBuffer:
+    """
+    Collects agent's steps and sends them in batches.
+
+    Buffered steps are sent, in order, as a single batch when there are `max_size` of them,
+    when the oldest one waited `max_wait` seconds, when a terminal step (`done=True`) is added,
+    or on explicit :py:meth:`flush`. Thresholds are checked whenever a step is added.
+
+    If sending fails, steps that weren't sent stay in the buffer and are sent again with the next flush.
+    Steps that got through before the failure (see :py:class:`PartialSendError`) aren't sent twice.
+
+    """
+
+    logger = logging.getLogger("StepBuffer")
+
+    def __init__(self, send: Callable[[List[Dict]], None], max_size: int = 64, max_wait: Optional[float] = 1.0):
+        """
+        Parameters:
+            send (Callable): Function sending a list of steps, e.g. with retries.
+            max_size (int): Number of steps that triggers sending. Default: 64.
+            max_wait (optional float): Seconds after which the oldest buffered step triggers sending.
+                None disables time threshold. Default: 1 (second).
+
+        """
+        assert max_size > 0, "Buffer needs to fit at least one step"
+        self._send = send
+        self.max_size = max_size
+        self.max_wait = max_wait
+
+        self._steps: List[Dict] = []
+        self._oldest_time: Optional[float] = None
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def add(self, step_data: Dict, done: bool = False) -> bool:
+        """Adds a step and sends buffer if any of thresholds is reached.
+
+        The step is kept even if sending fails. The failure is only logged, and stored in `last_error`,
+        so that callers don't add the same step again.
+
+        Returns:
+            Whether the buffer was sent.
+
+        """
+        with self._lock:
+            self._steps.append(step_data)
+            if self._oldest_time is None:
+                self._oldest_time = time.monotonic()
+            if not (done or self._is_full() or self._is_overdue()):
+                return False
+            try:
+                self.flush()
+            except Exception as e:
+                self.last_error = e
+                self.logger.warning("Failed to send %d buffered steps, keeping them for the next flush: %s", len(self._steps), e)
+                return False
+            return True
+
+    def flush(self) -> int:
+        """Sends all buffered steps as one batch.
+
+        Returns:
+            Number of sent steps.
+
+        """
+        with self._lock:
+            if not self._steps:
+                return 0
+            batch = self._steps
+            try:
+                self._send(batch)
+            except PartialSendError as e:
+                # Keep only what wasn't sent
+                del self._steps[:e.sent]
+                raise
+            self._steps = []
+            self._oldest_time = None
+            return len(batch)
+
+    def _is_full(self) -> bool:
+        return len(self._steps) >= self.max_size
+
+    def _is_overdue(self) -> bool:
+        return self.max_wait is not None and time.monotonic() - self._oldest_time >= self.max_wait
@@ -0,0 +1,177 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from agentsbar.step_buffer import PartialSendError
+
+BACKPRESSURE_POLICIES = ('block', 'drop_oldest', 'raise')  #: Supported behaviours when the queue is full
+
+_STOP = object()
+
+
+class BackpressureError(RuntimeError):
+    "Raised when a step is added to a full pipeline with 'raise' policy."
+
+
+class StepPipeline:
+    """
+    Sends agent's steps in the background so that the environment loop doesn't wait for the service.
+
+    Steps are put in a bounded queue which a worker thread drains, in order. Everything that is
+    waiting in the queue when the worker is free is sent together as one batch (up to `max_batch`).
+    When the queue is full the `policy` decides whether to block the caller, drop the oldest
+    queued step, or raise :py:class:`BackpressureError`.
+
+    Failed batches aren't retried here (`send` should do that) but are reported to `on_error`,
+    without steps that got through before the failure.
+
+    """
+
+    logger = logging.getLogger("StepPipeline")
+
+    def __init__(
+        self,
+        send: Callable[[List[Dict]], None],
+        max_queue: int = 1024,
+        policy: str = 'block',
+        on_error: Optional[Callable[[Exception, List[Dict]], None]] = None,
+        max_batch: int = 64,
+    ):
+        """
+        Parameters:
+            send (Callable): Function sending a list of steps, e.g. with retries.
+            max_queue (int): Maximum number of steps waiting to be sent. Default: 1024.
+            policy (str): What to do when the queue is full. One of :py:data:`BACKPRESSURE_POLICIES`. Default: 'block'.
+            on_error (optional Callable): Called with the exception and the batch whenever sending fails.
+                Defaults to logging the error.
+            max_batch (int): Maximum number of steps sent in one request. Default: 64.
+
+        """
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Policy '{policy}' isn't supported. Please select one from {BACKPRESSURE_POLICIES}")
+        self._send = send
+        self.policy = policy
+        self.on_error = on_error
+        self.max_batch = max_batch
+
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_error: Optional[Exception] = None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="StepPipeline", daemon=True)
+        self._worker.start()
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def put(self, step_data: Dict) -> None:
+        """Queues a step to be sent.
+
+        Raises:
+            BackpressureError: With 'raise' policy when the queue is full.
+
+        """
+        if self._closed:
+            raise RuntimeError("Pipeline is closed")
+        if self.policy == 'block':
+            self._queue.put(step_data)
+            return
+        while True:
+            try:
+                self._queue.put_nowait(step_data)
+                return
+            except queue.Full:
+                if self.policy == 'raise':
+                    raise BackpressureError(f"There are already {self._queue.maxsize} steps waiting to be sent") from None
+            # Drop oldest. Worker might have taken it in the meantime, in which case there's space now.
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all queued steps are processed, i.e. sent or reported as failed.
+
+        Parameters:
+            timeout (optional float): Maximum seconds to wait. Waits indefinitely if None.
+
+        Returns:
+            Whether the queue was drained before timeout.
+
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Sends remaining steps and stops the worker. No steps can be added afterwards.
+
+        Parameters:
+            timeout (optional float): Maximum seconds to wait in total. Waits indefinitely if None.
+
+        Returns:
+            Whether all steps were processed before timeout.
+
+        """
+        if self._closed:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0., deadline - time.monotonic())
+
+        drained = self.drain(timeout)
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=remaining())
+        except queue.Full:
+            # Worker is still busy. It's a daemon thread so it won't keep the process alive.
+            return False
+        self._worker.join(remaining())
+        return drained and not self._worker.is_alive()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            steps = batch[:-1] if stop else batch
+            if steps:
+                self._process(steps)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _process(self, steps: List[Dict]) -> None:
+        try:
+            self._send(steps)
+            self.sent += len(steps)
+            return
+        except PartialSendError as e:
+            # Only steps that didn't get through are reported, so that they aren't re-sent twice
+            self.sent += e.sent
+            error, steps = e.error, steps[e.sent:]
+        except Exception as e:
+            error = e
+
+        self.failed += len(steps)
+        self.last_error = error
+        if self.on_error is None:
+            self.logger.error("Failed to send %d steps: %s", len(steps), error)
+            return
+        try:
+            self.on_error(error, steps)
+        except Exception:
+            self.logger.exception("Error callback failed")
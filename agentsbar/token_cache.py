@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "agentsbar", "tokens")
+
+
+class FileLock(object):
+    """
+    Inter-process lock based on `flock`. On platforms without `fcntl` it only locks within the process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class TokenCache(object):
+    """
+    On-disk cache of access tokens shared between processes.
+
+    Tokens are keyed by username and service url. Whoever holds the lock for a key either reuses
+    the cached token or logs in and stores a new one, so many workers starting at the same time
+    result in a single login request.
+
+    """
+
+    logger = logging.getLogger("TokenCache")
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Parameters:
+            directory (optional str): Where to keep tokens. Defaults to `~/.cache/agentsbar/tokens`.
+
+        """
+        self.directory = directory or DEFAULT_CACHE_DIR
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._locks = {}
+
+    def _key(self, username: str, base_url: str) -> str:
+        return hashlib.sha256(f"{base_url}\n{username}".encode()).hexdigest()
+
+    def lock(self, username: str, base_url: str) -> FileLock:
+        "Lock guarding login for the specific user and service."
+        key = self._key(username, base_url)
+        return self._locks.setdefault(key, FileLock(os.path.join(self.directory, key + ".lock")))
+
+    def load(self, username: str, base_url: str) -> Optional[dict]:
+        """Reads cached token.
+
+        Returns:
+            Dictionary with `access_token` and `expires_at` (possibly None) if there's a token. Otherwise None.
+
+        """
+        path = os.path.join(self.directory, self._key(username, base_url) + ".json")
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at") is not None and entry["expires_at"] <= time.time():
+            return None
+        return entry
+
+    def store(self, username: str, base_url: str, access_token: str, expires_at: Optional[float] = None) -> None:
+        "Atomically replaces cached token. Failures are logged and otherwise ignored."
+        path = os.path.join(self.directory, self._key(username, base_url) + ".json")
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"access_token": access_token, "expires_at": expires_at}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning("Couldn't cache access token: %s", e)
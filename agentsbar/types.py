@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+import hashlib
+import json
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 ObsType = List[float]
@@ -15,6 +17,85 @@ class EncodedAgentState:
     encoded_buffer: str
 
 
+@dataclass
+class SnapshotFiles:
+    """Agent's snapshot stored on disk. Large encoded values are kept in separate files in the `directory`.
+
+    See :py:func:`agentsbar.snapshots.download` and :py:func:`agentsbar.snapshots.load`.
+    """
+    directory: str
+    model: str
+    obs_size: int
+    action_size: int
+    encoded_config: str
+
+    def metadata(self) -> Dict[str, Any]:
+        "Snapshot's values which aren't stored in separate files."
+        return {"model": self.model, "obs_size": self.obs_size, "action_size": self.action_size, "encoded_config": self.encoded_config}
+
+
+@dataclass
+class SnapshotManifest:
+    """Snapshot with network and buffer replaced by hashes of their consecutive chunks.
+
+    See :py:mod:`agentsbar.delta`.
+    """
+    model: str
+    obs_size: int
+    action_size: int
+    encoded_config: str
+    chunks: Dict[str, List[str]]
+
+    @property
+    def digest(self) -> str:
+        "Identifies snapshot's content."
+        content = json.dumps([self.model, self.obs_size, self.action_size, self.encoded_config, self.chunks], sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+
+@dataclass
+class WaitResult:
+    """Outcome of waiting for an entity. See :py:func:`agentsbar.waiter.wait_for`.
+
+    `error` is the last failure that made the entity's state unknown, e.g. a server error.
+    """
+    entity: str
+    name: str
+    ready: bool = False
+    timed_out: bool = False
+    elapsed: float = 0.
+    checks: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class BulkResult:
+    """Outcome of one item of a bulk operation, e.g. :py:func:`agentsbar.agents.create_many`.
+
+    `result` is what the single-item function returned and `error` why it failed.
+    """
+    name: str
+    ok: bool = False
+    result: Any = None
+    error: Optional[str] = None
+
+
+@dataclass
+class SetupResult:
+    """Outcome of setting up an entity. See :py:class:`agentsbar.orchestrator.Orchestrator`.
+
+    `created` is also True for entities that existed before. `started` only applies to experiments.
+    """
+    entity: str
+    name: str
+    created: bool = False
+    ready: bool = False
+    started: bool = False
+    timed_out: bool = False
+    elapsed: float = 0.
+    error: Optional[str] = None
+
+
 @dataclass
 class AgentCreate:
     name: str
@@ -64,3 +145,58 @@ class DataSpace:
     shape: Optional[Tuple[int]] = None
     low: Optional[Union[int, float, List[Any]]] = None
     high: Optional[Union[int, float, List[Any]]] = None
+
+
+@dataclass
+class TransferStats:
+    """Bytes exchanged with a single endpoint.
+
+    `*_raw` values are sizes before compression (sent) and after decompression (received).
+    """
+    requests: int = 0
+    sent_raw: int = 0
+    sent: int = 0
+    received: int = 0
+    received_raw: int = 0
+
+    @property
+    def saved(self) -> int:
+        "Number of bytes that didn't go through the network thanks to compression."
+        return (self.sent_raw - self.sent) + (self.received_raw - self.received)
+
+
+@dataclass
+class RolloutStats:
+    """Progress of an agent interacting with an environment. See :py:class:`agentsbar.rollout.RolloutEngine`.
+
+    `returns` are sums of rewards of finished episodes, in order. `elapsed` is seconds spent running.
+    `errors` are failed steps and `learn_errors` steps which agents failed to learn from.
+    """
+    agent_name: str
+    env_name: str
+    steps: int = 0
+    episodes: int = 0
+    returns: List[float] = field(default_factory=list)
+    episode_return: float = 0.
+    elapsed: float = 0.
+    errors: int = 0
+    learn_errors: int = 0
+    last_error: Optional[str] = None
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.elapsed if self.elapsed > 0 else 0.
+
+
+@dataclass
+class AgentStep:
+    """Agent's part of a multi-agent environment step. See :py:meth:`agentsbar.RemoteEnvironment.step_agents`.
+
+    `observation` is where the agent ended up after the step, i.e. the next observation.
+    """
+    agent_name: str
+    action: Any
+    observation: Any
+    reward: Any
+    done: bool
+    info: Dict[str, Any] = field(default_factory=dict)
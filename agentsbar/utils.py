@@ -1,9 +1,23 @@
+import base64
 import time
-from typing import List
+from typing import Any, Dict, List, Union
 
 import requests
 from requests.models import HTTPError
 
+from agentsbar.types import DataSpace
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import httpx
+    HTTP_STATUS_ERRORS = (requests.exceptions.HTTPError, httpx.HTTPStatusError)
+except ImportError:
+    HTTP_STATUS_ERRORS = (requests.exceptions.HTTPError,)
+
 
 SUPPORTED_ENTITIES = ('agent', 'environment', 'experiment')
 
@@ -20,7 +34,9 @@ def wait_until_active(client, entity: str, name: str, max_seconds: int = 20, ver
         verbose (bool): Whether to print logs to standard output. Default: True.
 
     Returns:
-        Boolean value, whether agent exists, i.e. was successfully created.
+        Boolean value, whether the entity is active. False if it didn't get active within `max_seconds`.
+
+    For many entities at once use :py:func:`agentsbar.waiter.wait_for`.
     """
     assert entity in SUPPORTED_ENTITIES, f"Only '{SUPPORTED_ENTITIES}' are supported"
     start_time = time.time()
@@ -28,15 +44,15 @@ def wait_until_active(client, entity: str, name: str, max_seconds: int = 20, ver
 
     while elapsed_time < max_seconds:
         response = client.get(f'/{entity}s/{name}')
-        if response.ok and response.json()['is_active']:
-            break
+        if response.ok and client.decode(response)['is_active']:
+            return True
 
         if verbose and elapsed_time:
             print(f"Waited {elapsed_time:0.2f} seconds. Waiting some more...")
         time.sleep(0.5)
         elapsed_time = time.time() - start_time
 
-    return True
+    return False
 
 
 def wait_until_exists(client, entity: str, name: str, max_seconds: int = 20, verbose: bool = True) -> bool:
@@ -51,7 +67,9 @@ def wait_until_exists(client, entity: str, name: str, max_seconds: int = 20, ver
         verbose (bool): Whether to print logs to standard output. Default: True.
 
     Returns:
-        Boolean value, whether agent exists, i.e. was successfully created.
+        Boolean value, whether the entity exists. False if it wasn't created within `max_seconds`.
+
+    For many entities at once use :py:func:`agentsbar.waiter.wait_for`.
     """
     assert entity in SUPPORTED_ENTITIES, f"Only '{SUPPORTED_ENTITIES}' are supported"
     start_time = time.time()
@@ -60,14 +78,14 @@ def wait_until_exists(client, entity: str, name: str, max_seconds: int = 20, ver
     while elapsed_time < max_seconds:
         response = client.get(f'/{entity}s/{name}')
         if response.ok:
-            break
+            return True
 
         if verbose and elapsed_time:
             print(f"Waited {elapsed_time:0.2f} seconds. Waiting some more...")
         time.sleep(0.5)
         elapsed_time = time.time() - start_time
 
-    return True
+    return False
 
 
 def wait_until_agent_is_active(agent, max_seconds: int = 20, verbose: bool = True) -> bool:
@@ -116,27 +134,110 @@ def to_list(x: object) -> List:
         [1, 2]
         >>> to_list( (1.2, 3., 0.) )
         [1.2, 3., 0.]
+        >>> to_list(np.array([1, 2]))
+        [1, 2]
 
     """
     if isinstance(x, list):
         return x
     if isinstance(x, (int, float)):
         return [x]
+    if hasattr(x, "tolist"):
+        # NumPy arrays and scalars (and tensors) convert to plain python values in C
+        x = x.tolist()
+        return x if isinstance(x, list) else [x]
     # Just hoping...
     return list(x)
 
 
+def unwrap(x: Any) -> Any:
+    """Takes a value out of a single-element list. Inverse of :py:func:`to_list` for single values.
+
+    Environments step with a list of actions, so their single-agent values, e.g. reward, might come wrapped.
+
+    Examples:
+        >>> unwrap([1.5])
+        1.5
+        >>> unwrap([1, 2])
+        [1, 2]
+
+    """
+    return x[0] if isinstance(x, list) and len(x) == 1 else x
+
+
+DTYPES = {'float': 'float32', 'int': 'int64'}  #: Mapping of DataSpace dtypes to NumPy dtypes
+
+
+def encode_array(x: Any, space: Union[DataSpace, Dict, None] = None, raw: bool = False) -> Dict[str, Any]:
+    """Encodes array as its binary buffer with dtype and shape.
+
+    Values aren't converted into python numbers so this is much cheaper for large
+    observations than :py:func:`to_list`. The array is copied only if it isn't contiguous
+    or its dtype is different than the one required by the `space`.
+
+    Parameters:
+        x (array-like): Values to encode. Usually a NumPy array.
+        space (optional DataSpace or dict): Space describing values. If provided, its dtype is used.
+        raw (bool): Whether to keep the buffer as bytes, e.g. for msgpack serializer,
+            rather than base64 string. Default: False.
+
+    Returns:
+        Dictionary with "dtype", "shape", "encoding" and "data".
+
+    """
+    if np is None:
+        raise ImportError("Encoding arrays requires `numpy`. Install it with `pip install agents-bar[numpy]`.")
+    dtype = space.get('dtype') if isinstance(space, dict) else getattr(space, 'dtype', None)
+    if dtype is not None:
+        dtype = DTYPES.get(dtype, dtype)
+    arr = np.ascontiguousarray(x, dtype=dtype)
+    data = arr.tobytes() if raw else base64.b64encode(memoryview(arr).cast('B')).decode('ascii')
+    return {"dtype": arr.dtype.str, "shape": list(arr.shape), "encoding": "raw" if raw else "base64", "data": data}
+
+
+def decode_array(encoded: Dict[str, Any]) -> "np.ndarray":
+    """Decodes array encoded with :py:func:`encode_array`.
+
+    Returns:
+        NumPy array. It's read-only when it's backed directly by the received buffer.
+
+    """
+    if np is None:
+        raise ImportError("Decoding arrays requires `numpy`. Install it with `pip install agents-bar[numpy]`.")
+    data = encoded["data"]
+    if encoded.get("encoding", "base64") == "base64":
+        data = base64.b64decode(data)
+    return np.frombuffer(data, dtype=np.dtype(encoded["dtype"])).reshape(encoded["shape"])
+
+
+def is_missing_endpoint(client, response) -> bool:
+    """
+    Checks whether the service doesn't provide requested endpoint at all,
+    as opposed to e.g. not having the requested entity.
+    Response's body is decoded with client's serializer, e.g. msgpack.
+    """
+    if response.status_code == 405:
+        return True
+    if response.status_code != 404:
+        return False
+    try:
+        return client.decode(response).get('detail') == 'Not Found'
+    except Exception:
+        return False
+
+
 def response_raise_error_if_any(response: requests.Response) -> None:
     """
     Checks if there is any error while make a request.
     If status 400+ then raises HTTPError with provided reason.
+    Works with responses from both `requests` (Client) and `httpx` (AsyncClient).
     """
     try:
         response.raise_for_status()
-    except requests.exceptions.HTTPError as e:
+    except HTTP_STATUS_ERRORS as e:
         msg = response.text
         try:
             msg = response.json().get('detail')
         except:
             pass
-        raise HTTPError({"error": str(e), "reason": msg}) from None
+        raise HTTPError({"error": str(e), "reason": msg}, response=response) from None
@@ -0,0 +1,134 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from agentsbar import agents, environments, experiments, leagues
+from agentsbar.client import Client
+from agentsbar.types import WaitResult
+
+ENTITY_PREFIXES = {
+    'agent': agents.AGENTS_PREFIX,
+    'environment': environments.ENV_PREFIX,
+    'experiment': experiments.EXP_PREFIX,
+    'league': leagues.LEAGUE_PREFIX,
+}
+_LISTINGS = {
+    'agent': agents.get_many,
+    'environment': environments.get_many,
+    'experiment': experiments.get_many,
+    'league': leagues.get_many,
+}
+CONDITIONS = ('active', 'exists')
+
+
+def wait_for(
+    client: Client,
+    targets: Iterable[Tuple[str, str]],
+    condition: str = 'active',
+    timeout: float = 60.,
+    initial_interval: float = 0.25,
+    max_interval: float = 5.,
+    multiplier: float = 2.,
+    max_workers: int = 8,
+) -> Dict[Tuple[str, str], WaitResult]:
+    """Waits for many entities at once until they're active (or exist), but no longer than `timeout`.
+
+    Each round lists every entity type once with `get_many`, concurrently. Entities whose state
+    can't be told from the listing, e.g. listing fails or doesn't include `is_active`, are checked
+    individually, also concurrently. Rounds are spaced with exponential backoff.
+
+    Parameters:
+        client (Client): Authenticated client.
+        targets (Iterable of tuples): Pairs of (entity, name), e.g. `('agent', 'CartPoleAgent')`.
+            Supported entities are 'agent', 'environment', 'experiment' and 'league'.
+        condition (str): Either 'active' or 'exists'. Default: 'active'.
+        timeout (float): Maximum seconds allowed to wait. Default: 60.
+        initial_interval (float): Seconds between the first and second check. Default: 0.25.
+        max_interval (float): Upper limit of seconds between checks. Default: 5.
+        multiplier (float): How much the interval grows after each check. Default: 2.
+        max_workers (int): Maximum number of concurrent requests. Default: 8.
+
+    Returns:
+        Result for each (entity, name) pair. Check `ready` to tell whether it got there in time.
+
+    """
+    assert condition in CONDITIONS, f"Only conditions {CONDITIONS} are supported"
+    targets = list(dict.fromkeys(targets))
+    for (entity, _) in targets:
+        assert entity in ENTITY_PREFIXES, f"Only '{tuple(ENTITY_PREFIXES)}' are supported"
+
+    start_time = time.monotonic()
+    results = {target: WaitResult(entity=target[0], name=target[1]) for target in targets}
+    pending = set(targets)
+    interval = initial_interval
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            for (target, (is_ready, error)) in _check(client, executor, pending, condition).items():
+                result = results[target]
+                result.checks += 1
+                result.error = error
+                if is_ready:
+                    result.ready = True
+                    result.elapsed = time.monotonic() - start_time
+                    pending.discard(target)
+
+            remaining = timeout - (time.monotonic() - start_time)
+            if not pending or remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * multiplier, max_interval)
+
+    for target in pending:
+        results[target].timed_out = True
+        results[target].elapsed = time.monotonic() - start_time
+    return results
+
+
+def _check(
+    client: Client, executor: ThreadPoolExecutor, targets: Iterable[Tuple[str, str]], condition: str,
+) -> Dict[Tuple[str, str], Tuple[bool, Optional[str]]]:
+    "Checks all targets, returning whether each is ready and an error, if it couldn't be told."
+    names_by_entity: Dict[str, List[str]] = {}
+    for (entity, name) in targets:
+        names_by_entity.setdefault(entity, []).append(name)
+
+    listings = {entity: executor.submit(_listing, client, entity) for entity in names_by_entity}
+    statuses: Dict[Tuple[str, str], Tuple[bool, Optional[str]]] = {}
+    unknown = []
+    for (entity, names) in names_by_entity.items():
+        listing = listings[entity].result()
+        for name in names:
+            item = listing.get(name) if listing is not None else None
+            if listing is not None and item is None:
+                statuses[(entity, name)] = (False, None)
+            elif item is not None and (condition == 'exists' or 'is_active' in item):
+                statuses[(entity, name)] = (condition == 'exists' or bool(item['is_active']), None)
+            else:
+                unknown.append((entity, name))
+
+    singles = {target: executor.submit(_status, client, target[0], target[1], condition) for target in unknown}
+    for (target, future) in singles.items():
+        statuses[target] = future.result()
+    return statuses
+
+
+def _listing(client: Client, entity: str) -> Optional[Dict[str, Dict]]:
+    "All entities of the type keyed by name, or None if they can't be listed."
+    try:
+        items = _LISTINGS[entity](client)
+    except Exception:
+        return None
+    if not isinstance(items, list):  # Error response
+        return None
+    return {item['name']: item for item in items if isinstance(item, dict) and 'name' in item}
+
+
+def _status(client: Client, entity: str, name: str, condition: str) -> Tuple[bool, Optional[str]]:
+    try:
+        response = client.get(f"{ENTITY_PREFIXES[entity]}/{name}")
+    except Exception as e:
+        return False, str(e)
+    if not response.ok:
+        return False, None if response.status_code == 404 else f"{response.status_code}: {response.text}"
+    return condition == 'exists' or bool(client.decode(response).get('is_active')), None
@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class FakeService(object):
+    """
+    Minimal Agents Bar service running in a background thread.
+
+    Responses are set per (method, path) with :py:meth:`route`, where path doesn't include "/api/v1" and query.
+    Login always succeeds. Every other request is recorded in `requests` as (method, path).
+    Responses are in msgpack for clients that prefer it, otherwise in json.
+
+    """
+
+    def __init__(self):
+        self.requests: List[Tuple[str, str]] = []
+        self.routes: Dict[Tuple[str, str], Tuple[int, Any, float]] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def route(self, method: str, path: str, status: int = 200, body: Any = None, delay: float = 0.) -> None:
+        self.routes[(method, path)] = (status, body if body is not None else {}, delay)
+
+    def count(self, method: str, path: str) -> int:
+        with self._lock:
+            return self.requests.count((method, path))
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                path = self.path.split("?")[0][len("/api/v1"):]
+                if path == "/login/access-token":
+                    return self._send(200, {"access_token": "token"})
+                with service._lock:
+                    service.requests.append((method, path))
+                (status, body, delay) = service.routes.get((method, path), (404, {"detail": "Not Found"}, 0.))
+                time.sleep(delay)
+                self._send(status, body)
+
+            def _send(self, status: int, body: Any):
+                if msgpack is not None and self.headers.get("Accept", "").startswith("application/msgpack"):
+                    content_type, content = "application/msgpack", msgpack.packb(body, use_bin_type=True)
+                else:
+                    content_type, content = "application/json", json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                try:
+                    self.wfile.write(content)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up, e.g. a hedged request
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def do_DELETE(self):
+                self._respond("DELETE")
+
+        return Handler
+
+
+@pytest.fixture
+def service():
+    service = FakeService()
+    yield service
+    service.close()
@@ -0,0 +1,28 @@
+import pytest
+
+from agentsbar import Client, agents
+
+pytest.importorskip("msgpack")
+
+
+@pytest.mark.parametrize("serializer", ["json", "msgpack"])
+def test_act_batch_falls_back_to_single_acts_without_batch_endpoint(service, serializer):
+    service.route("POST", "/agents/A/act", body={"action": [1]})
+    client = Client("user", "pass", base_url=service.url, serializer=serializer)
+
+    actions = agents.act_batch(client, "A", [[0., 1.], [1., 0.]])
+
+    assert actions == [{"action": [1]}, {"action": [1]}]
+    assert service.count("POST", "/agents/A/acts") == 1
+    assert service.count("POST", "/agents/A/act") == 2
+
+
+@pytest.mark.parametrize("serializer", ["json", "msgpack"])
+def test_step_many_falls_back_to_single_steps_without_steps_endpoint(service, serializer):
+    service.route("POST", "/agents/A/step")
+    client = Client("user", "pass", base_url=service.url, serializer=serializer)
+
+    agents.step_many(client, "A", [{"reward": 1.}, {"reward": 0.}])
+
+    assert service.count("POST", "/agents/A/steps") == 1
+    assert service.count("POST", "/agents/A/step") == 2
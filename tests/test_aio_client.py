@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from agentsbar.aio import AsyncClient
+from agentsbar.token_cache import TokenCache
+
+pytest.importorskip("httpx")
+
+
+def test_cancelled_login_releases_token_cache_lock(tmp_path):
+    cache = TokenCache(str(tmp_path))
+
+    async def run():
+        client = AsyncClient("user", "pass", base_url="http://127.0.0.1:1", token_cache=cache)
+        other_process = cache.lock("user", client._base_url)
+        other_process.acquire()
+        login = asyncio.ensure_future(client.login())
+        await asyncio.sleep(0.1)
+        login.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await login
+
+        other_process.release()
+        await asyncio.sleep(0.1)
+        lock = cache.lock("user", client._base_url)
+        await asyncio.wait_for(asyncio.get_event_loop().run_in_executor(None, lock.acquire), 2)
+        lock.release()
+
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from agentsbar import Client, bulk
+
+ITEMS = [{"name": "A", "tags": ["x", "]"]}, 4.5, -12, "é€😀", True, None, [], {"nested": {"deep": [1, 2]}}]
+
+
+def test_iter_json_array_yields_items_split_at_any_position():
+    data = json.dumps(ITEMS).encode()
+    for split in range(1, len(data)):
+        assert list(bulk.iter_json_array([data[:split], data[split:]])) == ITEMS, split
+    assert list(bulk.iter_json_array(bytes([b]) for b in data)) == ITEMS
+
+
+def test_iter_json_array_waits_for_number_to_complete():
+    assert list(bulk.iter_json_array([b"[4", b".", b"5", b"]"])) == [4.5]
+    assert list(bulk.iter_json_array([b"[1", b"2, 3", b"]"])) == [12, 3]
+
+
+def test_iter_json_array_yields_items_before_array_ends():
+    items = bulk.iter_json_array(iter([b'[{"a": 1}, ', b'{"b"']))
+    assert next(items) == {"a": 1}
+
+
+@pytest.mark.parametrize("chunks", [[b'[{"a": 1}, {"b"'], [b"[1, 2"], [b""], []])
+def test_iter_json_array_raises_for_incomplete_array(chunks):
+    with pytest.raises(ValueError):
+        list(bulk.iter_json_array(chunks))
+
+
+def test_iter_json_array_raises_for_non_array():
+    with pytest.raises(ValueError):
+        list(bulk.iter_json_array([b'{"a": 1}']))
+
+
+def test_iter_pages_stops_when_service_ignores_pagination(service):
+    service.route("GET", "/agents/", body=[{"name": "A"}, {"name": "B"}])
+    client = Client("user", "pass", base_url=service.url)
+
+    assert list(bulk.iter_pages(client, "/agents/", page_size=2)) == [{"name": "A"}, {"name": "B"}]
+    assert service.count("GET", "/agents/") == 2
@@ -0,0 +1,51 @@
+import base64
+import os
+
+import pytest
+
+from agentsbar import Client, RemoteAgent, delta
+from agentsbar.types import EncodedAgentState
+
+
+def _state(network: bytes) -> EncodedAgentState:
+    return EncodedAgentState(
+        model="dqn", obs_size=2, action_size=2, encoded_config="",
+        encoded_network=base64.b64encode(network).decode(), encoded_buffer=base64.b64encode(b"buffer").decode(),
+    )
+
+
+@pytest.fixture
+def agent(service, tmp_path):
+    service.route("POST", "/snapshots/A")
+    service.route("POST", "/snapshots/A/delta")
+    service.route("GET", "/agents/A", body={"name": "A", "model": "dqn"})
+    client = Client("user", "pass", base_url=service.url)
+    return RemoteAgent(client, "A", agent_model="dqn", chunk_store=delta.ChunkStore(str(tmp_path)))
+
+
+def test_split_is_stable_after_insertion():
+    data = os.urandom(1 << 18)
+    before = {delta.chunk_hash(chunk) for chunk in delta.split(data, avg_size=4096)}
+    after = {delta.chunk_hash(chunk) for chunk in delta.split(data[:1000] + b"inserted" + data[1000:], avg_size=4096)}
+    assert b"".join(delta.split(data, avg_size=4096)) == data
+    assert len(before - after) <= 2
+
+
+def test_full_upload_forgets_delta_base(agent):
+    agent.upload_state(_state(b"network"), delta=True)
+    store = agent._chunk_store
+    assert store.base(agent._client._base_url, "A") is not None
+
+    agent.upload_state(_state(b"replaced"))
+
+    assert store.base(agent._client._base_url, "A") is None
+
+
+@pytest.mark.parametrize("use_delta", [False, True])
+def test_upload_invalidates_agent_details(agent, use_delta):
+    client = agent._client
+    client.metadata_cache.get("agent", "A", lambda: {"stale": True})
+
+    agent.upload_state(_state(b"network"), delta=use_delta)
+
+    assert client.metadata_cache.get("agent", "A", lambda: {"stale": False}) == {"stale": False}
@@ -0,0 +1,95 @@
+import time
+
+from agentsbar import Client, RemoteAgent, agents
+from agentsbar.hedging import HedgePolicy, Hedger
+
+
+def _hedging_client(service) -> Client:
+    return Client("user", "pass", base_url=service.url, hedge_policy=HedgePolicy(delay=0.05, budget=1.))
+
+
+def test_get_isnt_hedged_unless_requested(service):
+    service.route("GET", "/agents/", body=[], delay=0.2)
+    client = _hedging_client(service)
+
+    agents.get_many(client)
+
+    assert service.count("GET", "/agents/") == 1
+
+
+def test_entity_details_are_hedged(service):
+    service.route("GET", "/agents/A", body={"name": "A"}, delay=0.2)
+    client = _hedging_client(service)
+
+    agents.get(client, "A")
+
+    assert service.count("GET", "/agents/A") == 2
+
+
+def test_get_state_sends_single_snapshot_request(service):
+    state = {"model": "dqn", "obs_size": 2, "action_size": 2, "encoded_config": "", "encoded_network": "", "encoded_buffer": ""}
+    service.route("GET", "/snapshots/A", body=state, delay=0.2)
+    agent = RemoteAgent(_hedging_client(service), "A", agent_model="dqn")
+
+    agent.get_state()
+
+    assert service.count("GET", "/snapshots/A") == 1
+
+
+class _Response:
+    def __init__(self, value):
+        self.value = value
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _sender(delays):
+    "Send function whose consecutive calls take the given seconds."
+    calls = []
+
+    def send():
+        idx = len(calls)
+        calls.append(idx)
+        time.sleep(delays[idx % len(delays)])
+        return _Response(idx)
+    return send, calls
+
+
+def test_hedge_wins_when_primary_is_slow():
+    hedger = Hedger(HedgePolicy(delay=0.02, budget=1.))
+    send, calls = _sender([0.3, 0.])
+
+    response = hedger.call("/act", send)
+
+    assert response.value == 1
+    assert (hedger.hedged, hedger.hedge_wins) == (1, 1)
+    hedger.shutdown()
+
+
+def test_budget_limits_hedged_requests():
+    hedger = Hedger(HedgePolicy(delay=0.01, budget=0.25))
+    send, calls = _sender([0.03])
+
+    for _ in range(8):
+        hedger.call("/act", send)
+
+    # Starts with one token and earns a quarter of it per request
+    assert hedger.requests == 8
+    assert hedger.hedged == 2
+    hedger.shutdown()
+
+
+def test_percentile_delay_needs_enough_samples():
+    hedger = Hedger(HedgePolicy(percentile=50., min_samples=4, budget=1.))
+    send, calls = _sender([0.01])
+
+    for _ in range(3):
+        hedger.call("/act", send)
+    assert hedger.delay("/act") is None
+    hedger.call("/act", send)
+
+    assert hedger.delay("/act") >= 0.01
+    assert hedger.hedged == 0
+    hedger.shutdown()
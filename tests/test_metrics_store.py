@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+from agentsbar.metrics_store import MetricsStore  # noqa: E402
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    index = np.cumsum(rng.integers(0, 3, size=1000))
+    return index, rng.normal(size=1000)
+
+
+def test_range_matches_numpy_across_blocks(tmp_path, points):
+    (index, value) = points
+    store = MetricsStore(str(tmp_path), block_size=64)
+    for part in range(0, 1000, 300):
+        store.append("loss", index[part:part + 300], value[part:part + 300])
+
+    for (start, stop) in [(None, None), (10, 500), (index[63], index[64] + 1), (-5, 3), (index[-1], None)]:
+        mask = np.ones(len(index), dtype=bool)
+        if start is not None:
+            mask &= index >= start
+        if stop is not None:
+            mask &= index < stop
+        (got_index, got_value) = store.range("loss", start, stop)
+        np.testing.assert_array_equal(got_index, index[mask])
+        np.testing.assert_array_equal(got_value, value[mask])
+    store.close()
+
+
+def test_downsample_matches_numpy(tmp_path, points):
+    (index, value) = points
+    store = MetricsStore(str(tmp_path), block_size=64)
+    store.append("loss", index, value)
+
+    summary = store.downsample("loss", 7)
+
+    edges = summary["edges"]
+    for bucket in range(7):
+        mask = (index >= edges[bucket]) & (index < edges[bucket + 1])
+        assert summary["count"][bucket] == mask.sum()
+        assert summary["min"][bucket] == pytest.approx(value[mask].min())
+        assert summary["max"][bucket] == pytest.approx(value[mask].max())
+        assert summary["mean"][bucket] == pytest.approx(value[mask].mean())
+    store.close()
+
+
+def test_rejects_decreasing_indices(tmp_path):
+    store = MetricsStore(str(tmp_path))
+    store.append("loss", [5, 6], [0., 1.])
+
+    with pytest.raises(ValueError):
+        store.append("loss", [4], [2.])
+    store.close()
+
+
+def test_reader_sees_appended_samples_after_refresh(tmp_path):
+    writer = MetricsStore(str(tmp_path), block_size=16)
+    writer.append("loss", [0, 1], [0., 1.])
+    reader = MetricsStore(str(tmp_path), block_size=16, readonly=True)
+    assert len(reader.range("loss")[0]) == 2
+
+    writer.append("loss", np.arange(2, 100), np.zeros(98))
+    reader.column("loss").refresh()
+
+    assert len(reader.range("loss")[0]) == 100
+    reader.close()
+    writer.close()
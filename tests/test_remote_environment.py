@@ -0,0 +1,68 @@
+import pytest
+
+from agentsbar import Client, RemoteAgent, RemoteEnvironment, RemoteVectorEnv
+from agentsbar.remote_environment import VectorEnvError
+
+
+@pytest.fixture
+def client(service):
+    return Client("user", "pass", base_url=service.url)
+
+
+def test_vector_env_unwraps_single_agent_values(service, client):
+    for name in ("E0", "E1"):
+        service.route("POST", f"/environments/{name}/step", body={"observation": [1., 2.], "reward": [1.], "done": [False]})
+
+    with RemoteVectorEnv(client, ["E0", "E1"]) as envs:
+        (obs, rewards, dones, infos) = envs.step([0, 1])
+
+    assert list(rewards) == [1., 1.]
+    assert list(dones) == [False, False]
+    assert service.count("POST", "/environments/E0/reset") == 0
+
+
+def test_vector_env_keeps_other_results_when_one_step_fails(service, client):
+    service.route("POST", "/environments/E0/step", body={"observation": [1., 2.], "reward": 1., "done": False})
+    service.route("POST", "/environments/E1/step", status=500, body={"detail": "Broken"})
+    service.route("POST", "/environments/E2/step", body={"observation": [3., 4.], "reward": 0., "done": False})
+
+    with RemoteVectorEnv(client, ["E0", "E1", "E2"]) as envs:
+        with pytest.raises(VectorEnvError) as error:
+            envs.step([0, 1, 0])
+
+    assert error.value.index == 1
+    assert list(error.value.errors) == [1]
+    assert error.value.results[0] == ([1., 2.], 1., False, {})
+    assert error.value.results[1] is None
+    assert error.value.results[2] == ([3., 4.], 0., False, {})
+    assert service.count("POST", "/environments/E2/step") == 1
+
+
+@pytest.fixture
+def two_agents(service, client):
+    for name in ("A0", "A1"):
+        service.route("POST", f"/agents/{name}/act", body={"action": [1]})
+    return [RemoteAgent(client, name, agent_model="dqn") for name in ("A0", "A1")]
+
+
+def test_step_agents_slices_only_per_agent_keys(service, client, two_agents):
+    # Shared reward has as many elements as there are agents and still isn't split
+    state = {"observation": [[0., 1.], [1., 0.]], "reward": [0.5, 0.5], "done": True, "info": {"turn": 3}}
+    service.route("POST", "/environments/M/step", body=state)
+
+    steps = RemoteEnvironment(client, "M").step_agents(
+        two_agents, [[0., 0.], [0., 0.]], per_agent_keys=("observation",),
+    )
+
+    assert [step.observation for step in steps] == [[0., 1.], [1., 0.]]
+    assert [step.reward for step in steps] == [[0.5, 0.5], [0.5, 0.5]]
+    assert [step.done for step in steps] == [True, True]
+    assert [step.info for step in steps] == [{"turn": 3}, {"turn": 3}]
+    assert service.count("POST", "/environments/M/step") == 1
+
+
+def test_step_agents_rejects_values_without_element_per_agent(service, client, two_agents):
+    service.route("POST", "/environments/M/step", body={"observation": [0., 1.], "reward": 1., "done": False})
+
+    with pytest.raises(ValueError, match="'reward'"):
+        RemoteEnvironment(client, "M").step_agents(two_agents, [[0., 0.], [0., 0.]])
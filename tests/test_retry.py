@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+import requests
+
+from agentsbar.retry import CircuitBreaker, CircuitOpenError, RetryPolicy, async_call_with_retry, call_with_retry
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("x", failure_threshold=1, reset_timeout=0.)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_transient_failures():
+    breaker = CircuitBreaker("x", failure_threshold=2, reset_timeout=60.)
+
+    def fail():
+        raise requests.exceptions.ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            call_with_retry(fail, RetryPolicy(max_attempts=1), breaker=breaker)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(lambda: "ok", RetryPolicy(max_attempts=1), breaker=breaker)
+
+
+def test_interrupted_trial_call_lets_next_trial_through():
+    breaker = _half_open_breaker()
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        call_with_retry(interrupt, RetryPolicy(max_attempts=1), breaker=breaker)
+
+    assert call_with_retry(lambda: "ok", RetryPolicy(max_attempts=1), breaker=breaker) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_async_trial_call_lets_next_trial_through():
+    breaker = _half_open_breaker()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        trial = asyncio.ensure_future(async_call_with_retry(slow, RetryPolicy(max_attempts=1), breaker=breaker))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        return await async_call_with_retry(ok, RetryPolicy(max_attempts=1), breaker=breaker)
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_idempotent_requests_retry_only_when_not_sent():
+    policy = RetryPolicy()
+    try:
+        requests.get("http://127.0.0.1:1/", timeout=1)
+    except requests.exceptions.ConnectionError as e:
+        refused = e
+
+    assert policy.is_retryable(refused, idempotent=False)
+    assert not policy.is_retryable(requests.exceptions.ReadTimeout(), idempotent=False)
+    assert policy.is_retryable(requests.exceptions.ReadTimeout(), idempotent=True)
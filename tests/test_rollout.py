@@ -0,0 +1,78 @@
+import asyncio
+
+from agentsbar import Client
+from agentsbar.aio.client import AsyncClient
+from agentsbar.rollout import RolloutEngine
+
+
+class FakeAgent:
+    def __init__(self, client, agent_name="A", fail_learning=False):
+        self._client = client
+        self.agent_name = agent_name
+        self.fail_learning = fail_learning
+        self.transitions = []
+
+    def act(self, obs, noise=0.):
+        return 1
+
+    def step(self, *transition):
+        if self.fail_learning:
+            raise RuntimeError("Learning failed")
+        self.transitions.append(transition)
+
+
+class FakeAsyncAgent(FakeAgent):
+    async def act(self, obs, noise=0.):
+        return 1
+
+    async def step(self, *transition):
+        FakeAgent.step(self, *transition)
+
+
+def _route_env(service, delay=0.):
+    service.route("POST", "/environments/E/reset", body=[0.])
+    service.route("POST", "/environments/E/step", body={"observation": [1.], "reward": [1.], "done": [True]}, delay=delay)
+
+
+def test_learning_failure_doesnt_stop_rollout(service):
+    _route_env(service)
+    agent = FakeAgent(Client("user", "pass", base_url=service.url), fail_learning=True)
+
+    stats = RolloutEngine([(agent, "E")], max_episodes=3).run()[("A", "E")]
+
+    assert stats.episodes == 3
+    assert stats.returns == [1., 1., 1.]
+    assert stats.learn_errors == 3
+    assert stats.errors == 0
+
+
+def test_failed_steps_stop_pair_after_max_errors(service):
+    service.route("POST", "/environments/E/reset", body=[0.])
+    agent = FakeAgent(Client("user", "pass", base_url=service.url))
+
+    stats = RolloutEngine([(agent, "E")], max_errors=2).run()[("A", "E")]
+
+    assert stats.errors == 2
+    assert stats.steps == 0
+    assert agent.transitions == []
+
+
+def test_cancelled_arun_finishes_steps_in_flight_and_propagates(service):
+    _route_env(service, delay=0.2)
+    agent = FakeAsyncAgent(AsyncClient("user", "pass", base_url=service.url))
+    engine = RolloutEngine([(agent, "E")])
+
+    async def main():
+        task = asyncio.ensure_future(engine.arun())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(main())
+    stats = engine.stats[("A", "E")]
+    assert stats.steps == 1
+    assert len(agent.transitions) == 1
@@ -0,0 +1,42 @@
+import pytest
+from requests.models import HTTPError
+
+from agentsbar import Client, RemoteAgent
+from agentsbar.hedging import HedgePolicy
+from agentsbar.snapshot_cache import Checkpointer, SnapshotCache
+from agentsbar.types import EncodedAgentState
+
+STATE = {"model": "dqn", "obs_size": 2, "action_size": 2, "encoded_config": "", "encoded_network": "", "encoded_buffer": ""}
+
+
+@pytest.fixture
+def checkpointer(service, tmp_path):
+    client = Client("user", "pass", base_url=service.url, hedge_policy=HedgePolicy(delay=0.05, budget=1.))
+    agent = RemoteAgent(client, "A", agent_model="dqn")
+    return Checkpointer(agent, SnapshotCache(str(tmp_path)), interval=0.)
+
+
+def test_cache_returns_stored_state(tmp_path):
+    cache = SnapshotCache(str(tmp_path))
+    state = EncodedAgentState(**STATE)
+    digest = cache.put("A", state)
+    assert cache.get("A", digest) == state
+    assert cache.get("A") == state
+
+
+def test_checkpoint_sends_single_request_when_slow(checkpointer, service):
+    service.route("GET", "/snapshots/A", body=STATE, delay=0.2)
+
+    assert checkpointer.checkpoint() is not None
+
+    assert service.count("GET", "/snapshots/A") == 1
+    assert checkpointer.checkpoints == 1
+
+
+def test_checkpoint_sends_single_request_when_failing(checkpointer, service):
+    service.route("GET", "/snapshots/A", status=503, body={"detail": "Unavailable"})
+
+    with pytest.raises(HTTPError):
+        checkpointer.checkpoint()
+
+    assert service.count("GET", "/snapshots/A") == 1
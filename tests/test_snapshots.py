@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from agentsbar import snapshots
+from agentsbar.types import SnapshotFiles
+
+STATE = {
+    "model": "dqn", "obs_size": 4, "action_size": 2, "encoded_config": "{\"lr\": 0.1}",
+    "encoded_network": "bmV0d29yaw==" * 50, "encoded_buffer": "quote \" slash \\ new\nline é€😀",
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_parser_writes_large_fields_to_files(tmp_path, chunk_size):
+    data = json.dumps(STATE).encode()
+    parser = snapshots._SnapshotParser(str(tmp_path))
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start:start + chunk_size])
+    parser.close()
+
+    assert parser.done
+    files = SnapshotFiles(directory=str(tmp_path), **parser.fields)
+    assert snapshots.load(files).__dict__ == STATE
+
+
+def test_parser_rejects_nested_values(tmp_path):
+    parser = snapshots._SnapshotParser(str(tmp_path))
+    with pytest.raises(ValueError):
+        parser.feed(b'{"model": {"name": "dqn"}}')
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+def test_read_chunks_escapes_content_split_anywhere(tmp_path, chunk_size):
+    path = tmp_path / "buffer.b64"
+    content = STATE["encoded_buffer"] * 10
+    path.write_text(content, encoding="utf-8")
+
+    encoded = b"".join(snapshots._read_chunks(str(path), chunk_size))
+
+    assert json.loads(b'"' + encoded + b'"') == content
+
+
+def test_open_directory_reads_saved_files(tmp_path):
+    files = SnapshotFiles(directory=str(tmp_path), **{k: v for (k, v) in STATE.items() if k not in snapshots.FILE_FIELDS})
+    snapshots._save_metadata(files)
+    for (field, path) in snapshots.file_paths(files).items():
+        with open(path, "w") as f:
+            f.write(STATE[field])
+
+    assert snapshots.load(snapshots.open_directory(str(tmp_path))).__dict__ == STATE
@@ -0,0 +1,29 @@
+from agentsbar.step_buffer import PartialSendError, StepBuffer
+
+
+def test_buffer_sends_batch_when_full():
+    batches = []
+    buffer = StepBuffer(batches.append, max_size=2, max_wait=None)
+
+    assert not buffer.add({"idx": 0})
+    assert buffer.add({"idx": 1})
+    assert buffer.add({"idx": 2}, done=True)
+
+    assert [[step["idx"] for step in batch] for batch in batches] == [[0, 1], [2]]
+
+
+def test_buffer_keeps_only_unsent_steps_after_partial_failure():
+    batches = []
+
+    def send(steps):
+        batches.append(list(steps))
+        if len(batches) == 1:
+            raise PartialSendError(1, RuntimeError("down"))
+
+    buffer = StepBuffer(send, max_size=3, max_wait=None)
+    for idx in range(3):
+        buffer.add({"idx": idx})
+    assert isinstance(buffer.last_error, PartialSendError)
+    buffer.flush()
+
+    assert [[step["idx"] for step in batch] for batch in batches] == [[0, 1, 2], [1, 2]]
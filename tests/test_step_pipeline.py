@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from agentsbar.step_buffer import PartialSendError
+from agentsbar.step_pipeline import BackpressureError, StepPipeline
+
+
+def test_pipeline_sends_all_steps_in_order():
+    sent = []
+    pipeline = StepPipeline(sent.extend, max_batch=4)
+    for idx in range(10):
+        pipeline.put({"idx": idx})
+
+    assert pipeline.close(timeout=2)
+    assert [step["idx"] for step in sent] == list(range(10))
+    assert pipeline.sent == 10
+
+
+def test_close_with_full_queue_returns_within_timeout():
+    release = threading.Event()
+    pipeline = StepPipeline(lambda steps: release.wait(), max_queue=2, max_batch=1)
+    for idx in range(3):
+        pipeline.put({"idx": idx})
+
+    start = time.monotonic()
+    assert not pipeline.close(timeout=0.2)
+    assert time.monotonic() - start < 0.5
+    release.set()
+
+
+def test_raise_policy_rejects_steps_when_full():
+    release = threading.Event()
+    pipeline = StepPipeline(lambda steps: release.wait(), max_queue=1, max_batch=1, policy="raise")
+    pipeline.put({"idx": 0})
+    time.sleep(0.05)  # Worker takes the first one
+    pipeline.put({"idx": 1})
+
+    with pytest.raises(BackpressureError):
+        pipeline.put({"idx": 2})
+    release.set()
+    pipeline.close(timeout=1)
+
+
+def test_partially_sent_batch_reports_only_unsent_steps():
+    failed, unsent = [], []
+
+    def send(steps):
+        sent = len(steps) // 2
+        unsent.extend(steps[sent:])
+        raise PartialSendError(sent, RuntimeError("down"))
+
+    pipeline = StepPipeline(send, on_error=lambda error, steps: failed.extend(steps))
+    for idx in range(5):
+        pipeline.put({"idx": idx})
+    pipeline.close(timeout=2)
+
+    assert failed == unsent
+    assert pipeline.failed == len(unsent)
+    assert pipeline.sent == 5 - len(unsent)